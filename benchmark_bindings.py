@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Measures the time and the peak memory usage of bindings generators. Each
+# generator runs in-process, like in generate_all.py. The first run warms up
+# the device model cache and is not measured. The peak memory is measured in
+# a separate run, because tracemalloc slows down the generator considerably.
+
+import sys
+
+if sys.hexversion < 0x3040000:
+    print('Python >= 3.4 required')
+    sys.exit(1)
+
+import os
+import io
+import gc
+import time
+import argparse
+import tracemalloc
+import contextlib
+import importlib.util
+import importlib.machinery
+
+generators_dir = os.path.dirname(os.path.realpath(__file__))
+
+def create_generators_module():
+    if sys.hexversion < 0x3050000:
+        generators_module = importlib.machinery.SourceFileLoader('generators', os.path.join(generators_dir, '__init__.py')).load_module()
+    else:
+        generators_spec = importlib.util.spec_from_file_location('generators', os.path.join(generators_dir, '__init__.py'))
+        generators_module = importlib.util.module_from_spec(generators_spec)
+
+        generators_spec.loader.exec_module(generators_module)
+
+    sys.modules['generators'] = generators_module
+
+if 'generators' not in sys.modules:
+    create_generators_module()
+
+from generators import common
+
+def run_generator(module, root_dir):
+    with contextlib.redirect_stdout(io.StringIO()):
+        module.generate(root_dir, 'en', False)
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-b', '--bindings', default='python,c', help='comma separated list of bindings [default: python,c]')
+    parser.add_argument('-r', '--runs', type=int, default=3, help='number of measured runs per bindings [default: 3]')
+
+    args = parser.parse_args()
+    total_time = 0
+
+    for binding in args.bindings.split(','):
+        module = importlib.import_module('generators.{0}.generate_{0}_bindings'.format(binding))
+        root_dir = os.path.join(generators_dir, binding)
+
+        run_generator(module, root_dir)
+
+        times = []
+
+        for _ in range(args.runs):
+            gc.collect()
+
+            start = time.perf_counter()
+
+            run_generator(module, root_dir)
+
+            times.append(time.perf_counter() - start)
+
+        gc.collect()
+        tracemalloc.start()
+
+        run_generator(module, root_dir)
+
+        peak = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.stop()
+
+        total_time += min(times)
+
+        print('{0:12} best {1:6.3f} s, mean {2:6.3f} s, peak memory {3:6.1f} MiB'
+              .format(binding, min(times), sum(times) / len(times), peak / 1024.0 / 1024.0))
+
+    print('{0:12} best {1:6.3f} s'.format('total', total_time))
+
+if __name__ == '__main__':
+    main()
@@ -67,7 +67,7 @@ class CExamplesTester(common.Tester):
 
         # skip OLED scribble example because mingw32 has no libgd package
         if self.compiler.startswith('mingw32-') and uses_libgd:
-            self.handle_result(cookie, 0, '>>> skipping')
+            self.add_result(cookie, 0, '>>> skipping')
             return
 
         if extra:
@@ -155,6 +155,6 @@ def test(root_dir):
     return CExamplesTester(root_dir, 'scan-build clang', extra_paths).run()
 
 if __name__ == '__main__':
-    common.dockerize('c', __file__)
+    common.dockerize('c', __file__, add_tester_arguments=True)
 
     test(os.getcwd())
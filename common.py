@@ -38,6 +38,17 @@ from collections import namedtuple
 import importlib
 import argparse
 import shlex
+import hashlib
+import pickle
+import time
+import cProfile
+import tracemalloc
+import contextlib
+import json
+import stat
+import zipfile
+import posixpath
+import tempfile
 
 from generators.configs import device_commonconfig
 
@@ -153,6 +164,11 @@ Funktionen direkt zu verwenden.
 
 lang = 'en'
 enable_verbose = False
+enable_incremental = False
+profiler = None # GeneratorProfiler, set by generate_all.py --profile
+tester_jobs = None # number of parallel Tester jobs, set by -j, defaults to the CPU count
+enable_tester_cache = True # report unchanged tests as cached passes, disabled by --no-cache
+tester_reports = [] # one report per Tester.run call, collected by test_all.py
 
 def print_verbose(*args, **kwargs):
     if enable_verbose:
@@ -1453,6 +1469,263 @@ def recreate_dir(path):
 
     os.makedirs(path)
 
+re_generated_date = re.compile(b'generated on [0-9]{4}-[0-9]{2}-[0-9]{2}')
+
+def is_same_generated_file(path, other_path):
+    try:
+        if os.stat(path).st_mode != os.stat(other_path).st_mode:
+            return False
+
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        with open(other_path, 'rb') as f:
+            other_content = f.read()
+    except FileNotFoundError:
+        return False
+
+    if content == other_content:
+        return True
+
+    # ignore the date in the "automatically generated on" header
+    return re_generated_date.sub(b'', content) == re_generated_date.sub(b'', other_content)
+
+def update_dir(source_path, destination_path, previous_files=None):
+    """
+    Moves all files from source_path to destination_path, but leaves files
+    untouched that only differ in their generation date. Files listed in
+    previous_files that are not part of source_path anymore are removed from
+    destination_path. If previous_files is None all such files are removed.
+    Returns the list of files in source_path, relative to it.
+    """
+
+    files = []
+
+    for dirpath, dirnames, filenames in os.walk(source_path):
+        dirnames.sort()
+
+        for dirname in dirnames:
+            os.makedirs(os.path.join(destination_path, os.path.relpath(os.path.join(dirpath, dirname), source_path)), exist_ok=True)
+
+        for filename in sorted(filenames):
+            source = os.path.join(dirpath, filename)
+            relative_path = os.path.relpath(source, source_path)
+            destination = os.path.join(destination_path, relative_path)
+
+            files.append(relative_path)
+
+            if not is_same_generated_file(source, destination):
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                os.replace(source, destination)
+
+    if previous_files == None:
+        previous_files = []
+
+        for dirpath, dirnames, filenames in os.walk(destination_path):
+            for filename in filenames:
+                previous_files.append(os.path.relpath(os.path.join(dirpath, filename), destination_path))
+
+    for relative_path in sorted(set(previous_files) - set(files)):
+        path = os.path.join(destination_path, relative_path)
+
+        if os.path.exists(path):
+            os.remove(path)
+
+        path = os.path.dirname(path)
+
+        while os.path.normpath(path) != os.path.normpath(destination_path) and os.path.isdir(path) and len(os.listdir(path)) == 0:
+            os.rmdir(path)
+            path = os.path.dirname(path)
+
+    shutil.rmtree(source_path)
+
+    return files
+
+re_generated_header = re.compile(b'(?<=generated on )[0-9]{4}-[0-9]{2}-[0-9]{2}|(?<=Bindings Version )2\\.[0-9]+\\.[0-9]+ *')
+
+def normalize_generated_content(data):
+    """
+    Replaces the generation date and the bindings version in the headers of
+    generated files by placeholders. Two files that only differ in these
+    header lines have the same normalized content.
+    """
+
+    return re_generated_header.sub(b'<...>', data)
+
+ZIP_MANIFEST_VERSION = 1
+
+def get_zip_date_time():
+    # honor SOURCE_DATE_EPOCH, see https://reproducible-builds.org/specs/source-date-epoch/
+    if 'SOURCE_DATE_EPOCH' in os.environ:
+        date_time = time.gmtime(int(os.environ['SOURCE_DATE_EPOCH']))[:6]
+
+        if date_time >= (1980, 1, 1, 0, 0, 0):
+            return date_time
+
+    return (1980, 1, 1, 0, 0, 0) # earliest date_time a ZIP file can store
+
+def create_reproducible_zip(source_path, zip_path):
+    """
+    Packs the content of source_path into the ZIP file zip_path. The entries
+    are sorted and their timestamps and permissions are normalized, so the
+    same content always results in the same ZIP file. Returns the manifest of
+    the ZIP file content.
+    """
+
+    date_time = get_zip_date_time()
+    entries = []
+
+    for dirpath, dirnames, filenames in os.walk(source_path, followlinks=True):
+        for name in dirnames:
+            entries.append(os.path.relpath(os.path.join(dirpath, name), source_path).replace(os.sep, '/') + '/')
+
+        for name in filenames:
+            entries.append(os.path.relpath(os.path.join(dirpath, name), source_path).replace(os.sep, '/'))
+
+    manifest = {'version': ZIP_MANIFEST_VERSION, 'files': {}}
+
+    with zipfile.ZipFile(zip_path, 'w') as f:
+        for name in sorted(entries):
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.create_system = 3 # unix
+
+            if name.endswith('/'):
+                info.external_attr = ((stat.S_IFDIR | 0o755) << 16) | 0x10 # MS-DOS directory flag
+
+                f.writestr(info, b'')
+                continue
+
+            with open(os.path.join(source_path, name), 'rb') as g:
+                data = g.read()
+
+            if os.stat(os.path.join(source_path, name)).st_mode & stat.S_IXUSR != 0:
+                mode = 0o755
+            else:
+                mode = 0o644
+
+            info.external_attr = (stat.S_IFREG | mode) << 16
+            info.compress_type = zipfile.ZIP_DEFLATED
+
+            f.writestr(info, data)
+
+            manifest['files'][name] = {'size': len(data),
+                                       'mode': '{0:o}'.format(mode),
+                                       'sha256': hashlib.sha256(data).hexdigest(),
+                                       'normalized_sha256': hashlib.sha256(normalize_generated_content(data)).hexdigest()}
+
+    return manifest
+
+def get_zip_manifest_path(zip_path):
+    return zip_path + '.manifest'
+
+def load_zip_manifest(zip_path):
+    """
+    Returns the manifest written next to zip_path by ZipGenerator, or None if
+    there is no such manifest or it has an unknown version.
+    """
+
+    try:
+        with open(get_zip_manifest_path(zip_path), 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get('version') != ZIP_MANIFEST_VERSION:
+        return None
+
+    # the manifest is written after the ZIP file, a newer ZIP file was not
+    # created by ZipGenerator and the manifest doesn't describe it
+    try:
+        if os.stat(zip_path).st_mtime_ns > os.stat(get_zip_manifest_path(zip_path)).st_mtime_ns:
+            return None
+    except OSError:
+        return None
+
+    return manifest
+
+def get_tree_hashes(path):
+    """
+    Returns a dict that maps the relative path of each file in the directory
+    or ZIP file path to the sha256 of its normalized content.
+    """
+
+    hashes = {}
+
+    if os.path.isdir(path):
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                with open(os.path.join(dirpath, filename), 'rb') as f:
+                    data = f.read()
+
+                hashes[os.path.relpath(os.path.join(dirpath, filename), path).replace(os.sep, '/')] = hashlib.sha256(normalize_generated_content(data)).hexdigest()
+    else:
+        manifest = load_zip_manifest(path)
+
+        if manifest != None:
+            return {name: entry['normalized_sha256'] for name, entry in manifest['files'].items()}
+
+        with zipfile.ZipFile(path) as f:
+            for info in f.infolist():
+                if not info.filename.endswith('/'):
+                    hashes[info.filename] = hashlib.sha256(normalize_generated_content(f.read(info))).hexdigest()
+
+    return hashes
+
+def read_tree_file(path, name):
+    if os.path.isdir(path):
+        with open(os.path.join(path, name), 'rb') as f:
+            return f.read()
+    else:
+        with zipfile.ZipFile(path) as f:
+            return f.read(name)
+
+def diff_trees(old_path, new_path, old_label, new_label, diff_args):
+    """
+    Compares the files of two directories or ZIP files by the hash of their
+    normalized content and returns the output of running diff with diff_args
+    for the files that really differ, with old_label and new_label instead of
+    the paths. The diffs run in parallel on the normalized content, so
+    changes in the generation date and bindings version headers never show.
+    """
+
+    old_hashes = get_tree_hashes(old_path)
+    new_hashes = get_tree_hashes(new_path)
+    changed_names = sorted(name for name in old_hashes.keys() & new_hashes.keys() if old_hashes[name] != new_hashes[name])
+    output = {}
+
+    for name in old_hashes.keys() - new_hashes.keys():
+        output[name] = 'Only in {0}: {1}\n'.format(*posixpath.split(posixpath.join(old_label, name)))
+
+    for name in new_hashes.keys() - old_hashes.keys():
+        output[name] = 'Only in {0}: {1}\n'.format(*posixpath.split(posixpath.join(new_label, name)))
+
+    if len(changed_names) > 0:
+        tmp_dir = tempfile.mkdtemp()
+
+        try:
+            for label, path in [(old_label, old_path), (new_label, new_path)]:
+                for name in changed_names:
+                    tmp_path = os.path.join(tmp_dir, label, name)
+
+                    os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+
+                    with open(tmp_path, 'wb') as f:
+                        f.write(normalize_generated_content(read_tree_file(path, name)))
+
+            def diff(name):
+                args = ['diff'] + diff_args + [posixpath.join(old_label, name), posixpath.join(new_label, name)]
+                _, diff_output = check_output_and_error(args, cwd=tmp_dir)
+
+                return name, ' '.join(args) + '\n' + diff_output
+
+            with multiprocessing.dummy.Pool(processes=os.cpu_count()) as pool:
+                for name, diff_output in pool.imap_unordered(diff, changed_names):
+                    output[name] = diff_output
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    return ''.join(output[name] for name in sorted(output))
+
 def specialize_template(template_filename, destination_filename, replacements, check_completeness=True, remove_template=False):
     lines = []
     replaced = set()
@@ -1516,7 +1789,7 @@ def generate(root_dir, language, internal, generator_class):
     print('=== language: {0}'.format(language))
 
     # default config
-    subgenerate(root_dir, language, internal, generator_class, 'tinkerforge')
+    measure_subgenerate(root_dir, language, internal, generator_class, 'tinkerforge')
 
     # custom configs
     config_base_path = os.path.join(root_dir, '..', 'configs')
@@ -1533,70 +1806,170 @@ def generate(root_dir, language, internal, generator_class):
         if re.match('^[a-z0-9_]+$', config_name) == None:
             raise GeneratorError('Invalid config name: {0}'.format(config_name))
 
+        measure_subgenerate(root_dir, language, internal, generator_class, config_name)
+
+def measure_subgenerate(root_dir, language, internal, generator_class, config_name):
+    if profiler == None:
         subgenerate(root_dir, language, internal, generator_class, config_name)
+    else:
+        with profiler.measure(language, config_name):
+            subgenerate(root_dir, language, internal, generator_class, config_name)
 
-def subgenerate(root_dir, language, internal, generator_class, config_name):
-    global lang
-    lang = language
+# version of the prepared device configs stored in the device model cache,
+# increase if prepare_device_config changes
+DEVICE_MODEL_CACHE_VERSION = 1
 
-    print('--> {0}'.format(config_name))
+# config name -> (configs hash, list of (config filename, pickled prepared config))
+_device_model_cache = {}
+
+def prepare_device_config(com, common_constant_groups, common_packets):
+    com = copy.deepcopy(com)
+    features = com['features']
+
+    if 'common_included' in com:
+        return com
 
-    config_path_parts = [root_dir, '..', 'configs']
+    for common_constant_group in copy.deepcopy(common_constant_groups):
+        if common_constant_group['feature'] in features:
+            com['constant_groups'].append(common_constant_group)
+
+    for common_packet in copy.deepcopy(common_packets):
+        if not common_packet.get('is_virtual', False):
+            if com['name'] in common_packet['since_firmware']:
+                common_packet['since_firmware'] = common_packet['since_firmware'][com['name']]
+            else:
+                common_packet['since_firmware'] = common_packet['since_firmware']['*']
+
+            if common_packet['since_firmware'] == None:
+                continue
+
+        if common_packet['feature'] in features:
+            com['packets'].append(common_packet)
+
+    com['common_included'] = True
+
+    return com
+
+def hash_file(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def load_device_configs(root_dir, config_name):
+    """
+    Returns a list of (config filename, pickled config) tuples for all device
+    configs of the given config name. Each config is imported, validated and
+    merged with the common constant groups and packets only once per process.
+    The result is also stored in configs/__pycache__ keyed by the hash of each
+    config file, so that other generator runs can skip importing the configs.
+    Each caller unpickles its own copy, because the Device class and the
+    generators modify the raw config data.
+    """
+
+    if config_name in _device_model_cache:
+        return _device_model_cache[config_name][1]
+
+    configs_path = os.path.join(root_dir, '..', 'configs')
 
     if config_name != 'tinkerforge':
         config_subdir = '.' + config_name
-        config_path_parts.append(config_name)
+        config_path = os.path.join(configs_path, config_name)
     else:
         config_subdir = ''
+        config_path = configs_path
 
-    config_path = os.path.join(*config_path_parts)
+    # the configs import the common modules, a change to any of them
+    # invalidates all cached configs
+    shared_hasher = hashlib.sha1('{0}:{1}'.format(DEVICE_MODEL_CACHE_VERSION, pickle.HIGHEST_PROTOCOL).encode('utf-8'))
 
-    common_constant_groups = copy.deepcopy(device_commonconfig.common_constant_groups)
-    common_packets = copy.deepcopy(device_commonconfig.common_packets)
+    for shared_path in sorted(set([configs_path, config_path])):
+        for shared in sorted(os.listdir(shared_path)):
+            if shared.endswith('.py') and not shared.endswith('_config.py'):
+                shared_hasher.update(shared.encode('utf-8'))
+                shared_hasher.update(hash_file(os.path.join(shared_path, shared)).encode('utf-8'))
 
-    brick_infos = []
-    bricklet_infos = []
-    tng_infos = []
-    device_identifiers = set()
+    shared_hash = shared_hasher.hexdigest()
+    cache_path = os.path.join(configs_path, '__pycache__', 'device_models.{0}.pickle'.format(config_name))
+    cached_entries = {}
 
-    generator = generator_class(root_dir, language, internal, config_name)
-    generator.prepare()
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
 
-    def prepare_common_constant_groups(com, common_constant_groups):
-        features = com['features']
+        if cached['shared_hash'] == shared_hash:
+            cached_entries = cached['entries']
+    except Exception:
+        pass # missing, outdated or broken cache, ignore it
 
-        for common_constant_group in common_constant_groups:
-            if common_constant_group['feature'] not in features:
-                common_constant_group['to_be_removed'] = True
+    entries = {}
+    device_configs = []
+    configs_hasher = hashlib.sha1(shared_hash.encode('utf-8'))
 
-        return filter(lambda x: 'to_be_removed' not in x, common_constant_groups)
+    for config in sorted(os.listdir(config_path)):
+        if not config.endswith('_config.py'):
+            continue
 
-    def prepare_common_packets(com, common_packets):
-        features = com['features']
+        config_hash = hash_file(os.path.join(config_path, config))
+        entry = cached_entries.get(config)
 
-        for common_packet in common_packets:
-            if not common_packet.get('is_virtual', False):
-                if com['name'] in common_packet['since_firmware']:
-                    common_packet['since_firmware'] = common_packet['since_firmware'][com['name']]
-                else:
-                    common_packet['since_firmware'] = common_packet['since_firmware']['*']
+        if entry == None or entry[0] != config_hash:
+            com = importlib.import_module('generators.configs{0}.{1}'.format(config_subdir, config[:-3])).com
 
-                if common_packet['since_firmware'] == None:
-                    common_packet['to_be_removed'] = True
+            if com['documented'] and not com['released']:
+                raise GeneratorError('{0} is marked as documented, but as not released'.format(config[:-10]))
 
-            if common_packet['feature'] not in features:
-                common_packet['to_be_removed'] = True
+            com = prepare_device_config(com, device_commonconfig.common_constant_groups, device_commonconfig.common_packets)
+            entry = (config_hash, pickle.dumps(com, pickle.HIGHEST_PROTOCOL))
 
-        return filter(lambda x: 'to_be_removed' not in x, common_packets)
+        entries[config] = entry
+        device_configs.append((config, entry[1]))
+        configs_hasher.update('{0}:{1}'.format(config, config_hash).encode('utf-8'))
 
-    for config in sorted(os.listdir(config_path)):
-        if not config.endswith('_config.py'):
-            continue
+    if entries != cached_entries:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+            # write to a temporary file first, other generator processes
+            # might read the cache at the same time
+            temp_cache_path = '{0}.{1}'.format(cache_path, os.getpid())
+
+            with open(temp_cache_path, 'wb') as f:
+                pickle.dump({'shared_hash': shared_hash, 'entries': entries}, f, pickle.HIGHEST_PROTOCOL)
+
+            os.replace(temp_cache_path, cache_path)
+        except OSError:
+            pass # the cache is optional
 
-        com = copy.deepcopy(importlib.import_module('generators.configs{0}.{1}'.format(config_subdir, config[:-3])).com)
+    _device_model_cache[config_name] = (configs_hasher.hexdigest(), device_configs)
 
-        if com['documented'] and not com['released']:
-            raise GeneratorError('{0} is marked as documented, but as not released'.format(config[:-10]))
+    return device_configs
+
+def get_device_configs_hash(root_dir, config_name):
+    load_device_configs(root_dir, config_name)
+
+    return _device_model_cache[config_name][0]
+
+def subgenerate(root_dir, language, internal, generator_class, config_name):
+    global lang
+    lang = language
+
+    brick_infos = []
+    bricklet_infos = []
+    tng_infos = []
+    device_identifiers = set()
+
+    generator = generator_class(root_dir, language, internal, config_name)
+
+    # device_infos.py is only written for the default config
+    if generator.is_up_to_date() and (config_name != 'tinkerforge' or os.path.exists(os.path.join(root_dir, '..', 'device_infos.py'))):
+        print('--> {0} \033[01;36m(up-to-date)\033[0m'.format(config_name))
+        return
+
+    print('--> {0}'.format(config_name))
+
+    generator.prepare()
+
+    for config, pickled_com in load_device_configs(root_dir, config_name):
+        com = pickle.loads(pickled_com)
 
         if not com['released'] and not com['documented']:
             print_verbose('  * {0} \033[01;36m(not released, not documented)\033[0m'.format(config[:-10]))
@@ -1607,11 +1980,6 @@ def subgenerate(root_dir, language, internal, generator_class, config_name):
         else:
             print_verbose('  * {0}'.format(config[:-10]))
 
-        if 'common_included' not in com:
-            com['constant_groups'].extend(prepare_common_constant_groups(com, copy.deepcopy(common_constant_groups)))
-            com['packets'].extend(prepare_common_packets(com, copy.deepcopy(common_packets)))
-            com['common_included'] = True
-
         if generator.is_openhab_doc_generator:
             com['packets'] = [x for x in com['packets'] if 'openhab_doc' not in x or x['openhab_doc']]
         else:
@@ -1625,7 +1993,11 @@ def subgenerate(root_dir, language, internal, generator_class, config_name):
 
         device_identifiers.add(device_identifier)
 
-        generator.generate(device)
+        if profiler == None:
+            generator.generate(device)
+        else:
+            with profiler.measure(language, config_name, device=device.get_category().under + '_' + device.get_name().under):
+                generator.generate(device)
 
         # only collect device_infos for default config
         if config_name != 'tinkerforge':
@@ -1714,6 +2086,7 @@ def subgenerate(root_dir, language, internal, generator_class, config_name):
             assert False
 
     generator.finish()
+    generator.update_output()
 
     # only update device_infos.py for default config
     if config_name == 'tinkerforge':
@@ -1753,10 +2126,18 @@ check_name_valid_word_constant = re.compile('^[A-Z0-9]+[a-z0-9]*$') # constants
 check_name_exceptions_whole_name = ['Industrial Dual 0 20mA', 'Industrial Dual 0 20mA V2']
 check_name_exceptions_word_in_constant = ['20mA', '24mA', 'EtOH']
 
+# (name, display_name, is_constant) tuples that passed check_name already
+_checked_names = set()
+
 def check_name(name, display_name=None, is_constant=False):
     if isinstance(name, tuple):
         raise GeneratorError('Name {0} uses old tuple format, update it to new split-camel-case format'.format(name))
 
+    key = (name, display_name, is_constant)
+
+    if key in _checked_names:
+        return
+
     if len(name) == 0:
         raise GeneratorError('Name is empty')
 
@@ -1797,6 +2178,8 @@ def check_name(name, display_name=None, is_constant=False):
             raise GeneratorError("Name '{0}' and display name '{1}' ({2}) mismatch" \
                                  .format(name, display_name, display_name_to_check))
 
+    _checked_names.add(key)
+
 def break_string(string, indent_marker, space=' ', continuation='', indent_head='',
                  indent_tail='', indent_suffix='', max_length=90, break_point='<BP>'):
     result = string.replace(break_point, space)
@@ -1848,12 +2231,14 @@ class GeneratorError(Exception):
 NameFlavors = namedtuple('NameFlavors', 'space lower camel headless under upper dash camel_abbrv lower_no_space camel_constant_safe')
 
 class FlavoredName(object):
+    __slots__ = ('words', 'cache')
+
     def __init__(self, name):
         self.words = name.split(' ')
         self.cache = {}
 
     def get(self, skip=0, suffix=''):
-        key = str(skip) + ',' + suffix
+        key = (skip, suffix)
 
         try:
             return self.cache[key]
@@ -1879,6 +2264,11 @@ class FlavoredName(object):
 
             return self.cache[key]
 
+# FlavoredName caches all flavors it computed, so instances are shared per name
+@functools.lru_cache(maxsize=None)
+def get_flavored_name(name):
+    return FlavoredName(name)
+
 class Unit(object):
     def __init__(self, name, title, symbol, usage, allowed_prefixes, allowed_inverse_prefixes,
                  sequence={'en': '{value} {unit}', 'de': '{value} {unit}'},
@@ -2349,6 +2739,55 @@ unit_prefixes = [
     UnitPrefix('h',  {'en': 'Hecto', 'de': 'Hekto'}, 0, 100)
 ]
 
+# Unit objects are immutable, so the resolved unit is shared by all elements
+# with the same unit name
+@functools.lru_cache(maxsize=None)
+def find_unit(unit_name):
+    unit = None
+
+    for candidate in units:
+        if unit_name == candidate.get_name():
+            unit = candidate
+            break
+
+        candidate_allowed_prefixes = candidate.get_allowed_prefixes()
+        candidate_allowed_inverse_prefixes = candidate.get_allowed_inverse_prefixes()
+
+        for unit_prefix in unit_prefixes:
+            if unit_prefix.symbol not in candidate_allowed_prefixes:
+                continue
+
+            if unit_name == candidate.get_name(prefix=unit_prefix):
+                unit = candidate.clone(prefix=unit_prefix)
+                break
+
+            for unit_inverse_prefix in unit_prefixes:
+                if unit_inverse_prefix.symbol not in candidate_allowed_inverse_prefixes:
+                    continue
+
+                if unit_name == candidate.get_name(prefix=unit_prefix, inverse_prefix=unit_inverse_prefix):
+                    unit = candidate.clone(prefix=unit_prefix, inverse_prefix=unit_inverse_prefix)
+                    break
+
+            if unit != None:
+                break
+
+        if unit != None:
+            break
+
+        for unit_inverse_prefix in unit_prefixes:
+            if unit_inverse_prefix.symbol not in candidate_allowed_inverse_prefixes:
+                continue
+
+            if unit_name == candidate.get_name(inverse_prefix=unit_inverse_prefix):
+                unit = candidate.clone(inverse_prefix=unit_inverse_prefix)
+                break
+
+        if unit != None:
+            break
+
+    return unit
+
 class Constant(object):
     def __init__(self, raw_data, constant_group):
         self.raw_data = raw_data
@@ -2359,7 +2798,7 @@ class Constant(object):
 
         check_name(raw_data[0], is_constant=True)
 
-        self.name = FlavoredName(raw_data[0])
+        self.name = get_flavored_name(raw_data[0])
 
     def get_constant_group(self): # parent
         return self.constant_group
@@ -2384,7 +2823,7 @@ class ConstantGroup(object):
 
         self.raw_data = raw_data
         self.device = device
-        self.name = FlavoredName(raw_data['name'])
+        self.name = get_flavored_name(raw_data['name'])
         self.constants = []
 
         for raw_constant in raw_data['constants']:
@@ -2420,16 +2859,32 @@ class ConstantGroup(object):
         return self.raw_data.get('is_virtual', False)
 
 class Element(object):
+    item_sizes = {
+        'int8':   1,
+        'uint8':  1,
+        'int16':  2,
+        'uint16': 2,
+        'int32':  4,
+        'uint32': 4,
+        'int64':  8,
+        'uint64': 8,
+        'float':  4,
+        'bool':   1,
+        'char':   1,
+        'string': 1
+    }
+
     def __init__(self, raw_data, packet, level, role):
         self.raw_data = raw_data
         self.packet = packet
         self.level = level
         self.role = role
         self._extra = []
+        self._size = None
 
         check_name(raw_data[0])
 
-        self.name = FlavoredName(raw_data[0])
+        self.name = get_flavored_name(raw_data[0])
 
         assert len(raw_data) == 4 or len(raw_data) == 5, raw_data
 
@@ -2504,48 +2959,7 @@ class Element(object):
             else:
                 assert self.get_type() not in ['float', 'bool', 'char', 'string'], raw_data
 
-                unit = None
-
-                for candidate in units:
-                    if unit_name == candidate.get_name():
-                        unit = candidate
-                        break
-
-                    candidate_allowed_prefixes = candidate.get_allowed_prefixes()
-                    candidate_allowed_inverse_prefixes = candidate.get_allowed_inverse_prefixes()
-
-                    for unit_prefix in unit_prefixes:
-                        if unit_prefix.symbol not in candidate_allowed_prefixes:
-                            continue
-
-                        if unit_name == candidate.get_name(prefix=unit_prefix):
-                            unit = candidate.clone(prefix=unit_prefix)
-                            break
-
-                        for unit_inverse_prefix in unit_prefixes:
-                            if unit_inverse_prefix.symbol not in candidate_allowed_inverse_prefixes:
-                                continue
-
-                            if unit_name == candidate.get_name(prefix=unit_prefix, inverse_prefix=unit_inverse_prefix):
-                                unit = candidate.clone(prefix=unit_prefix, inverse_prefix=unit_inverse_prefix)
-                                break
-
-                        if unit != None:
-                            break
-
-                    if unit != None:
-                        break
-
-                    for unit_inverse_prefix in unit_prefixes:
-                        if unit_inverse_prefix.symbol not in candidate_allowed_inverse_prefixes:
-                            continue
-
-                        if unit_name == candidate.get_name(inverse_prefix=unit_inverse_prefix):
-                            unit = candidate.clone(inverse_prefix=unit_inverse_prefix)
-                            break
-
-                    if unit != None:
-                        break
+                unit = find_unit(unit_name)
 
                 assert unit != None, unit_name
 
@@ -2733,7 +3147,7 @@ class Element(object):
                 if name == None:
                     return None
 
-                return FlavoredName(name).get(*args, **kwargs)
+                return get_flavored_name(name).get(*args, **kwargs)
 
         return self.name.get(*args, **kwargs)
 
@@ -2801,38 +3215,29 @@ class Element(object):
         if self.level == 'high':
             raise GeneratorError('Invalid call for high-level element')
 
-        item_sizes = {
-            'int8':   1,
-            'uint8':  1,
-            'int16':  2,
-            'uint16': 2,
-            'int32':  4,
-            'uint32': 4,
-            'int64':  8,
-            'uint64': 8,
-            'float':  4,
-            'bool':   1,
-            'char':   1,
-            'string': 1
-        }
-
-        return item_sizes[self.get_type()]
+        return Element.item_sizes[self.get_type()]
 
     def get_size(self):
-        if self.get_level() == 'high':
-            raise GeneratorError('Invalid call for high-level element')
+        if self._size == None:
+            if self.get_level() == 'high':
+                raise GeneratorError('Invalid call for high-level element')
 
-        cardinality = self.get_cardinality()
+            cardinality = self.get_cardinality()
 
-        if self.get_type() == 'bool':
-            return int(math.ceil(cardinality / 8.0))
+            if self.get_type() == 'bool':
+                self._size = int(math.ceil(cardinality / 8.0))
+            else:
+                self._size = self.get_item_size() * cardinality
 
-        return self.get_item_size() * cardinality
+        return self._size
 
     def format_value(self, value):
         raise GeneratorError("format_value() not implemented")
 
 class Stream(object):
+    __slots__ = ('raw_data', 'data_element', 'packet', 'direction', 'name',
+                 'length_element', 'chunk_offset_element', 'chunk_data_element')
+
     def __init__(self, raw_data, data_element, packet, direction):
         self.raw_data = raw_data
         self.data_element = data_element
@@ -2841,7 +3246,7 @@ class Stream(object):
 
         check_name(raw_data['name'])
 
-        self.name = FlavoredName(raw_data['name'])
+        self.name = get_flavored_name(raw_data['name'])
 
         if raw_data.get('single_chunk', False):
             if 'fixed_length' in raw_data:
@@ -2901,6 +3306,8 @@ class Stream(object):
         return self.raw_data.get('single_chunk', False)
 
 class StreamIn(Stream):
+    __slots__ = ()
+
     def __init__(self, raw_data, data_element, packet):
         Stream.__init__(self, raw_data, data_element, packet, 'in')
 
@@ -2908,6 +3315,8 @@ class StreamIn(Stream):
         return self.raw_data.get('short_write', False)
 
 class StreamOut(Stream):
+    __slots__ = ()
+
     def __init__(self, raw_data, data_element, packet):
         Stream.__init__(self, raw_data, data_element, packet, 'out')
 
@@ -2936,10 +3345,13 @@ class Packet(object):
         self.device = device
         self.elements = []
         self.high_level = {}
+        self._elements_cache = None # enabled once all elements are added
+        self._request_size = None
+        self._response_size = None
 
         check_name(raw_data['name'])
 
-        self.name = FlavoredName(raw_data['name'])
+        self.name = get_flavored_name(raw_data['name'])
 
         if raw_data['doc'][0] not in Packet.valid_doc_types:
             raise GeneratorError('Invalid packet doc type: ' + raw_data['doc'][0])
@@ -3072,6 +3484,8 @@ class Packet(object):
                 if constant_group != None and constant_group not in self.constant_groups:
                     self.constant_groups.append(constant_group)
 
+        self._elements_cache = {}
+
         self.add_high_level_callback_note()
 
     def add_high_level_callback_note(self):
@@ -3106,6 +3520,12 @@ class Packet(object):
         return self.name.get(*args, **kwargs)
 
     def get_elements(self, name=None, direction=None, high_level=False, role='all'):
+        key = (name, direction, high_level, role)
+
+        if self._elements_cache != None and key in self._elements_cache:
+            # return a copy, callers are allowed to modify the list
+            return list(self._elements_cache[key])
+
         if direction not in [None, 'in', 'out']:
             raise GeneratorError('Invalid element direction ' + direction)
 
@@ -3129,6 +3549,11 @@ class Packet(object):
 
             elements.append(element)
 
+        if self._elements_cache != None:
+            self._elements_cache[key] = elements
+
+            return list(elements)
+
         return elements
 
     def get_formatted_element_meta(self, type_func, name_func, include_function_id=False, high_level=False, **kwargs):
@@ -3246,20 +3671,22 @@ class Packet(object):
         return self.raw_data['function_id']
 
     def get_request_size(self):
-        size = 8 # header
+        if self._request_size == None:
+            self._request_size = 8 # header
 
-        for element in self.get_elements(direction='in'):
-            size += element.get_size()
+            for element in self.get_elements(direction='in'):
+                self._request_size += element.get_size()
 
-        return size
+        return self._request_size
 
     def get_response_size(self):
-        size = 8 # header
+        if self._response_size == None:
+            self._response_size = 8 # header
 
-        for element in self.get_elements(direction='out'):
-            size += element.get_size()
+            for element in self.get_elements(direction='out'):
+                self._response_size += element.get_size()
 
-        return size
+        return self._response_size
 
     def get_constant_groups(self):
         return self.constant_groups
@@ -4677,6 +5104,9 @@ class Generator:
                                     version[2],
                                     ' '*delta)
 
+    def is_up_to_date(self):
+        return False
+
     def prepare(self):
         pass
 
@@ -4686,6 +5116,9 @@ class Generator:
     def finish(self):
         pass
 
+    def update_output(self):
+        pass
+
 class DocGenerator(Generator):
     is_doc_generator = True
 
@@ -4722,14 +5155,83 @@ class DocGenerator(Generator):
 
 class BindingsGenerator(Generator):
     recreate_bindings_dir = True
+    supports_incremental = True
+    incremental_dependencies = [] # input files outside the root directory, relative to it
 
     def __init__(self, *args, **kwargs):
         Generator.__init__(self, *args, **kwargs)
 
         self.released_files = []
+        self.incremental_hash = None
+        self.incremental_state_path = os.path.join(self.get_root_dir(), '__pycache__', 'incremental.{0}.{1}.pickle'.format(self.get_bindings_name(), self.bindings_dir_name))
+
+    def get_incremental_hash(self):
+        hasher = hashlib.sha1('{0}:{1}:{2}'.format(self.get_language(), self.internal, get_device_configs_hash(self.get_root_dir(), self.get_config_name().under)).encode('utf-8'))
+        paths = set()
+
+        # the generator modules, including common.py and the modules of the
+        # device, packet and element classes
+        for cls in [type(self), self.get_device_class(), self.get_packet_class(), self.get_element_class(),
+                    self.get_constant_group_class(), self.get_constant_class(), self.get_example_class()]:
+            for base in cls.__mro__:
+                path = getattr(sys.modules.get(base.__module__), '__file__', None)
+
+                if path != None:
+                    paths.add(os.path.realpath(path))
+
+        # the templates and all other files in the root directory, except for
+        # the generated output
+        root_dir = self.get_root_dir()
+
+        for dirpath, dirnames, filenames in os.walk(root_dir):
+            if dirpath == root_dir:
+                dirnames[:] = [dirname for dirname in dirnames if re.match(r'^(bindings|doc|zip)(_[a-z0-9_]+)?(\.incremental)?$', dirname) == None]
+                filenames = [filename for filename in filenames if not filename.endswith('.zip') and not filename.endswith('.zip.manifest')]
+
+            dirnames[:] = [dirname for dirname in dirnames if dirname != '__pycache__' and not dirname.startswith('.')]
+
+            for filename in filenames:
+                paths.add(os.path.realpath(os.path.join(dirpath, filename)))
+
+        for dependency in self.incremental_dependencies:
+            paths.add(os.path.realpath(os.path.join(root_dir, dependency)))
+
+        for path in sorted(paths):
+            hasher.update('{0}:{1}'.format(path, hash_file(path)).encode('utf-8'))
+
+        return hasher.hexdigest()
+
+    def load_incremental_state(self):
+        try:
+            with open(self.incremental_state_path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return None # missing or broken state, regenerate everything
+
+    def is_up_to_date(self):
+        # bindings that share their directory with others cannot be tracked
+        if not enable_incremental or not self.supports_incremental or not self.recreate_bindings_dir:
+            return False
+
+        self.incremental_hash = self.get_incremental_hash()
+        state = self.load_incremental_state()
+
+        if state == None or state['hash'] != self.incremental_hash:
+            return False
+
+        for relative_path in state['files']:
+            if not os.path.exists(os.path.join(self.get_bindings_dir(), relative_path)):
+                return False
+
+        return True
 
     def prepare(self):
         if self.recreate_bindings_dir:
+            if self.incremental_hash != None:
+                # generate into a staging directory, update_output moves the
+                # changed files into the bindings directory afterwards
+                self.bindings_dir_name += '.incremental'
+
             recreate_dir(self.get_bindings_dir())
 
     def finish(self):
@@ -4737,6 +5239,20 @@ class BindingsGenerator(Generator):
             for released_file in self.released_files:
                 f.write(released_file + '\n')
 
+    def update_output(self):
+        if self.incremental_hash == None:
+            return
+
+        staging_dir = self.get_bindings_dir()
+        self.bindings_dir_name = self.bindings_dir_name[:-len('.incremental')]
+        state = self.load_incremental_state()
+        files = update_dir(staging_dir, self.get_bindings_dir(), state['files'] if state != None else None)
+
+        os.makedirs(os.path.dirname(self.incremental_state_path), exist_ok=True)
+
+        with open(self.incremental_state_path, 'wb') as f:
+            pickle.dump({'hash': self.incremental_hash, 'files': files}, f, pickle.HIGHEST_PROTOCOL)
+
 class ZipGenerator(Generator):
     recreate_zip_dir = True
 
@@ -4760,10 +5276,18 @@ class ZipGenerator(Generator):
             version = get_changelog_version(self.get_config_dir())
 
         zipname = '{0}_{1}_bindings_{2}_{3}_{4}.zip'.format(self.get_config_name().under, self.get_bindings_name(), *version)
+        zip_path = os.path.join(self.get_root_dir(), zipname)
+        manifest_path = get_zip_manifest_path(zip_path)
+
+        # write to temporary files first, so an interrupted run doesn't leave a
+        # truncated ZIP file or a manifest that doesn't match the ZIP file
+        manifest = create_reproducible_zip(source_path, zip_path + '.tmp')
+
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
 
-        with ChangedDirectory(source_path):
-            execute(['zip', '-q', '-r', zipname, '.'])
-            os.replace(zipname, os.path.join(self.get_root_dir(), zipname))
+        os.replace(zip_path + '.tmp', zip_path)
+        os.replace(manifest_path + '.tmp', manifest_path)
 
 class ExamplesGenerator(Generator):
     skip_existing_incomplete_example = True
@@ -4782,22 +5306,162 @@ class ExamplesGenerator(Generator):
             git_dir = os.path.join(override_git_dir, device.get_git_name())
         return os.path.join(git_dir, 'software', 'examples', self.get_bindings_name())
 
-def tester_worker(cookie, args, env, cwd, setup, teardown):
-    if setup != None:
-        setup()
+class GeneratorProfiler(object):
+    """
+    Records the wall time and peak memory of each subgenerate call and of each
+    generate(device) call within it. The generate(device) calls are also
+    profiled with cProfile, so that hotspots can be aggregated across all
+    devices. Peak memory is only recorded while tracemalloc is tracing.
+    """
+
+    def __init__(self, generator, binding):
+        self.generator = generator # bindings, doc, zip, etc
+        self.binding = binding
+        self.records = []
+        self.active_records = []
+        self.profile = cProfile.Profile()
+
+    def update_peak_memory(self):
+        # tracemalloc has a single peak value. it is added to all active
+        # records and reset, so nested measurements do not disturb each other
+        if not tracemalloc.is_tracing() or not hasattr(tracemalloc, 'reset_peak'): # reset_peak requires Python 3.9
+            return
+
+        peak_memory = tracemalloc.get_traced_memory()[1]
+
+        for record in self.active_records:
+            record['peak_memory'] = max(record['peak_memory'] or 0, peak_memory)
+
+        tracemalloc.reset_peak()
+
+    @contextlib.contextmanager
+    def measure(self, language, config_name, device=None):
+        record = {
+            'generator': self.generator,
+            'binding': self.binding,
+            'language': language,
+            'config': config_name,
+            'device': device,
+            'time': None,
+            'peak_memory': None
+        }
+
+        self.update_peak_memory()
+        self.active_records.append(record)
+
+        if device != None:
+            self.profile.enable()
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            record['time'] = time.perf_counter() - start
+
+            if device != None:
+                self.profile.disable()
+
+            self.update_peak_memory()
+            self.active_records.pop()
+            self.records.append(record)
+
+    def dump_stats(self, path):
+        self.profile.create_stats()
 
+        if len(self.profile.stats) == 0:
+            return False
+
+        self.profile.dump_stats(path)
+
+        return True
+
+def tester_worker(job):
+    index, cookie, args, env, cwd, setup, teardown = job
+    start = time.monotonic()
+
+    # a failing job is reported as a failed test, it must not stop the run
     try:
-        exit_code, output = check_output_and_error(args, env=env, cwd=cwd)
+        if setup != None:
+            setup()
+
+        try:
+            exit_code, output = check_output_and_error(args, env=env, cwd=cwd)
+        finally:
+            if teardown != None:
+                teardown()
     except Exception as e:
-        return cookie, None, 'Tester Exception: ' + str(e)
-    finally:
-        if teardown != None:
-            teardown()
+        return index, cookie, None, 'Tester Exception: ' + str(e), None
+
+    return index, cookie, exit_code, output, time.monotonic() - start
+
+def load_tester_state(path):
+    try:
+        with open(path, 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(state, dict):
+        return {}
+
+    return state
+
+def update_tester_state(path, updates, keep=None):
+    # merge with the current file, another tester might have updated it
+    state = load_tester_state(path)
+    state.update(updates)
+
+    if keep != None:
+        state = {key: value for key, value in state.items() if keep(value)}
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.' + os.path.split(path)[-1] + '.')
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f, indent=0, sort_keys=True)
+
+            os.replace(tmp_path, path)
+        except:
+            os.remove(tmp_path)
+            raise
+    except OSError:
+        pass # the state is only used to speed up the tests, don't fail them
+
+TESTER_CACHE_VERSION = 1
+TESTER_CACHE_MAX_AGE = 30 * 24 * 60 * 60 # seconds
 
-    return cookie, exit_code, output
+_toolchain_versions = {}
+
+def get_toolchain_version(executable):
+    if executable not in _toolchain_versions:
+        try:
+            exit_code, output = check_output_and_error([executable, '--version'])
+        except Exception:
+            exit_code, output = None, None
+
+        if exit_code != 0:
+            # fall back to the executable itself, an update changes its size or mtime
+            path = shutil.which(executable)
+
+            if path != None:
+                stat = os.stat(path)
+                output = '{0} {1} {2}'.format(os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+            else:
+                output = executable
+
+        _toolchain_versions[executable] = output
+
+    return _toolchain_versions[executable]
+
+def get_flat_name(name):
+    return re.sub('[^a-z0-9]', '', name.lower())
 
 class Tester(object):
-    PROCESSES = 8
+    PROCESSES = None # upper limit for the number of parallel jobs, None for no limit
 
     def __init__(self, name, extension, root_dir, subdirs=None, comment=None, extra_paths=None):
         version = get_changelog_version(root_dir)
@@ -4809,30 +5473,242 @@ class Tester(object):
         self.comment = comment
         self.extra_paths = extra_paths if extra_paths != None else []
         self.zipname = 'tinkerforge_{0}_bindings_{1}_{2}_{3}.zip'.format(name, *version)
+        self.tmp_dir = os.path.join('/tmp/tester/unpack', name)
+        self.scratch_base = os.path.join('/tmp/tester/scratch', name)
+        self.durations_path = os.path.join(root_dir, '__pycache__', 'tester_durations.json')
+        self.cache_path = os.path.join(root_dir, '__pycache__', 'tester_cache.json')
+        self.device_names = []
+        self.source_hashes = None
         self.test_count = 0
         self.success_count = 0
         self.failure_count = 0
-        self.pool = multiprocessing.dummy.Pool(processes=self.PROCESSES)
+        self.cached_count = 0
+        self.results = []
+        self.jobs = []
+        self.discovered_results = {} # by job index
+
+    def get_job_count(self):
+        if tester_jobs != None:
+            job_count = tester_jobs
+        else:
+            job_count = os.cpu_count() or 1
+
+        if self.PROCESSES != None:
+            job_count = min(job_count, self.PROCESSES)
 
+        return max(job_count, 1)
+
+    # the jobs are collected while the sources are discovered and then run
+    # longest-first by run_jobs, based on the durations of previous runs
     def execute(self, cookie, args, env=None, cwd=None, setup=None, teardown=None):
-        def callback(result):
-            self.handle_result(*result)
+        self.jobs.append((len(self.jobs), cookie, args, env, cwd, setup, teardown))
+
+    # for tests that are decided while the sources are discovered, e.g. skipped
+    # tests. the result is reported in discovery order like the other jobs
+    def add_result(self, cookie, exit_code, output):
+        self.discovered_results[len(self.jobs)] = exit_code, output
+        self.jobs.append((len(self.jobs), cookie, None, None, None, None, None))
+
+    def get_duration_key(self, cookie):
+        path = cookie[0]
+
+        if path.startswith(self.tmp_dir + os.sep):
+            path = os.path.relpath(path, self.tmp_dir)
+
+        if self.comment != None:
+            return '[{0}] {1}'.format(self.comment, path)
+        else:
+            return path
+
+    # returns the flat name of the device a file belongs to, that is the longest
+    # device name the flat name of the file starts with, e.g. bricklet_io4 for
+    # BrickletIO4.java and bricklet_io4_async.py, but not for bricklet_io4_v2.c
+    def get_device_name(self, filename):
+        flat_name = get_flat_name(os.path.splitext(filename)[0])
+
+        for device_name in self.device_names:
+            if flat_name.startswith(device_name):
+                return device_name
+
+        return None
+
+    # hashes the unpacked bindings sources, grouped by the device they belong
+    # to. the devices are taken from the examples/<category>/<device>
+    # directories, all files that don't belong to a device are shared
+    def hash_sources(self):
+        device_names = set()
+        examples_dir = os.path.join(self.tmp_dir, 'examples')
+
+        if os.path.isdir(examples_dir):
+            for category in os.listdir(examples_dir):
+                if os.path.isdir(os.path.join(examples_dir, category)):
+                    for device in os.listdir(os.path.join(examples_dir, category)):
+                        device_names.add(get_flat_name(category + device))
+
+        self.device_names = sorted(device_names, key=len, reverse=True)
+
+        shared_hash = hashlib.sha1()
+        device_hashes = {}
+
+        for root, dirs, files in os.walk(self.tmp_dir):
+            dirs.sort()
+
+            if root == self.tmp_dir and 'examples' in dirs:
+                dirs.remove('examples')
+
+            for name in sorted(files):
+                path = os.path.join(root, name)
+
+                if path == os.path.join(self.tmp_dir, self.zipname):
+                    continue
+
+                device_name = self.get_device_name(name)
+
+                if device_name != None:
+                    digest = device_hashes.setdefault(device_name, hashlib.sha1())
+                else:
+                    digest = shared_hash
+
+                digest.update(os.path.relpath(path, self.tmp_dir).encode('utf-8') + b'\0')
+                digest.update(hash_file(path).encode('utf-8') + b'\0')
+
+        self.source_hashes = {device_name: digest.hexdigest() for device_name, digest in device_hashes.items()}
+        self.source_hashes[None] = shared_hash.hexdigest()
+
+    def get_source_hash(self, path):
+        relative_path = os.path.relpath(path, self.tmp_dir).split(os.sep)
+
+        if relative_path[0] == '..':
+            device_name = None # extra path
+        elif len(relative_path) > 3 and relative_path[0] == 'examples':
+            device_name = get_flat_name(relative_path[1] + relative_path[2])
+        else:
+            device_name = self.get_device_name(relative_path[-1])
+
+        if device_name == None or device_name not in self.source_hashes:
+            # the test might depend on every source file
+            device_hashes = [source_hash for device_name, source_hash in self.source_hashes.items() if device_name != None]
+
+            return ','.join(sorted(device_hashes) + [self.source_hashes[None]])
+
+        return self.source_hashes[device_name] + ',' + self.source_hashes[None]
+
+    # returns the command line without the parts that change from run to run,
+    # subclasses can override this to remove more of them
+    def get_cache_args(self, args):
+        def normalize(arg):
+            arg = re.sub(re.escape(self.scratch_base) + r'/[0-9]{4}_', '<scratch>/', arg)
+
+            return arg.replace(self.tmp_dir, '<tmp>')
 
-        self.pool.apply_async(tester_worker, args=(cookie, args, env, cwd, setup, teardown), callback=callback)
+        return [normalize(arg) for arg in args]
+
+    def get_cache_key(self, job):
+        _, cookie, args, env, cwd, _, _ = job
+        path = cookie[0]
+
+        if self.source_hashes == None or not os.path.isfile(path):
+            return None
+
+        key = [TESTER_CACHE_VERSION,
+               type(self).__name__,
+               self.name,
+               self.comment,
+               self.get_cache_args(args),
+               sorted(self.get_cache_args(['{0}={1}'.format(*item) for item in env.items()])) if env != None else None,
+               self.get_cache_args([cwd])[0] if cwd != None else None,
+               get_toolchain_version(args[0]),
+               hash_file(path),
+               self.get_source_hash(path)]
+
+        return hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+
+    def run_jobs(self):
+        durations = load_tester_state(self.durations_path)
+        cache = load_tester_state(self.cache_path) if enable_tester_cache else {}
+        new_durations = {}
+        new_cache = {}
+        cache_keys = {}
+        results = {}
+        next_index = 0
+        jobs = []
+
+        for job in self.jobs:
+            index, cookie, teardown = job[0], job[1], job[6]
+
+            if index in self.discovered_results:
+                exit_code, output = self.discovered_results[index]
+                results[index] = cookie, exit_code, output, False
+                continue
+
+            if enable_tester_cache:
+                cache_keys[index] = self.get_cache_key(job)
+
+            if cache_keys.get(index) in cache:
+                new_cache[cache_keys[index]] = time.time()
+                results[index] = cookie, 0, '', True
+
+                if teardown != None:
+                    teardown()
+            else:
+                jobs.append(job)
+
+        unknown_duration = float('inf') # jobs without a recorded duration run first
+        jobs = sorted(jobs, key=lambda job: durations.get(self.get_duration_key(job[1]), unknown_duration), reverse=True)
+        pool = multiprocessing.dummy.Pool(processes=self.get_job_count())
+
+        # the jobs finish in arbitrary order, but their results are printed
+        # in discovery order to keep the output of each test together
+        def print_results():
+            nonlocal next_index
+
+            while next_index in results:
+                cookie, exit_code, output, cached = results.pop(next_index)
+                success = self.handle_result(cookie, exit_code, output, cached=cached)
+
+                if success and not cached and cache_keys.get(next_index) != None:
+                    new_cache[cache_keys[next_index]] = time.time()
+
+                next_index += 1
+
+        try:
+            print_results()
+
+            for index, cookie, exit_code, output, duration in pool.imap_unordered(tester_worker, jobs):
+                results[index] = cookie, exit_code, output, False
+
+                if duration != None:
+                    new_durations[self.get_duration_key(cookie)] = round(duration, 3)
+
+                print_results()
+        finally:
+            pool.terminate()
+            pool.join()
+
+        self.jobs = []
+        self.discovered_results = {}
+
+        if len(new_durations) > 0:
+            update_tester_state(self.durations_path, new_durations)
+
+        if len(new_cache) > 0:
+            oldest = time.time() - TESTER_CACHE_MAX_AGE
+
+            update_tester_state(self.cache_path, new_cache, keep=lambda last_used: last_used > oldest)
 
     def handle_source(self, tmp_dir, scratch_dir, path, extra):
         self.test_count += 1
         self.test((path,), tmp_dir, scratch_dir, path, extra)
 
-    def handle_result(self, cookie, exit_code, output):
-        if exit_code == None: # FIXME: add better handling
-            if len(output) > 0:
-                print(output)
-
-            sys.exit(1)
-
+    def handle_result(self, cookie, exit_code, output, cached=False):
         path = cookie[0]
-        success = self.check_success(exit_code, output)
+
+        if cached:
+            success = True
+        elif exit_code == None: # the job itself failed, e.g. the compiler is missing
+            success = False
+        else:
+            success = self.check_success(exit_code, output)
 
         if self.comment != None:
             print('>>> [{0}] testing {1}'.format(self.comment, path))
@@ -4844,20 +5720,28 @@ class Tester(object):
         if len(output) > 0:
             print(output)
 
+        self.results.append({'path': path, 'success': success, 'cached': cached, 'output': output})
+
+        if cached:
+            self.cached_count += 1
+            message = 'test succeeded (cached)'
+        else:
+            message = 'test succeeded' if success else 'test failed'
+
+        if success:
+            self.success_count += 1
+        else:
+            self.failure_count += 1
+
         if sys.stdout.isatty(): # only print color codes if stdout is not piped
             if success:
-                self.success_count += 1
-                print('\033[01;32m>>> test succeeded\033[0m\n')
+                print('\033[01;32m>>> {0}\033[0m\n'.format(message))
             else:
-                self.failure_count += 1
-                print('\033[01;31m>>> test failed\033[0m\n')
+                print('\033[01;31m>>> {0}\033[0m\n'.format(message))
         else:
-            if success:
-                self.success_count += 1
-                print('>>> test succeeded\n')
-            else:
-                self.failure_count += 1
-                print('>>> test failed\n')
+            print('>>> {0}\n'.format(message))
+
+        return success
 
     def after_unzip(self, tmp_dir):
         return True
@@ -4869,8 +5753,8 @@ class Tester(object):
         return exit_code == 0
 
     def run(self):
-        tmp_dir = os.path.join('/tmp/tester/unpack', self.name)
-        scratch_base = os.path.join('/tmp/tester/scratch', self.name)
+        tmp_dir = self.tmp_dir
+        scratch_base = self.scratch_base
 
         # Make temporary directory
         if os.path.exists(tmp_dir):
@@ -4900,6 +5784,10 @@ class Tester(object):
 
             print('>>> unpacking {0} done\n'.format(self.zipname))
 
+            # hash the sources before after_unzip can change them
+            if enable_tester_cache:
+                self.hash_sources()
+
             if not self.after_unzip(tmp_dir):
                 return False
 
@@ -4931,16 +5819,29 @@ class Tester(object):
                 os.makedirs(scratch_dir)
                 self.handle_source(tmp_dir, scratch_dir, extra_path, True)
 
-            self.pool.close()
-            self.pool.join()
+            self.run_jobs()
 
         # report
+        tester_reports.append({'name': self.name,
+                               'comment': self.comment,
+                               'tmp_dir': self.tmp_dir,
+                               'test_count': self.test_count,
+                               'success_count': self.success_count,
+                               'cached_count': self.cached_count,
+                               'failure_count': self.failure_count,
+                               'results': self.results})
+
+        if self.cached_count > 0:
+            cached = ' ({0} cached)'.format(self.cached_count)
+        else:
+            cached = ''
+
         if self.comment != None:
-            print('### [{0}] {1} file(s) tested, {2} test(s) succeeded, {3} failure(s) occurred'
-                  .format(self.comment, self.test_count, self.success_count, self.failure_count))
+            print('### [{0}] {1} file(s) tested, {2} test(s) succeeded{3}, {4} failure(s) occurred'
+                  .format(self.comment, self.test_count, self.success_count, cached, self.failure_count))
         else:
-            print('### {0} file(s) tested, {1} test(s) succeeded, {2} failure(s) occurred'
-                  .format(self.test_count, self.success_count, self.failure_count))
+            print('### {0} file(s) tested, {1} test(s) succeeded{2}, {3} failure(s) occurred'
+                  .format(self.test_count, self.success_count, cached, self.failure_count))
 
         return self.failure_count == 0
 
@@ -4957,7 +5858,7 @@ class ChangedDirectory(object):
     def __exit__(self, type_, value, traceback):
         os.chdir(self.previous_path)
 
-def dockerize(bindings_name, script_path, add_internal_argument=False, add_arguments=None, mount_m2_volume=False, mount_gnupg_volume=False):
+def dockerize(bindings_name, script_path, add_internal_argument=False, add_incremental_argument=False, add_tester_arguments=False, add_arguments=None, mount_m2_volume=False, mount_gnupg_volume=False):
     parser = argparse.ArgumentParser()
 
     parser.add_argument('-d', '--docker', action='store_true', help='run this script in docker container')
@@ -4969,6 +5870,13 @@ def dockerize(bindings_name, script_path, add_internal_argument=False, add_argum
         parser.add_argument('-i', '--internal', action='store_true', help='handle all devices as if they were released')
         parser.add_argument('-I', '--no-internal', action='store_false', help='handle all devices according to their released marker [default]', dest='internal')
 
+    if add_incremental_argument:
+        parser.add_argument('--incremental', action='store_true', help='skip bindings whose configs, templates and generator modules did not change and leave files untouched that only differ in their generation date')
+
+    if add_tester_arguments:
+        parser.add_argument('-j', '--jobs', type=int, help='number of tests to run in parallel [default: number of CPUs]')
+        parser.add_argument('--no-cache', action='store_false', help='run all tests, even if their sources, command and toolchain did not change since they last passed', dest='cache')
+
     if add_arguments != None:
         add_arguments(parser)
 
@@ -4977,6 +5885,17 @@ def dockerize(bindings_name, script_path, add_internal_argument=False, add_argum
     global enable_verbose
     enable_verbose = args.verbose
 
+    if add_incremental_argument:
+        global enable_incremental
+        enable_incremental = args.incremental
+
+    if add_tester_arguments:
+        global tester_jobs
+        tester_jobs = args.jobs
+
+        global enable_tester_cache
+        enable_tester_cache = args.cache
+
     if args.docker:
         if shutil.which('docker') == None:
             print('error: docker is not installed')
@@ -12,6 +12,9 @@ import shutil
 import filecmp
 import socket
 import zipfile
+import json
+import hashlib
+import multiprocessing.dummy
 import tempfile
 import glob
 import re
@@ -38,49 +41,118 @@ from generators import common
 
 doc_git = 'doc'
 
-def text_files_are_not_the_same(src_file, dest_path):
-    dest_file = os.path.join(dest_path, src_file.split('/')[-1])
+class FileSync(object):
+    """
+    Copies files unless their destination already has the same content,
+    ignoring the "automatically generated on" date. The hashes of the
+    normalized content are kept in a manifest, keyed by path and validated by
+    size and mtime, so unchanged files are skipped without reading them.
+    """
+
+    def __init__(self, manifest_path, dry_run):
+        self.manifest_path = manifest_path
+        self.dry_run = dry_run
+        self.manifest = {}
+        self.new_manifest = {}
+        self.copies = []
+        self.copy_count = 0
+        self.remove_count = 0
 
-    try:
-        with open(src_file, 'r') as f:
-            lines1 = f.readlines()
+        try:
+            with open(manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            pass
 
-        with open(dest_file, 'r') as f:
-            lines2 = f.readlines()
-    except:
-        return True
+    def get_hash(self, path, transform=None):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None, None
 
-    if len(lines1) != len(lines2):
-        return True
+        entry = self.manifest.get(path)
 
-    t = 'This file was automatically generated on'
-    for l1, l2 in zip(lines1, lines2):
-        if l1 != l2:
-            if t in l1 and t in l2:
-                continue
+        if transform == None and entry != None and entry[:2] == [st.st_size, st.st_mtime_ns]:
+            return entry, entry[2]
 
-            return True
+        with open(path, 'rb') as f:
+            data = f.read()
 
-    return False
+        if transform != None:
+            data = transform(data)
 
-def files_are_not_the_same(src_file, dest_path):
-    if src_file.endswith('.vi') or src_file.endswith('.vi.png'):
-        dest_file = os.path.join(dest_path, src_file.split('/')[-1])
+        digest = hashlib.sha256(common.re_generated_date.sub(b'', data)).hexdigest()
 
-        try:
-            with open(src_file, 'rb') as f:
-                data1 = f.read()
+        return [st.st_size, st.st_mtime_ns, digest], digest
 
-            with open(dest_file, 'rb') as f:
-                data2 = f.read()
-        except:
-            return True
+    # queues src_file to be copied into dest_dir by the next sync call, the
+    # optional transform is applied to the content of src_file before
+    def add(self, src_file, dest_dir, label=None, transform=None):
+        name = os.path.split(src_file)[-1]
 
-        return data1 != data2
-    else:
-        return text_files_are_not_the_same(src_file, dest_path)
+        self.copies.append((src_file, os.path.join(dest_dir, name), label if label != None else name, transform))
+
+    def check_and_copy(self, copy):
+        src_file, dest_file, _, transform = copy
+        src_entry, src_hash = self.get_hash(src_file, transform)
+        dest_entry, dest_hash = self.get_hash(dest_file)
+        changed = src_hash != dest_hash
+
+        if changed and not self.dry_run:
+            if transform == None:
+                shutil.copy(src_file, dest_file)
+            else:
+                with open(src_file, 'rb') as f:
+                    data = transform(f.read())
+
+                with open(dest_file, 'wb') as f:
+                    f.write(data)
+
+            st = os.stat(dest_file)
+            dest_entry = [st.st_size, st.st_mtime_ns, src_hash]
+
+        return changed, src_entry, dest_entry
+
+    # copies all queued files in parallel and prints the changed ones in order
+    def sync(self):
+        with multiprocessing.dummy.Pool() as pool:
+            results = pool.map(self.check_and_copy, self.copies)
+
+        for (src_file, dest_file, label, transform), (changed, src_entry, dest_entry) in zip(self.copies, results):
+            if src_entry != None and transform == None:
+                self.new_manifest[src_file] = src_entry
+
+            if dest_entry != None:
+                self.new_manifest[dest_file] = dest_entry
+
+            if changed:
+                self.copy_count += 1
+                print(' * {0}'.format(label))
+
+        self.copies = []
+
+    def remove(self, path, label=None):
+        self.remove_count += 1
+
+        if label != None:
+            print(' * {0}'.format(label))
+
+        if not self.dry_run:
+            os.remove(path)
+
+    def makedirs(self, path):
+        if not self.dry_run:
+            os.makedirs(path, exist_ok=True)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+
+        with open(self.manifest_path + '.tmp', 'w') as f:
+            json.dump(self.new_manifest, f, sort_keys=True)
+
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
 
-def copy_uc_files():
+def copy_uc_files(file_sync):
     verbose = False
     esp32_software_dir = os.path.realpath(os.path.join(generators_dir, '..', 'esp32-firmware', 'software'))
     generators_uc_dir = os.path.realpath(os.path.join(generators_dir, 'uc'))
@@ -89,7 +161,7 @@ def copy_uc_files():
     hal_arduino_esp32_brick_target_dir = os.path.join(esp32_software_dir, 'src', 'modules', 'esp32_brick', 'hal_arduino_esp32_brick')
     hal_arduino_esp32_ethernet_brick_target_dir = os.path.join(esp32_software_dir, 'src', 'modules', 'esp32_ethernet_brick', 'hal_arduino_esp32_ethernet_brick')
 
-    def copy_files(source_dir, target_dir, exclude_pattern=None, include_pattern=None, patch_include=False, header_marker=None):
+    def copy_files(source_dir, target_dir, exclude_pattern=None, include_pattern=None, patch_include=False):
         source_names = []
 
         for name in sorted(os.listdir(source_dir)):
@@ -117,57 +189,27 @@ def copy_uc_files():
             if verbose:
                 print('remove', target_path)
 
-            os.remove(target_path)
+            file_sync.remove(target_path)
 
-        for name in source_names:
-            source_path = os.path.join(source_dir, name)
-            target_path = os.path.join(target_dir, name)
-
-            if os.path.exists(target_path):
-                with open(source_path, 'r') as f:
-                    source_lines = list(f.readlines())
-
-                with open(target_path, 'r') as f:
-                    target_lines = list(f.readlines())
-
-                if len(source_lines) == len(target_lines):
-                    for source_line, target_line in zip(source_lines, target_lines):
-                        if patch_include:
-                            target_line = target_line.replace('#include "bindings/', '#include "../bindings/')
-
-                        if source_line != target_line:
-                            if header_marker != None and source_line.startswith(header_marker) and target_line.startswith(header_marker):
-                                continue
-
-                            break
-                    else:
-                        if verbose:
-                            print('skipping', source_path)
-
-                        continue
-
-            print(' * {0}'.format(name))
-
-            if verbose:
-                print('copy', source_path, target_path)
+        if patch_include:
+            transform = lambda data: data.replace(b'#include "../bindings/', b'#include "bindings/')
+        else:
+            transform = None
 
-            with open(source_path, 'rb') as f:
-                data = f.read()
-
-            if patch_include:
-                data = data.replace(b'#include "../bindings/', b'#include "bindings/')
+        for name in source_names:
+            file_sync.add(os.path.join(source_dir, name), target_dir, transform=transform)
 
-            with open(target_path, 'wb') as f:
-                f.write(data)
+        file_sync.sync()
 
     copy_files(generators_uc_dir, bindings_target_dir, include_pattern=r'^.*\.(h|c)$', exclude_pattern=r'^(brick(let)?_.*\.(h|c)|display_names.c|example_.*\.c)$')
     copy_files(os.path.join(generators_uc_dir, 'bindings'), bindings_target_dir, include_pattern=r'^(brick(let)?_.*\.(h|c)|display_names.c)$',
-               exclude_pattern=r'^bricklet_stream_test\.(h|c)$', header_marker=' * This file was automatically generated on ')
+               exclude_pattern=r'^bricklet_stream_test\.(h|c)$')
     copy_files(os.path.join(generators_uc_dir, 'net_arduino_esp32'), net_arduino_esp32_target_dir, include_pattern=r'^.*\.(h|c|cpp)$')
     copy_files(os.path.join(generators_uc_dir, 'hal_arduino_esp32_brick'), hal_arduino_esp32_brick_target_dir, include_pattern=r'^.*\.(h|c|cpp)$', patch_include=True)
     copy_files(os.path.join(generators_uc_dir, 'hal_arduino_esp32_ethernet_brick'), hal_arduino_esp32_ethernet_brick_target_dir, include_pattern=r'^.*\.(h|c|cpp)$', patch_include=True)
 
-def main():
+def main(args):
+    file_sync = FileSync(os.path.join(generators_dir, '__pycache__', 'copy_all_manifest.json'), args.dry_run)
     path = generators_dir
     start_path = os.path.realpath(os.path.join(generators_dir, '..'))
     brickv_path_bindings = os.path.join(start_path, 'brickv/src/brickv/bindings')
@@ -191,11 +233,8 @@ def main():
             print('')
             print('Copying ip_connection to {0}:'.format(tool_name))
 
-            src_file = os.path.join(path, 'python', 'ip_connection.py')
-
-            if files_are_not_the_same(src_file, tool_path):
-                shutil.copy(src_file, tool_path)
-                print(' * ip_connection.py')
+            file_sync.add(os.path.join(path, 'python', 'ip_connection.py'), tool_path)
+            file_sync.sync()
 
             print('')
             print('Copying Python bindings to {0}:'.format(tool_name))
@@ -210,16 +249,14 @@ def main():
                 files.remove('device_factory_all.py')
 
             for f in files:
-                src_file = os.path.join(src_file_path, f)
+                file_sync.add(os.path.join(src_file_path, f), tool_path)
 
-                if files_are_not_the_same(src_file, tool_path):
-                    shutil.copy(src_file, tool_path)
-                    print(' * {0}'.format(f))
+            file_sync.sync()
 
         if 'uc' in bindings:
             print('')
             print('Copying uC bindings to esp32-firmware:')
-            copy_uc_files()
+            copy_uc_files(file_sync)
 
     doc_copy = [('_Brick_', 'Bricks'),
                 ('_Bricklet_', 'Bricklets'),
@@ -236,9 +273,10 @@ def main():
             dest_dir = os.path.join(start_path, doc_path.format(lang), t[1])
 
             if not os.path.exists(dest_dir):
-                os.makedirs(dest_dir)
-
-            to_delete[lang][t[1]] = os.listdir(dest_dir)
+                file_sync.makedirs(dest_dir)
+                to_delete[lang][t[1]] = []
+            else:
+                to_delete[lang][t[1]] = os.listdir(dest_dir)
 
         for binding in bindings:
             path_binding = os.path.join(path, binding)
@@ -264,9 +302,9 @@ def main():
                             except:
                                 pass
 
-                        if files_are_not_the_same(src_file, dest_path):
-                            shutil.copy(src_file, dest_path)
-                            print(' * {0}'.format(f))
+                        file_sync.add(src_file, dest_path)
+
+        file_sync.sync()
 
     if socket.gethostname() != 'tinkerforge.com':
         for lang in ['en', 'de']:
@@ -277,11 +315,10 @@ def main():
             dest_dir = os.path.join(start_path, doc_path.format(lang), t[1])
 
             if not os.path.exists(dest_dir):
-                os.makedirs(dest_dir)
+                file_sync.makedirs(dest_dir)
 
-            if files_are_not_the_same(src_file, dest_dir):
-                shutil.copy(src_file, dest_dir)
-                print(' * Tinkerforge.js')
+            file_sync.add(src_file, dest_dir)
+            file_sync.sync()
     else:
         tmp_dir = tempfile.mkdtemp()
 
@@ -297,11 +334,10 @@ def main():
             dest_dir = os.path.join(start_path, doc_path.format(lang), t[1])
 
             if not os.path.exists(dest_dir):
-                os.makedirs(dest_dir)
+                file_sync.makedirs(dest_dir)
 
-            if files_are_not_the_same(src_file, dest_dir):
-                shutil.copy(src_file, dest_dir)
-                print(' * Tinkerforge.js')
+            file_sync.add(src_file, dest_dir)
+            file_sync.sync()
 
         shutil.rmtree(tmp_dir)
 
@@ -352,7 +388,7 @@ def main():
             target_dir = os.path.join('/srv/web/com.tinkerforge.download/downloads/3d', category, device)
 
             if not os.path.exists(target_dir):
-                os.makedirs(target_dir)
+                file_sync.makedirs(target_dir)
 
             for model in models:
                 source = os.path.join(hardware_dir, model)
@@ -360,12 +396,14 @@ def main():
                 target_base = os.path.join(target_dir, base)
 
                 if not os.path.exists(target_base):
-                    os.makedirs(target_base)
+                    file_sync.makedirs(target_base)
 
                 target = os.path.join(target_dir, model)
 
                 if not os.path.exists(target):
-                    os.symlink(source, target)
+                    if not args.dry_run:
+                        os.symlink(source, target)
+
                     print(' * {0}/{1}/{2}'.format(category, device, model))
 
     print('')
@@ -384,15 +422,23 @@ def main():
                     continue
 
                 p = os.path.join(doc_git, lang, "source", "Software", t[1], x)
-                os.remove(os.path.join(start_path, p))
-                print(' * {0}'.format(p))
+                file_sync.remove(os.path.join(start_path, p), label=p)
+
+    file_sync.save()
 
     print('')
+
+    if args.dry_run:
+        print('Dry run, {0} file(s) would be copied, {1} file(s) would be removed'.format(file_sync.copy_count, file_sync.remove_count))
+    else:
+        print('{0} file(s) copied, {1} file(s) removed'.format(file_sync.copy_count, file_sync.remove_count))
+
     print('\033[01;35m>>> done\033[0m')
 
     return 0
 
 if __name__ == '__main__':
-    common.dockerize('', __file__)
+    def add_arguments(parser):
+        parser.add_argument('-n', '--dry-run', action='store_true', help='only print what would be copied and removed')
 
-    sys.exit(main())
+    sys.exit(main(common.dockerize('', __file__, add_arguments=add_arguments)))
@@ -31,7 +31,6 @@ if sys.hexversion < 0x3040000:
     sys.exit(1)
 
 import os
-import re
 import tempfile
 import shutil
 import argparse
@@ -118,15 +117,6 @@ def main():
 
             shutil.copytree(doc_path, doc_old_path)
     else:
-        rst_header = re.compile(r"""^@@ -1,6 \+1,6 @@
-     \.\.
-      #############################################################
-    - # This file was automatically generated on [0-9]{4}-[0-9]{2}-[0-9]{2}\.      #
-    \+ # This file was automatically generated on [0-9]{4}-[0-9]{2}-[0-9]{2}\.      #
-      #                                                           #
-      # If you have a bugfix for this file and want to commit it, #
-      # please fix the bug in the generator\. You can find a link  #$""")
-
         tmp = tempfile.mkdtemp()
 
         print('using tmpdir ' + tmp)
@@ -151,52 +141,15 @@ def main():
 
             print('diffing ' + binding)
 
-            if os.system('bash -c "pushd {0} > /dev/null && diff -ru15 doc_old/ doc/ > {1}/diff_{2}.diff; popd > /dev/null"'.format(path, tmp, binding)) != 0:
-                print('error: diff old vs new failed')
-                return 1
-
-            with open(os.path.join(tmp, 'diff_{0}.diff'.format(binding)), 'r') as f:
-                diffs = [[[]]] # list of diffs as lists of lines
-
-                for line in f.readlines():
-                    if line.startswith('diff ') or line[0] not in ['@', '-', '+', ' ']:
-                        diffs.append([[]])
-
-                    if line.startswith('@@ '):
-                        diffs[-1].append([])
-
-                    diffs[-1][-1].append(line)
-
-            filtered = []
-
-            for diff in diffs:
-                filtered_lines = []
-
-                for lines in diff:
-                    if len(lines) == 0:
-                        continue
-
-                    hunk = ''.join(lines)
-
-                    if not rst_header.match(hunk):
-                        filtered_lines += lines
-                    else:
-                        filtered_lines += [lines[0].rstrip() + ' // dropped header hunk\n']
-
-                if len(filtered_lines) == 0:
-                    continue
+            # files that only differ in their generation date header are
+            # skipped before diffing
+            diff = common.diff_trees(os.path.join(path, 'doc_old'), os.path.join(path, 'doc'), binding + '/doc_old', binding + '/doc', ['-u15'])
 
-                if len(filtered_lines) == 4 and \
-                   filtered_lines[0].startswith('diff -U 15 -r ') and \
-                   filtered_lines[1].startswith('--- ') and \
-                   filtered_lines[2].startswith('+++ ') and \
-                   filtered_lines[3].endswith('// dropped header hunk\n'):
-                    filtered += [filtered_lines[0].rstrip() + ' // dropped header diff\n']
-                else:
-                    filtered += filtered_lines
+            if len(diff) == 0:
+                print('no changes in ' + binding)
 
             with open(os.path.join(tmp, 'diff.diff'), 'a') as f:
-                f.writelines(filtered)
+                f.write(diff)
 
         if os.system('bash -ce "{0} {1}/diff.diff"'.format(args.diff_tool, tmp)) != 0:
             print('{0} diff.diff failed'.format(args.diff_tool))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+# Redistribution and use in source and binary forms of this file,
+# with or without modification, are permitted. See the Creative
+# Commons Zero (CC0 1.0) License for more details.
+
+import sys
+
+if sys.hexversion < 0x3070000:
+    raise Exception('Python >= 3.7 required')
+
+import socket
+import struct
+import threading
+import time
+import argparse
+
+from ip_connection import IPConnection
+
+HOST = 'localhost'
+PORT = 5557
+
+def create_enumerate_packet(index):
+    payload = struct.pack('<8s8sc3B3BHB', 'UID{0}'.format(index % 10000).encode('ascii'), b'0', b'a',
+                          1, 0, 0, 2, 0, 0, 21112, IPConnection.ENUMERATION_TYPE_AVAILABLE)
+    header = struct.pack('<IBBBB', 0, 8 + len(payload), IPConnection.CALLBACK_ENUMERATE, 0, 0)
+
+    return header + payload
+
+def run_server(server, data):
+    client, _ = server.accept()
+
+    try:
+        client.sendall(data)
+
+        # keep the connection open until the IP Connection disconnects
+        while len(client.recv(8192)) > 0:
+            pass
+    except socket.error:
+        pass
+    finally:
+        client.close()
+
+def measure(port, count):
+    data = b''.join(create_enumerate_packet(i) for i in range(count))
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind((HOST, port))
+    server.listen(1)
+
+    server_thread = threading.Thread(target=run_server, args=(server, data), daemon=True)
+    server_thread.start()
+
+    ipcon = IPConnection()
+    done = threading.Event()
+    received = [0]
+
+    # count packets as they leave the receive loop instead of dispatching
+    # them, so that only the framing of the receive loop is measured
+    def counting_handle_response(packet):
+        received[0] += 1
+
+        if received[0] == count:
+            done.set()
+
+    ipcon.handle_response = counting_handle_response
+
+    start = time.monotonic()
+
+    ipcon.connect(HOST, port)
+    done.wait()
+
+    elapsed = time.monotonic() - start
+
+    ipcon.disconnect()
+    server_thread.join()
+    server.close()
+
+    return count / elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-p', '--port', type=int, default=PORT, help='port for the packet source')
+    parser.add_argument('-c', '--count', type=int, default=200000, help='number of packets per run')
+    parser.add_argument('-r', '--runs', type=int, default=3, help='number of runs')
+
+    args = parser.parse_args()
+
+    for run in range(args.runs):
+        print('run {0}: {1:10.0f} packets/s'.format(run + 1, measure(args.port, args.count)))
+
+if __name__ == '__main__':
+    main()
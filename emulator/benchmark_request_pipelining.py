@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+# Redistribution and use in source and binary forms of this file,
+# with or without modification, are permitted. See the Creative
+# Commons Zero (CC0 1.0) License for more details.
+
+import sys
+
+if sys.hexversion < 0x3070000:
+    raise Exception('Python >= 3.7 required')
+
+import asyncio
+import threading
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from brick_daemon import BrickDaemon
+from common_test_bricklet_skeleton import CommonTestBrickletSkeleton
+from ip_connection import IPConnection
+from bricklet_common_test import BrickletCommonTest
+
+HOST = 'localhost'
+PORT = 5556
+UID = 'CTV1'
+
+class CommonTestBricklet(CommonTestBrickletSkeleton):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._int8_value = 0
+
+    async def set_int8_value(self, value):
+        self._int8_value = value
+
+    async def get_int8_value(self):
+        return self._int8_value
+
+async def delayed_pipe(reader, writer, delay):
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    async def forward():
+        while True:
+            due, data = await queue.get()
+            remaining = due - loop.time()
+
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+            writer.write(data)
+            await writer.drain()
+
+    forward_task = asyncio.create_task(forward())
+
+    try:
+        while True:
+            data = await reader.read(8192)
+
+            if len(data) == 0:
+                break
+
+            queue.put_nowait((loop.time() + delay, data))
+    finally:
+        forward_task.cancel()
+        writer.close()
+
+async def handle_proxy_client(client_reader, client_writer, brickd_port, delay):
+    brickd_reader, brickd_writer = await asyncio.open_connection('localhost', brickd_port)
+
+    await asyncio.gather(delayed_pipe(client_reader, brickd_writer, delay),
+                         delayed_pipe(brickd_reader, client_writer, delay),
+                         return_exceptions=True)
+
+def run_brick_daemon(port, latency, ready, stop):
+    async def main():
+        if latency > 0:
+            brickd_port = port + 1
+        else:
+            brickd_port = port
+
+        async with BrickDaemon('localhost', brickd_port) as brickd:
+            await brickd.add_device(CommonTestBricklet(UID))
+
+            if latency > 0:
+                # emulate the round trip time of an Ethernet or WIFI Extension
+                # by delaying each direction by half of the latency
+                proxy = await asyncio.start_server(lambda r, w: handle_proxy_client(r, w, brickd_port, latency / 2000),
+                                                   'localhost', port)
+            else:
+                proxy = None
+
+            ready.set()
+
+            while not stop.is_set():
+                await asyncio.sleep(0.1)
+
+            if proxy != None:
+                proxy.close()
+
+    asyncio.run(main())
+
+def measure(ct, count, workers):
+    start = time.monotonic()
+
+    if workers == 1:
+        for _ in range(count):
+            ct.get_int8_value()
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(lambda _: ct.get_int8_value(), range(count)):
+                pass
+
+    return count / (time.monotonic() - start)
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-p', '--port', type=int, default=PORT, help='port for the emulated Brick Daemon')
+    parser.add_argument('-c', '--count', type=int, default=5000, help='number of requests per run')
+    parser.add_argument('-w', '--workers', type=int, default=15, help='number of concurrent callers in pipelined mode')
+    parser.add_argument('-l', '--latency', type=float, default=0, help='emulated round trip time in milliseconds')
+
+    args = parser.parse_args()
+
+    ready = threading.Event()
+    stop = threading.Event()
+    brickd_thread = threading.Thread(target=run_brick_daemon, args=(args.port, args.latency, ready, stop), daemon=True)
+
+    brickd_thread.start()
+    ready.wait()
+
+    ipcon = IPConnection()
+    ct = BrickletCommonTest(UID, ipcon)
+
+    ipcon.connect(HOST, args.port)
+
+    try:
+        ct.get_identity() # warm up and resolve device identifier check
+
+        ipcon.set_request_pipelining(False)
+        serial = measure(ct, args.count, 1)
+        print('serial:                      {0:8.0f} requests/s'.format(serial))
+
+        ipcon.set_request_pipelining(False)
+        threaded = measure(ct, args.count, args.workers)
+        print('{0:2} threads, not pipelined:   {1:8.0f} requests/s'.format(args.workers, threaded))
+
+        ipcon.set_request_pipelining(True)
+        pipelined = measure(ct, args.count, args.workers)
+        print('{0:2} threads, pipelined:       {1:8.0f} requests/s ({2:.1f}x)'.format(args.workers, pipelined, pipelined / serial))
+    finally:
+        ipcon.disconnect()
+        stop.set()
+        brickd_thread.join()
+
+if __name__ == '__main__':
+    main()
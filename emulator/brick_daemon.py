@@ -10,7 +10,6 @@ if sys.hexversion < 0x3070000:
     raise Exception('Python >= 3.7 required')
 
 import struct
-import math
 import re
 import asyncio
 import logging
@@ -89,9 +88,6 @@ def _exception_to_str(e):
 def _get_uid_number_from_data(data):
     return struct.unpack('<I', data[0:4])[0]
 
-def _get_length_from_data(data):
-    return struct.unpack('<B', data[4:5])[0]
-
 def _get_function_id_from_data(data):
     return struct.unpack('<B', data[5:6])[0]
 
@@ -101,93 +97,145 @@ def _get_sequence_number_from_data(data):
 def _get_response_expected_from_data(data):
     return (struct.unpack('<B', data[6:7])[0] >> 3) & 0x01
 
-def _unpack_payload(format_, payload):
-    values = []
-
-    for f in format_:
-        o = f
+class _PayloadCodec:
+    _KIND_VALUE = 0
+    _KIND_ARRAY = 1
+    _KIND_BOOL_ARRAY = 2
+    _KIND_CHAR = 3
+    _KIND_CHAR_ARRAY = 4
+    _KIND_STRING = 5
+
+    def __init__(self, format_):
+        # compile the format list into one struct.Struct for the whole payload
+        # plus (kind, start, count) steps that map the struct values to the
+        # payload values
+        self._format = format_
+        self._steps = []
+        self._plain = True # all values are single values without conversion
+        struct_format = '<'
+        start = 0
+
+        for f in format_:
+            t = f[-1]
 
-        if '!' in f:
             if len(f) > 1:
-                f = '{0}B'.format(int(math.ceil(int(f.replace('!', '')) / 8)))
+                count = int(f[:-1])
             else:
-                f = 'B'
-
-        f = '<' + f
-        length = struct.calcsize(f)
-        x = struct.unpack(f, payload[:length])
+                count = None
+
+            if t == '!':
+                if count == None:
+                    kind = self._KIND_VALUE
+                    struct_format += '?'
+                    size = 1
+                else:
+                    kind = self._KIND_BOOL_ARRAY
+                    size = (count + 7) // 8
+                    struct_format += '{0}B'.format(size)
+            elif t == 'c':
+                if count == None:
+                    kind = self._KIND_CHAR
+                    struct_format += 'B'
+                    size = 1
+                else:
+                    kind = self._KIND_CHAR_ARRAY
+                    struct_format += '{0}B'.format(count)
+                    size = count
+            elif t == 's':
+                kind = self._KIND_STRING
+                struct_format += f
+                size = 1
+            elif count == None:
+                kind = self._KIND_VALUE
+                struct_format += t
+                size = 1
+            else:
+                kind = self._KIND_ARRAY
+                struct_format += f
+                size = count
 
-        if '!' in o:
-            y = []
+            if kind != self._KIND_VALUE:
+                self._plain = False
 
-            if len(o) > 1:
-                for i in range(int(o.replace('!', ''))):
-                    y.append(x[i // 8] & (1 << (i % 8)) != 0)
-            else:
-                y.append(x[0] != 0)
+            self._steps.append((kind, start, count))
+            start += size
 
-            x = tuple(y)
+        self._struct = struct.Struct(struct_format)
 
-        if 'c' in f:
-            if len(x) > 1:
-                values.append(tuple(map(lambda item: chr(ord(item)), x)))
-            else:
-                values.append(chr(ord(x[0])))
-        elif 's' in f:
-            s = ''.join(map(chr, x[0]))
+    def unpack(self, payload):
+        if len(payload) > self._struct.size:
+            raise ValueError('Non-unpacked payload left over')
 
-            i = s.find('\x00')
+        values = self._struct.unpack(payload)
 
-            if i >= 0:
-                s = s[:i]
+        if self._plain:
+            return values
 
-            values.append(s)
-        elif len(x) > 1:
-            values.append(x)
-        else:
-            values.append(x[0])
+        result = []
 
-        payload = payload[length:]
+        for kind, start, count in self._steps:
+            if kind == self._KIND_VALUE:
+                result.append(values[start])
+            elif kind == self._KIND_ARRAY:
+                result.append(values[start:start + count])
+            elif kind == self._KIND_BOOL_ARRAY:
+                result.append(tuple(values[start + i // 8] & (1 << (i % 8)) != 0 for i in range(count)))
+            elif kind == self._KIND_CHAR:
+                result.append(chr(values[start]))
+            elif kind == self._KIND_CHAR_ARRAY:
+                result.append(tuple(map(chr, values[start:start + count])))
+            else: # _KIND_STRING
+                result.append(values[start].split(b'\x00', 1)[0].decode('latin-1'))
 
-    if len(payload) != 0:
-        raise ValueError('Non-unpacked payload left over')
+        return tuple(result)
 
-    return tuple(values)
+    def pack(self, values):
+        if len(self._steps) != len(values):
+            raise ValueError('Mismatch between pack-format length and payload length: {0} != {1}'.format(len(self._steps), len(values)))
 
-def _pack_payload(format_, values):
-    payload = b''
+        if self._plain:
+            return self._struct.pack(*values)
 
-    if len(format_) != len(values):
-        raise ValueError('Mismatch between pack-format length and payload length: {0} != {1}'.format(len(format_), len(values)))
+        flat_values = []
 
-    for f, v in zip(format_, values):
-        if '!' in f:
-            if len(f) > 1:
-                if int(f.replace('!', '')) != len(v):
+        for (kind, _, count), v in zip(self._steps, values):
+            if kind == self._KIND_VALUE:
+                flat_values.append(v)
+            elif kind == self._KIND_BOOL_ARRAY:
+                if count != len(v):
                     raise ValueError('Incorrect bool-list length in pack-format')
 
-                p = [0] * int(math.ceil(len(v) / 8))
+                p = [0] * ((count + 7) // 8)
 
                 for i, b in enumerate(v):
                     if b:
                         p[i // 8] |= 1 << (i % 8)
 
-                payload += struct.pack('<{0}B'.format(len(p)), *p)
+                flat_values.extend(p)
+            elif kind == self._KIND_STRING:
+                flat_values.append(bytes(map(ord, v)))
+            elif kind == self._KIND_CHAR:
+                flat_values.append(ord(v))
             else:
-                payload += struct.pack('<?', v)
-        elif 'c' in f:
-            if len(f) > 1:
-                payload += struct.pack('<' + f, *list(map(lambda char: bytes([ord(char)]), v)))
-            else:
-                payload += struct.pack('<' + f, bytes([ord(v)]))
-        elif 's' in f:
-            payload += struct.pack('<' + f, bytes(map(ord, v)))
-        elif len(f) > 1:
-            payload += struct.pack('<' + f, *v)
-        else:
-            payload += struct.pack('<' + f, v)
+                if count != len(v):
+                    raise struct.error('pack expected {0} items for packing (got {1})'.format(count, len(v)))
+
+                if kind == self._KIND_CHAR_ARRAY:
+                    flat_values.extend(map(ord, v))
+                else:
+                    flat_values.extend(v)
+
+        return self._struct.pack(*flat_values)
 
-    return payload
+@functools.lru_cache(maxsize=None)
+def _get_payload_codec(format_):
+    return _PayloadCodec(format_)
+
+def _unpack_payload(format_, payload):
+    return _get_payload_codec(tuple(format_)).unpack(payload)
+
+def _pack_payload(format_, values):
+    return _get_payload_codec(tuple(format_)).pack(values)
 
 def _create_error_response(request, error_code):
     header = list(request.data[:8])
@@ -669,7 +717,8 @@ class Device(metaclass=MetaDevice):
             request_task = None
             pending_requests = []
             response_task = None
-            pending_data = b''
+            pending_data = bytearray()
+            pending_start = 0
 
             while not disconnect:
                 if request_task == None:
@@ -729,28 +778,32 @@ class Device(metaclass=MetaDevice):
 
                         break
 
+                    # parse complete responses in-place and drop them from the
+                    # pending data once per read instead of once per response
+                    del pending_data[:pending_start]
                     pending_data += data
+                    pending_start = 0
 
                     while True:
-                        if len(pending_data) < 8:
+                        if len(pending_data) - pending_start < 8:
                             break # wait for complete header
 
-                        length = _get_length_from_data(pending_data)
+                        length = pending_data[pending_start + 4]
 
                         if length < 8 or length > 80:
                             if self._debug:
                                 _logger.error('Received response data {0}... with invalid length {1}, disconnecting passthrough {2}'
-                                              .format(pending_data[:80], length, passthrough_signature))
+                                              .format(bytes(pending_data[pending_start:pending_start + 80]), length, passthrough_signature))
 
                             disconnect = True
 
                             break
 
-                        if len(pending_data) < length:
+                        if len(pending_data) - pending_start < length:
                             break # wait for complete response
 
-                        response_data = pending_data[:length]
-                        pending_data = pending_data[length:]
+                        response_data = bytes(pending_data[pending_start:pending_start + length])
+                        pending_start += length
                         uid_number = _get_uid_number_from_data(response_data)
 
                         if uid_number == 0:
@@ -1156,7 +1209,8 @@ class BrickDaemon:
 
         disconnect = False
         request_task = None
-        pending_data = b''
+        pending_data = bytearray()
+        pending_start = 0
         response_task = None
         response_queue = asyncio.Queue()
 
@@ -1194,28 +1248,32 @@ class BrickDaemon:
 
                     break
 
+                # parse complete requests in-place and drop them from the
+                # pending data once per read instead of once per request
+                del pending_data[:pending_start]
                 pending_data += data
+                pending_start = 0
 
                 while True:
-                    if len(pending_data) < 8:
+                    if len(pending_data) - pending_start < 8:
                         break # wait for complete header
 
-                    length = _get_length_from_data(pending_data)
+                    length = pending_data[pending_start + 4]
 
                     if length < 8 or length > 80:
                         if self._debug:
                             _logger.error('Received request data {0}... with invalid length {1}, disconnecting client {2}'
-                                          .format(pending_data[:80], length, client_signature))
+                                          .format(bytes(pending_data[pending_start:pending_start + 80]), length, client_signature))
 
                         disconnect = True
 
                         break
 
-                    if len(pending_data) < length:
+                    if len(pending_data) - pending_start < length:
                         break # wait for complete request
 
-                    request_data = pending_data[:length]
-                    pending_data = pending_data[length:]
+                    request_data = bytes(pending_data[pending_start:pending_start + length])
+                    pending_start += length
 
                     if _get_sequence_number_from_data(request_data) == 0:
                         if self._debug:
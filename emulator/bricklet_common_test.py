@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 #############################################################
-# This file was automatically generated on 2021-10-19.      #
+# This file was automatically generated on 2026-10-18.      #
 #                                                           #
-# Python Bindings Version 2.1.29                            #
+# Python Bindings Version 2.1.32                            #
 #                                                           #
 # If you have a bugfix for this file and want to commit it, #
 # please fix the bug in the generator. You can find a link  #
@@ -14,14 +14,17 @@
 from collections import namedtuple
 
 try:
-    from .ip_connection import Device, IPConnection, Error, create_char, create_char_list, create_string, create_chunk_data
+    from .ip_connection import Device, IPConnection, Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data, get_payload_codec
 except (ValueError, ImportError):
-    from ip_connection import Device, IPConnection, Error, create_char, create_char_list, create_string, create_chunk_data
+    try:
+        from ip_connection import Device, IPConnection, Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data, get_payload_codec
+    except (ValueError, ImportError):
+        from tinkerforge.ip_connection import Device, IPConnection, Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data, get_payload_codec
 
 GetIdentity = namedtuple('Identity', ['uid', 'connected_uid', 'position', 'hardware_version', 'firmware_version', 'device_identifier'])
 
 class BrickletCommonTest(Device):
-    """
+    r"""
 
     """
 
@@ -35,9 +38,13 @@ class BrickletCommonTest(Device):
     FUNCTION_GET_INT8_VALUE = 2
     FUNCTION_GET_IDENTITY = 255
 
+    REQUEST_CODEC_SET_INT8_VALUE = get_payload_codec('b') # internal
+    RESPONSE_CODEC_GET_INT8_VALUE = get_payload_codec('b') # internal
+    RESPONSE_CODEC_GET_IDENTITY = get_payload_codec('8s 8s c 3B 3B H') # internal
+
 
     def __init__(self, uid, ipcon):
-        """
+        r"""
         Creates an object with the unique device ID *uid* and adds it to
         the IP Connection *ipcon*.
         """
@@ -53,25 +60,25 @@ class BrickletCommonTest(Device):
         ipcon.add_device(self)
 
     def set_int8_value(self, value):
-        """
+        r"""
 
         """
         self.check_validity()
 
         value = int(value)
 
-        self.ipcon.send_request(self, BrickletCommonTest.FUNCTION_SET_INT8_VALUE, (value,), 'b', 0, '')
+        self.ipcon.send_request(self, BrickletCommonTest.FUNCTION_SET_INT8_VALUE, (value,), BrickletCommonTest.REQUEST_CODEC_SET_INT8_VALUE, 0, '')
 
     def get_int8_value(self):
-        """
+        r"""
 
         """
         self.check_validity()
 
-        return self.ipcon.send_request(self, BrickletCommonTest.FUNCTION_GET_INT8_VALUE, (), '', 9, 'b')
+        return self.ipcon.send_request(self, BrickletCommonTest.FUNCTION_GET_INT8_VALUE, (), '', 9, BrickletCommonTest.RESPONSE_CODEC_GET_INT8_VALUE)
 
     def get_identity(self):
-        """
+        r"""
         Returns the UID, the UID where the Bricklet is connected to,
         the position, the hardware and firmware version as well as the
         device identifier.
@@ -83,6 +90,6 @@ class BrickletCommonTest(Device):
         The device identifier numbers can be found :ref:`here <device_identifier>`.
         |device_identifier_constant|
         """
-        return GetIdentity(*self.ipcon.send_request(self, BrickletCommonTest.FUNCTION_GET_IDENTITY, (), '', 33, '8s 8s c 3B 3B H'))
+        return GetIdentity(*self.ipcon.send_request(self, BrickletCommonTest.FUNCTION_GET_IDENTITY, (), '', 33, BrickletCommonTest.RESPONSE_CODEC_GET_IDENTITY))
 
 CommonTest = BrickletCommonTest # for backward compatibility
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#############################################################
+# This file was automatically generated on 2026-10-18.      #
+#                                                           #
+# Python Bindings Version 2.1.32                            #
+#                                                           #
+# If you have a bugfix for this file and want to commit it, #
+# please fix the bug in the generator. You can find a link  #
+# to the generators git repository on tinkerforge.com       #
+#############################################################
+
+#### __DEVICE_IS_NOT_RELEASED__ ####
+
+try:
+    from .ip_connection import Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data
+    from .ip_connection_async import AsyncDevice
+    from .bricklet_common_test import BrickletCommonTest, GetIdentity
+except (ValueError, ImportError):
+    try:
+        from ip_connection import Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data
+        from ip_connection_async import AsyncDevice
+        from bricklet_common_test import BrickletCommonTest, GetIdentity
+    except (ValueError, ImportError):
+        from tinkerforge.ip_connection import Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data
+        from tinkerforge.ip_connection_async import AsyncDevice
+        from tinkerforge.bricklet_common_test import BrickletCommonTest, GetIdentity
+
+class AsyncBrickletCommonTest(AsyncDevice, BrickletCommonTest):
+    r"""
+
+    """
+
+    async def set_int8_value(self, value):
+        r"""
+        Coroutine version of :meth:`BrickletCommonTest.set_int8_value`.
+        """
+        await self.check_validity()
+
+        value = int(value)
+
+        await self.ipcon.send_request(self, BrickletCommonTest.FUNCTION_SET_INT8_VALUE, (value,), BrickletCommonTest.REQUEST_CODEC_SET_INT8_VALUE, 0, '')
+
+    async def get_int8_value(self):
+        r"""
+        Coroutine version of :meth:`BrickletCommonTest.get_int8_value`.
+        """
+        await self.check_validity()
+
+        return await self.ipcon.send_request(self, BrickletCommonTest.FUNCTION_GET_INT8_VALUE, (), '', 9, BrickletCommonTest.RESPONSE_CODEC_GET_INT8_VALUE)
+
+    async def get_identity(self):
+        r"""
+        Coroutine version of :meth:`BrickletCommonTest.get_identity`.
+        """
+        return GetIdentity(*await self.ipcon.send_request(self, BrickletCommonTest.FUNCTION_GET_IDENTITY, (), '', 33, BrickletCommonTest.RESPONSE_CODEC_GET_IDENTITY))
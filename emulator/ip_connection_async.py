@@ -0,0 +1,834 @@
+# -*- coding: utf-8 -*-
+# Redistribution and use in source and binary forms of this file,
+# with or without modification, are permitted. See the Creative
+# Commons Zero (CC0 1.0) License for more details.
+
+import sys
+
+if sys.hexversion < 0x03070000:
+    raise Exception('Python >= 3.7 required for the asyncio IP Connection')
+
+import struct
+import time
+import os
+import math
+import hmac
+import hashlib
+import inspect
+import asyncio
+
+try:
+    from .ip_connection import IPConnection, Device, BrickDaemon, Error, pack_payload, unpack_payload, \
+                               get_uid_from_data, get_function_id_from_data, get_sequence_number_from_data, \
+                               get_device_display_name
+except (ValueError, ImportError):
+    from ip_connection import IPConnection, Device, BrickDaemon, Error, pack_payload, unpack_payload, \
+                              get_uid_from_data, get_function_id_from_data, get_sequence_number_from_data, \
+                              get_device_display_name
+
+class CallbackStream(object):
+    """
+    Asynchronous iterator over the values of a callback. A callback with a
+    single parameter yields the value itself, a callback with multiple
+    parameters yields a tuple of all values. If *max_size* is greater than
+    zero and the stream is not consumed fast enough then new values are
+    dropped until there is space again, see get_dropped_count.
+
+    Use it with *async with* to close it automatically, otherwise call close
+    after use.
+    """
+
+    # internal
+    def __init__(self, callback_streams, callback_id, max_size):
+        self.callback_streams = callback_streams
+        self.callback_id = callback_id
+        self.queue = asyncio.Queue(max_size)
+        self.dropped_count = 0
+
+        callback_streams.setdefault(callback_id, []).append(self)
+
+    def close(self):
+        """
+        Stops delivering values to this stream.
+        """
+
+        streams = self.callback_streams.get(self.callback_id, [])
+
+        if self in streams:
+            streams.remove(self)
+
+            if len(streams) == 0:
+                del self.callback_streams[self.callback_id]
+
+    # internal
+    def put(self, values):
+        if len(values) == 1:
+            value = values[0]
+        else:
+            value = values
+
+        try:
+            self.queue.put_nowait(value)
+        except asyncio.QueueFull:
+            self.dropped_count += 1 # drop value, consumer is too slow
+
+    def get_dropped_count(self):
+        """
+        Returns the number of values that were dropped because the stream
+        was full, since this stream was created.
+        """
+
+        return self.dropped_count
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class AsyncDevice(object):
+    """
+    Mixin that turns a device class of the Python bindings into an asyncio
+    device class. The generated Async<Device> classes combine it with the
+    normal device class and override all functions with coroutines.
+    """
+
+    # internal
+    def __init__(self, uid, ipcon):
+        super().__init__(uid, ipcon)
+
+        self.device_identifier_lock = asyncio.Lock()
+        self.request_lock = asyncio.Lock()
+        self.stream_lock = asyncio.Lock()
+        self.callback_streams = {}
+
+    def callback_stream(self, callback_id, max_size=0):
+        """
+        Returns a :class:`CallbackStream` that yields the values of the
+        callback with the given *callback_id*. This works independent of
+        a function registered with register_callback.
+        """
+
+        return CallbackStream(self.callback_streams, callback_id, max_size)
+
+    # internal
+    async def check_validity(self):
+        if self.replaced:
+            raise Error(Error.DEVICE_REPLACED, 'Device has been replaced')
+
+        if self.device_identifier < 0:
+            return
+
+        if self.device_identifier_check == Device.DEVICE_IDENTIFIER_CHECK_MATCH:
+            return
+
+        async with self.device_identifier_lock:
+            if self.device_identifier_check == Device.DEVICE_IDENTIFIER_CHECK_PENDING:
+                device_identifier = (await self.ipcon.send_request(self, 255, (), '', 33, '8s 8s c 3B 3B H'))[5] # <device>.get_identity
+
+                if device_identifier == self.device_identifier:
+                    self.device_identifier_check = Device.DEVICE_IDENTIFIER_CHECK_MATCH
+                else:
+                    self.device_identifier_check = Device.DEVICE_IDENTIFIER_CHECK_MISMATCH
+                    self.wrong_device_display_name = get_device_display_name(device_identifier)
+
+            if self.device_identifier_check == Device.DEVICE_IDENTIFIER_CHECK_MISMATCH:
+                raise Error(Error.WRONG_DEVICE_TYPE,
+                            'UID {0} belongs to a {1} instead of the expected {2}'
+                            .format(self.uid_string, self.wrong_device_display_name, self.device_display_name))
+
+class AsyncBrickDaemon(AsyncDevice, BrickDaemon):
+    async def get_authentication_nonce(self):
+        return await self.ipcon.send_request(self, BrickDaemon.FUNCTION_GET_AUTHENTICATION_NONCE, (), '', 12, '4B')
+
+    async def authenticate(self, client_nonce, digest):
+        await self.ipcon.send_request(self, BrickDaemon.FUNCTION_AUTHENTICATE, (client_nonce, digest), '4B 20B', 0, '')
+
+class AsyncIPConnection(object):
+    """
+    asyncio variant of the :class:`IPConnection`. Instead of a receive, a
+    callback and a disconnect probe thread per connection it runs tasks on
+    the current event loop, so one event loop can drive many connections.
+
+    Use it together with the generated Async<Device> classes. All functions
+    that communicate with the Brick Daemon or WIFI/Ethernet Extension are
+    coroutines. Registered callback functions can be normal functions or
+    coroutine functions. The connection and its devices have to be created
+    while the event loop that is going to use them is running.
+    """
+
+    FUNCTION_ENUMERATE = IPConnection.FUNCTION_ENUMERATE
+    FUNCTION_DISCONNECT_PROBE = IPConnection.FUNCTION_DISCONNECT_PROBE
+
+    CALLBACK_ENUMERATE = IPConnection.CALLBACK_ENUMERATE
+    CALLBACK_CONNECTED = IPConnection.CALLBACK_CONNECTED
+    CALLBACK_DISCONNECTED = IPConnection.CALLBACK_DISCONNECTED
+
+    BROADCAST_UID = IPConnection.BROADCAST_UID
+
+    # enumeration_type parameter to the enumerate callback
+    ENUMERATION_TYPE_AVAILABLE = IPConnection.ENUMERATION_TYPE_AVAILABLE
+    ENUMERATION_TYPE_CONNECTED = IPConnection.ENUMERATION_TYPE_CONNECTED
+    ENUMERATION_TYPE_DISCONNECTED = IPConnection.ENUMERATION_TYPE_DISCONNECTED
+
+    # connect_reason parameter to the connected callback
+    CONNECT_REASON_REQUEST = IPConnection.CONNECT_REASON_REQUEST
+    CONNECT_REASON_AUTO_RECONNECT = IPConnection.CONNECT_REASON_AUTO_RECONNECT
+
+    # disconnect_reason parameter to the disconnected callback
+    DISCONNECT_REASON_REQUEST = IPConnection.DISCONNECT_REASON_REQUEST
+    DISCONNECT_REASON_ERROR = IPConnection.DISCONNECT_REASON_ERROR
+    DISCONNECT_REASON_SHUTDOWN = IPConnection.DISCONNECT_REASON_SHUTDOWN
+
+    # returned by get_connection_state
+    CONNECTION_STATE_DISCONNECTED = IPConnection.CONNECTION_STATE_DISCONNECTED
+    CONNECTION_STATE_CONNECTED = IPConnection.CONNECTION_STATE_CONNECTED
+    CONNECTION_STATE_PENDING = IPConnection.CONNECTION_STATE_PENDING
+
+    QUEUE_EXIT = IPConnection.QUEUE_EXIT
+    QUEUE_META = IPConnection.QUEUE_META
+    QUEUE_PACKET = IPConnection.QUEUE_PACKET
+
+    DISCONNECT_PROBE_INTERVAL = IPConnection.DISCONNECT_PROBE_INTERVAL
+
+    class PendingRequest(object):
+        def __init__(self, key):
+            self.key = key # (uid, function_id, sequence_number)
+            self.response_future = asyncio.get_event_loop().create_future()
+
+    # internal, shared with the IPConnection
+    parse_response = IPConnection.parse_response
+    create_packet_header = IPConnection.create_packet_header
+    unpack_device_callbacks = IPConnection.unpack_device_callbacks
+
+    def __init__(self):
+        """
+        Creates an asyncio IP Connection object that can be used to enumerate
+        the available devices. It is also required for the constructor of
+        the Async<Device> classes.
+        """
+
+        self.host = None
+        self.port = None
+        self.timeout = 2.5
+        self.request_pipelining = False
+        self.numpy_arrays = False
+        self.auto_reconnect = True
+        self.auto_reconnect_allowed = False
+        self.auto_reconnect_pending = False
+        self.next_sequence_number = 0
+        self.pending_requests = {} # by (uid, function_id, sequence_number)
+        self.pending_request_removed = asyncio.Event()
+        self.authentication_lock = asyncio.Lock() # protects authentication handshake
+        self.next_authentication_nonce = 0 # protected by authentication_lock
+        self.devices = {}
+        self.registered_callbacks = {}
+        self.callback_streams = {}
+        self.reader = None # protected by socket_lock
+        self.writer = None # protected by socket_lock
+        self.socket_id = 0 # protected by socket_lock
+        self.socket_lock = asyncio.Lock()
+        self.socket_send_lock = asyncio.Lock()
+        self.receive_task = None
+        self.callback_queue = None
+        self.callback_task = None
+        self.packet_dispatch_allowed = False
+        self.disconnect_probe_flag = False
+        self.disconnect_probe_task = None
+        self.brickd = AsyncBrickDaemon('2', self)
+
+    async def connect(self, host, port):
+        """
+        Creates a TCP/IP connection to the given *host* and *port*. The host
+        and port can point to a Brick Daemon or to a WIFI/Ethernet Extension.
+
+        Devices can only be controlled when the connection was established
+        successfully.
+
+        Returns when the connection is established and raises an exception if
+        there is no Brick Daemon or WIFI/Ethernet Extension listening at the
+        given host and port.
+        """
+
+        async with self.socket_lock:
+            if self.writer is not None:
+                raise Error(Error.ALREADY_CONNECTED,
+                            'Already connected to {0}:{1}'.format(self.host, self.port))
+
+            self.host = host
+            self.port = port
+
+            await self.connect_unlocked(False)
+
+    async def disconnect(self):
+        """
+        Disconnects the TCP/IP connection from the Brick Daemon or the
+        WIFI/Ethernet Extension.
+        """
+
+        async with self.socket_lock:
+            self.auto_reconnect_allowed = False
+
+            if self.auto_reconnect_pending:
+                # abort potentially pending auto reconnect
+                self.auto_reconnect_pending = False
+            else:
+                if self.writer is None:
+                    raise Error(Error.NOT_CONNECTED, 'Not connected')
+
+                await self.disconnect_unlocked()
+
+            # end callback task
+            callback_queue = self.callback_queue
+            callback_task = self.callback_task
+            self.callback_queue = None
+            self.callback_task = None
+
+        # do this outside of socket_lock to allow calling (dis-)connect from
+        # the callbacks while waiting for the callback task here
+        callback_queue.put_nowait((AsyncIPConnection.QUEUE_META,
+                                   (AsyncIPConnection.CALLBACK_DISCONNECTED,
+                                    AsyncIPConnection.DISCONNECT_REASON_REQUEST, None)))
+        callback_queue.put_nowait((AsyncIPConnection.QUEUE_EXIT, None))
+
+        if asyncio.current_task() is not callback_task:
+            await callback_task
+
+    async def authenticate(self, secret):
+        """
+        Performs an authentication handshake with the connected Brick Daemon or
+        WIFI/Ethernet Extension. If the handshake succeeds the connection switches
+        from non-authenticated to authenticated state and communication can
+        continue as normal. If the handshake fails then the connection gets closed.
+        Authentication can fail if the wrong secret was used or if authentication
+        is not enabled at all on the Brick Daemon or the WIFI/Ethernet Extension.
+
+        For more information about authentication see
+        https://www.tinkerforge.com/en/doc/Tutorials/Tutorial_Authentication/Tutorial.html
+        """
+
+        try:
+            secret_bytes = secret.encode('ascii')
+        except UnicodeEncodeError:
+            raise Error(Error.NON_ASCII_CHAR_IN_SECRET, 'Authentication secret contains non-ASCII characters')
+
+        async with self.authentication_lock:
+            if self.next_authentication_nonce == 0:
+                try:
+                    self.next_authentication_nonce = struct.unpack('<I', os.urandom(4))[0]
+                except NotImplementedError:
+                    subseconds, seconds = math.modf(time.time())
+                    seconds = int(seconds)
+                    subseconds = int(subseconds * 1000000)
+                    self.next_authentication_nonce = ((seconds << 26 | seconds >> 6) & 0xFFFFFFFF) + subseconds + os.getpid()
+
+            server_nonce = await self.brickd.get_authentication_nonce()
+            client_nonce = struct.unpack('<4B', struct.pack('<I', self.next_authentication_nonce))
+            self.next_authentication_nonce = (self.next_authentication_nonce + 1) % (1 << 32)
+
+            h = hmac.new(secret_bytes, digestmod=hashlib.sha1)
+
+            h.update(struct.pack('<4B', *server_nonce))
+            h.update(struct.pack('<4B', *client_nonce))
+
+            digest = struct.unpack('<20B', h.digest())
+            h = None
+
+            await self.brickd.authenticate(client_nonce, digest)
+
+    def get_connection_state(self):
+        """
+        Can return the following states:
+
+        - CONNECTION_STATE_DISCONNECTED: No connection is established.
+        - CONNECTION_STATE_CONNECTED: A connection to the Brick Daemon or
+          the WIFI/Ethernet Extension is established.
+        - CONNECTION_STATE_PENDING: IP Connection is currently trying to
+          connect.
+        """
+
+        if self.writer is not None:
+            return AsyncIPConnection.CONNECTION_STATE_CONNECTED
+        elif self.auto_reconnect_pending:
+            return AsyncIPConnection.CONNECTION_STATE_PENDING
+        else:
+            return AsyncIPConnection.CONNECTION_STATE_DISCONNECTED
+
+    def set_auto_reconnect(self, auto_reconnect):
+        """
+        Enables or disables auto-reconnect. If auto-reconnect is enabled,
+        the IP Connection will try to reconnect to the previously given
+        host and port, if the connection is lost.
+
+        Default value is *True*.
+        """
+
+        self.auto_reconnect = bool(auto_reconnect)
+
+        if not self.auto_reconnect:
+            # abort potentially pending auto reconnect
+            self.auto_reconnect_allowed = False
+
+    def get_auto_reconnect(self):
+        """
+        Returns *true* if auto-reconnect is enabled, *false* otherwise.
+        """
+
+        return self.auto_reconnect
+
+    def set_timeout(self, timeout):
+        """
+        Sets the timeout in seconds for getters and for setters for which the
+        response expected flag is activated.
+
+        Default timeout is 2.5.
+        """
+
+        timeout = float(timeout)
+
+        if timeout < 0:
+            raise ValueError('Timeout cannot be negative')
+
+        self.timeout = timeout
+
+    def get_timeout(self):
+        """
+        Returns the timeout as set by set_timeout.
+        """
+
+        return self.timeout
+
+    def set_request_pipelining(self, request_pipelining):
+        """
+        Enables or disables request pipelining. If request pipelining is
+        disabled, only one request per device can be in flight at the same
+        time and concurrent calls to the same device from different tasks
+        are serialized. If request pipelining is enabled, concurrent calls
+        to the same device are sent without waiting for the responses to
+        earlier calls. Up to 15 calls of the same function of the same
+        device can be in flight at the same time.
+
+        Default value is *False*.
+        """
+
+        self.request_pipelining = bool(request_pipelining)
+
+    def get_request_pipelining(self):
+        """
+        Returns *true* if request pipelining is enabled, *false* otherwise.
+        """
+
+        return self.request_pipelining
+
+    set_numpy_arrays = IPConnection.set_numpy_arrays
+    get_numpy_arrays = IPConnection.get_numpy_arrays
+
+    async def enumerate(self):
+        """
+        Broadcasts an enumerate request. All devices will respond with an
+        enumerate callback.
+        """
+
+        request, _, _ = self.create_packet_header(None, 8, AsyncIPConnection.FUNCTION_ENUMERATE)
+
+        await self.send(request)
+
+    def register_callback(self, callback_id, function):
+        """
+        Registers the given *function* with the given *callback_id*. The
+        *function* can be a normal function or a coroutine function.
+        """
+        if function is None:
+            self.registered_callbacks.pop(callback_id, None)
+        else:
+            self.registered_callbacks[callback_id] = function
+
+    def callback_stream(self, callback_id, max_size=0):
+        """
+        Returns a :class:`CallbackStream` that yields the values of the
+        callback with the given *callback_id*. This works for the enumerate,
+        connected and disconnected callback.
+        """
+
+        return CallbackStream(self.callback_streams, callback_id, max_size)
+
+    # internal
+    async def connect_unlocked(self, is_auto_reconnect):
+        # NOTE: assumes that writer is None and socket_lock is locked
+
+        # create callback task and queue
+        if self.callback_task is None:
+            self.callback_queue = asyncio.Queue()
+            self.callback_task = asyncio.ensure_future(self.callback_loop(self.callback_queue))
+
+        self.packet_dispatch_allowed = False
+
+        # create connection
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), 5)
+        except Exception:
+            # end callback task
+            if not is_auto_reconnect:
+                self.callback_queue.put_nowait((AsyncIPConnection.QUEUE_EXIT, None))
+
+                if asyncio.current_task() is not self.callback_task:
+                    await self.callback_task
+
+                self.callback_queue = None
+                self.callback_task = None
+
+            raise
+
+        self.reader = reader
+        self.writer = writer
+        self.socket_id += 1
+
+        # create disconnect probe and receive task
+        self.disconnect_probe_flag = True
+        self.disconnect_probe_task = asyncio.ensure_future(self.disconnect_probe_loop(self.socket_id))
+        self.packet_dispatch_allowed = True
+        self.receive_task = asyncio.ensure_future(self.receive_loop(reader, self.socket_id))
+
+        self.auto_reconnect_allowed = False
+        self.auto_reconnect_pending = False
+
+        if is_auto_reconnect:
+            connect_reason = AsyncIPConnection.CONNECT_REASON_AUTO_RECONNECT
+        else:
+            connect_reason = AsyncIPConnection.CONNECT_REASON_REQUEST
+
+        self.callback_queue.put_nowait((AsyncIPConnection.QUEUE_META,
+                                        (AsyncIPConnection.CALLBACK_CONNECTED,
+                                         connect_reason, None)))
+
+    # internal
+    async def disconnect_unlocked(self):
+        # NOTE: assumes that writer is not None and socket_lock is locked
+
+        # stop dispatching packet callbacks before ending the receive
+        # task to avoid timeout exceptions due to callback functions
+        # trying to call getters
+        self.packet_dispatch_allowed = False
+
+        # end disconnect probe and receive task
+        tasks = []
+
+        for task in [self.disconnect_probe_task, self.receive_task]:
+            if task is not None and task is not asyncio.current_task():
+                task.cancel()
+                tasks.append(task)
+
+        self.disconnect_probe_task = None
+        self.receive_task = None
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # close connection
+        self.writer.close()
+
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+
+        self.reader = None
+        self.writer = None
+
+        # requests in-flight will not get a response anymore
+        for pending_request in self.pending_requests.values():
+            if not pending_request.response_future.done():
+                pending_request.response_future.set_exception(Error(Error.NOT_CONNECTED, 'Not connected'))
+
+    # internal
+    def add_device(self, device):
+        replaced_device = self.devices.get(device.uid)
+
+        if replaced_device != None:
+            replaced_device.replaced = True
+
+        self.devices[device.uid] = device # FIXME: maybe use a weakref here
+
+    # internal
+    async def receive_loop(self, reader, socket_id):
+        while True:
+            try:
+                header = await reader.readexactly(8)
+                length = header[4]
+
+                if length < 8:
+                    raise ValueError('Invalid packet length {0}'.format(length))
+
+                packet = header + await reader.readexactly(length - 8)
+            except asyncio.IncompleteReadError:
+                self.handle_disconnect_by_peer(AsyncIPConnection.DISCONNECT_REASON_SHUTDOWN, socket_id)
+                break
+            except (OSError, ValueError):
+                self.handle_disconnect_by_peer(AsyncIPConnection.DISCONNECT_REASON_ERROR, socket_id)
+                break
+
+            self.handle_response(packet)
+
+    # internal
+    async def dispatch_meta(self, function_id, parameter, socket_id):
+        if function_id == AsyncIPConnection.CALLBACK_CONNECTED:
+            await self.deliver_callback(self.registered_callbacks, self.callback_streams,
+                                        AsyncIPConnection.CALLBACK_CONNECTED, (parameter,))
+        elif function_id == AsyncIPConnection.CALLBACK_DISCONNECTED:
+            if parameter != AsyncIPConnection.DISCONNECT_REASON_REQUEST:
+                async with self.socket_lock:
+                    # don't close the connection if it got disconnected or
+                    # reconnected in the meantime
+                    if self.writer is not None and self.socket_id == socket_id:
+                        await self.disconnect_unlocked()
+
+            # FIXME: wait a moment here, otherwise the next connect
+            # attempt will succeed, even if there is no open server
+            # socket. the first receive will then fail directly
+            await asyncio.sleep(0.1)
+
+            await self.deliver_callback(self.registered_callbacks, self.callback_streams,
+                                        AsyncIPConnection.CALLBACK_DISCONNECTED, (parameter,))
+
+            if parameter != AsyncIPConnection.DISCONNECT_REASON_REQUEST and \
+               self.auto_reconnect and self.auto_reconnect_allowed:
+                self.auto_reconnect_pending = True
+                retry = True
+
+                # wait here until reconnect. this is okay, there is no
+                # callback to deliver when there is no connection
+                while retry:
+                    retry = False
+
+                    async with self.socket_lock:
+                        if self.auto_reconnect_allowed and self.writer is None:
+                            try:
+                                await self.connect_unlocked(True)
+                            except Exception:
+                                retry = True
+                        else:
+                            self.auto_reconnect_pending = False
+
+                    if retry:
+                        await asyncio.sleep(0.1)
+
+    # internal
+    async def dispatch_packet(self, packet):
+        uid = get_uid_from_data(packet)
+        function_id = get_function_id_from_data(packet)
+
+        if function_id == AsyncIPConnection.CALLBACK_ENUMERATE:
+            if len(packet) != 34:
+                return # silently ignoring callback with wrong length
+
+            await self.deliver_callback(self.registered_callbacks, self.callback_streams,
+                                        AsyncIPConnection.CALLBACK_ENUMERATE,
+                                        unpack_payload(packet[8:], '8s 8s c 3B 3B H B'))
+
+            return
+
+        device = self.devices.get(uid)
+
+        if device == None:
+            return
+
+        try:
+            await device.check_validity()
+        except Error:
+            return # silently ignoring callback for invalid device
+
+        for callback_id, values in self.unpack_device_callbacks(device, function_id, packet):
+            await self.deliver_callback(device.registered_callbacks, device.callback_streams, callback_id, values)
+
+    # internal
+    async def deliver_callback(self, registered_callbacks, callback_streams, callback_id, values):
+        for stream in callback_streams.get(callback_id, []):
+            stream.put(values)
+
+        cb = registered_callbacks.get(callback_id)
+
+        if cb == None:
+            return
+
+        try:
+            result = cb(*values)
+
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            # don't let a failing callback function end the callback task
+            asyncio.get_event_loop().call_exception_handler({'message': 'Exception in callback function for callback ID {0}'.format(callback_id),
+                                                             'exception': e})
+
+    # internal
+    def is_callback_registered(self, device, callback_id):
+        return callback_id in device.registered_callbacks or callback_id in device.callback_streams
+
+    # internal
+    async def callback_loop(self, callback_queue):
+        while True:
+            kind, data = await callback_queue.get()
+
+            if kind == AsyncIPConnection.QUEUE_EXIT:
+                break
+            elif kind == AsyncIPConnection.QUEUE_META:
+                await self.dispatch_meta(*data)
+            elif kind == AsyncIPConnection.QUEUE_PACKET:
+                # don't dispatch callbacks when the receive task isn't running
+                if self.packet_dispatch_allowed:
+                    await self.dispatch_packet(data)
+
+    # internal
+    async def disconnect_probe_loop(self, socket_id):
+        request, _, _ = self.create_packet_header(None, 8, AsyncIPConnection.FUNCTION_DISCONNECT_PROBE)
+
+        while True:
+            await asyncio.sleep(AsyncIPConnection.DISCONNECT_PROBE_INTERVAL)
+
+            if self.disconnect_probe_flag:
+                try:
+                    async with self.socket_send_lock:
+                        self.writer.write(request)
+                        await self.writer.drain()
+                except OSError:
+                    self.handle_disconnect_by_peer(AsyncIPConnection.DISCONNECT_REASON_ERROR, socket_id)
+                    break
+            else:
+                self.disconnect_probe_flag = True
+
+    # internal
+    async def send(self, packet):
+        writer = self.writer
+
+        if writer is None:
+            raise Error(Error.NOT_CONNECTED, 'Not connected')
+
+        try:
+            async with self.socket_send_lock:
+                writer.write(packet)
+                await writer.drain()
+        except OSError:
+            self.handle_disconnect_by_peer(AsyncIPConnection.DISCONNECT_REASON_ERROR, self.socket_id)
+            raise Error(Error.NOT_CONNECTED, 'Not connected', suppress_context=True)
+
+        self.disconnect_probe_flag = False
+
+    # internal
+    async def send_request(self, device, function_id, data, form, length_ret, form_ret):
+        payload = pack_payload(data, form)
+
+        if not device.get_response_expected(function_id):
+            header, _, _ = self.create_packet_header(device, 8 + len(payload), function_id)
+
+            await self.send(header + payload)
+
+            return None
+
+        if self.request_pipelining:
+            response = await self.send_request_and_wait(device, function_id, payload)
+        else:
+            async with device.request_lock:
+                response = await self.send_request_and_wait(device, function_id, payload)
+
+        return self.parse_response(function_id, response, length_ret, form_ret, device.get_numpy_arrays())
+
+    # internal
+    async def send_request_and_wait(self, device, function_id, payload):
+        pending_request = await self.add_pending_request(device, function_id)
+
+        try:
+            header, _, _ = self.create_packet_header(device, 8 + len(payload), function_id,
+                                                     sequence_number=pending_request.key[2])
+
+            await self.send(header + payload)
+
+            return await self.wait_for_response(pending_request)
+        finally:
+            self.remove_pending_request(pending_request)
+
+    # internal
+    async def wait_for_response(self, pending_request):
+        try:
+            return await asyncio.wait_for(pending_request.response_future, self.timeout)
+        except asyncio.TimeoutError:
+            msg = 'Did not receive response for function {0} in time'.format(pending_request.key[1])
+            raise Error(Error.TIMEOUT, msg, suppress_context=True)
+
+    # internal
+    async def add_pending_request(self, device, function_id):
+        while True:
+            # try all 15 sequence numbers before waiting for one of them
+            # to become available for this function of this device
+            for _ in range(15):
+                sequence_number = self.get_next_sequence_number()
+                key = (device.uid, function_id, sequence_number)
+
+                if key not in self.pending_requests:
+                    pending_request = AsyncIPConnection.PendingRequest(key)
+                    self.pending_requests[key] = pending_request
+
+                    return pending_request
+
+            self.pending_request_removed.clear()
+            await self.pending_request_removed.wait()
+
+    # internal
+    def remove_pending_request(self, pending_request):
+        if self.pending_requests.get(pending_request.key) is pending_request:
+            del self.pending_requests[pending_request.key]
+            self.pending_request_removed.set()
+
+    # internal
+    def get_next_sequence_number(self):
+        sequence_number = self.next_sequence_number + 1
+        self.next_sequence_number = sequence_number % 15
+        return sequence_number
+
+    # internal
+    def handle_response(self, packet):
+        self.disconnect_probe_flag = False
+
+        function_id = get_function_id_from_data(packet)
+        sequence_number = get_sequence_number_from_data(packet)
+
+        if sequence_number == 0 and function_id == AsyncIPConnection.CALLBACK_ENUMERATE:
+            if AsyncIPConnection.CALLBACK_ENUMERATE in self.registered_callbacks or \
+               AsyncIPConnection.CALLBACK_ENUMERATE in self.callback_streams:
+                self.callback_queue.put_nowait((AsyncIPConnection.QUEUE_PACKET, packet))
+
+            return
+
+        uid = get_uid_from_data(packet)
+        device = self.devices.get(uid)
+
+        if device == None:
+            return # Response from an unknown device, ignoring it
+
+        if sequence_number == 0:
+            if self.is_callback_registered(device, function_id) or \
+               -function_id in device.high_level_callbacks:
+                self.callback_queue.put_nowait((AsyncIPConnection.QUEUE_PACKET, packet))
+
+            return
+
+        pending_request = self.pending_requests.get((uid, function_id, sequence_number))
+
+        if pending_request != None and not pending_request.response_future.done():
+            pending_request.response_future.set_result(packet)
+            return
+
+        # Response seems to be OK, but can't be handled
+
+    # internal
+    def handle_disconnect_by_peer(self, disconnect_reason, socket_id):
+        self.auto_reconnect_allowed = True
+
+        if self.callback_queue is not None:
+            self.callback_queue.put_nowait((AsyncIPConnection.QUEUE_META,
+                                            (AsyncIPConnection.CALLBACK_DISCONNECTED,
+                                             disconnect_reason, socket_id)))
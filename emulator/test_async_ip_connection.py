@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+# Redistribution and use in source and binary forms of this file,
+# with or without modification, are permitted. See the Creative
+# Commons Zero (CC0 1.0) License for more details.
+
+import sys
+
+if sys.hexversion < 0x3070000:
+    raise Exception('Python >= 3.7 required')
+
+import asyncio
+import argparse
+
+from brick_daemon import BrickDaemon
+from common_test_bricklet_skeleton import CommonTestBrickletSkeleton
+from ip_connection import Error
+from ip_connection_async import AsyncIPConnection
+from bricklet_common_test_async import AsyncBrickletCommonTest
+
+HOST = 'localhost'
+PORT = 5560
+UID = 'CTV1'
+
+class CommonTestBricklet(CommonTestBrickletSkeleton):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._int8_value = 0
+
+    async def set_int8_value(self, value):
+        self._int8_value = value
+
+    async def get_int8_value(self):
+        return self._int8_value
+
+async def check_connection(index, port, requests):
+    ipcon = AsyncIPConnection()
+    ct = AsyncBrickletCommonTest(UID, ipcon)
+    connected = []
+
+    ipcon.register_callback(AsyncIPConnection.CALLBACK_CONNECTED, connected.append)
+
+    await ipcon.connect(HOST, port)
+
+    try:
+        async with ipcon.callback_stream(AsyncIPConnection.CALLBACK_ENUMERATE) as enumerations:
+            await ipcon.enumerate()
+
+            uid, _, _, _, _, device_identifier, enumeration_type = await asyncio.wait_for(enumerations.__anext__(), 1)
+
+            assert uid == UID, uid
+            assert device_identifier == AsyncBrickletCommonTest.DEVICE_IDENTIFIER, device_identifier
+            assert enumeration_type == AsyncIPConnection.ENUMERATION_TYPE_AVAILABLE, enumeration_type
+
+        for value in range(-requests // 2, requests // 2):
+            value = max(-128, min(value, 127))
+
+            await ct.set_int8_value(value)
+            assert await ct.get_int8_value() == value
+
+        # concurrent calls from many tasks on the same device, pipelined
+        ipcon.set_request_pipelining(True)
+
+        values = await asyncio.gather(*[ct.get_int8_value() for _ in range(requests)])
+        assert values == [value] * requests
+
+        ipcon.set_timeout(0.2)
+
+        try:
+            await AsyncBrickletCommonTest('XYZ', ipcon).get_int8_value()
+            assert False, 'expected timeout'
+        except Error as e:
+            assert e.value == Error.TIMEOUT, e
+    finally:
+        await ipcon.disconnect()
+
+    await asyncio.sleep(0) # let the callback task finish
+
+    assert connected == [AsyncIPConnection.CONNECT_REASON_REQUEST], connected
+
+    print('connection {0}: ok'.format(index))
+
+async def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-p', '--port', type=int, default=PORT, help='first port for the emulated Brick Daemons')
+    parser.add_argument('-c', '--connections', type=int, default=20, help='number of Brick Daemons and connections')
+    parser.add_argument('-r', '--requests', type=int, default=100, help='number of requests per connection')
+
+    args = parser.parse_args()
+    brickds = []
+
+    # one event loop runs all emulated Brick Daemons and all connections
+    for i in range(args.connections):
+        brickd = BrickDaemon(HOST, args.port + i)
+
+        await brickd.__aenter__()
+        await brickd.add_device(CommonTestBricklet(UID))
+
+        brickds.append(brickd)
+
+    try:
+        await asyncio.gather(*[check_connection(i, args.port + i, args.requests) for i in range(args.connections)])
+    finally:
+        for brickd in brickds:
+            await brickd.__aexit__(None, None, None)
+
+    print('all {0} connections ok'.format(args.connections))
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+# Redistribution and use in source and binary forms of this file,
+# with or without modification, are permitted. See the Creative
+# Commons Zero (CC0 1.0) License for more details.
+
+import sys
+
+if sys.hexversion < 0x3070000:
+    raise Exception('Python >= 3.7 required')
+
+import asyncio
+import threading
+import time
+import argparse
+
+from brick_daemon import BrickDaemon
+from common_test_bricklet_skeleton import CommonTestBrickletSkeleton
+from ip_connection import IPConnection, Error, base58encode
+from bricklet_common_test import BrickletCommonTest
+
+HOST = 'localhost'
+PORT = 5580
+
+class CommonTestBricklet(CommonTestBrickletSkeleton):
+    def __init__(self, uid, value):
+        super().__init__(uid)
+
+        self._int8_value = value
+
+    async def set_int8_value(self, value):
+        self._int8_value = value
+
+    async def get_int8_value(self):
+        return self._int8_value
+
+def get_uid(brickd_index, device_index):
+    return base58encode(1000000 + brickd_index * 1000 + device_index)
+
+def get_value(brickd_index, device_index):
+    return (brickd_index * 31 + device_index) % 128
+
+def run_brickds(port, brickd_count, device_count, ready, stop):
+    async def main():
+        brickds = []
+
+        # one event loop runs all emulated Brick Daemons
+        for i in range(brickd_count):
+            brickd = BrickDaemon(HOST, port + i)
+
+            await brickd.__aenter__()
+
+            for k in range(device_count):
+                await brickd.add_device(CommonTestBricklet(get_uid(i, k), get_value(i, k)))
+
+            brickds.append(brickd)
+
+        ready.set()
+
+        try:
+            while not stop.is_set():
+                await asyncio.sleep(0.05)
+        finally:
+            for brickd in brickds:
+                await brickd.__aexit__(None, None, None)
+
+    asyncio.run(main())
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-p', '--port', type=int, default=PORT, help='first port for the emulated Brick Daemons')
+    parser.add_argument('-b', '--brickds', type=int, default=4, help='number of Brick Daemons')
+    parser.add_argument('-d', '--devices', type=int, default=50, help='number of devices per Brick Daemon')
+    parser.add_argument('-r', '--runs', type=int, default=5, help='number of runs')
+
+    args = parser.parse_args()
+    ready = threading.Event()
+    stop = threading.Event()
+    thread = threading.Thread(target=run_brickds, args=(args.port, args.brickds, args.devices, ready, stop), daemon=True)
+
+    thread.start()
+    ready.wait()
+
+    ipcons = []
+    devices = []
+    expected = []
+
+    try:
+        for i in range(args.brickds):
+            ipcon = IPConnection()
+
+            ipcon.connect(HOST, args.port + i)
+            ipcons.append(ipcon)
+
+            for k in range(args.devices):
+                devices.append(BrickletCommonTest(get_uid(i, k), ipcon))
+                expected.append((get_value(i, k), None))
+
+        requests = [(device, 'get_int8_value') for device in devices]
+
+        # the first batch also checks the identity of all devices
+        assert ipcons[0].batch(requests) == expected
+
+        for run in range(args.runs):
+            start = time.monotonic()
+
+            for device in devices:
+                device.get_int8_value()
+
+            sequential = time.monotonic() - start
+            start = time.monotonic()
+
+            assert ipcons[0].batch(requests) == expected
+
+            batch = time.monotonic() - start
+
+            print('run {0}: {1} devices, sequential {2:.1f} ms, batch {3:.1f} ms'
+                  .format(run + 1, len(devices), sequential * 1000, batch * 1000))
+
+        # setters, unknown devices and a single timeout for the whole batch
+        devices[0].set_response_expected(BrickletCommonTest.FUNCTION_SET_INT8_VALUE, True)
+
+        missing = BrickletCommonTest('XYZ', ipcons[0])
+        missing.device_identifier = -1 # skip the identity check
+        start = time.monotonic()
+        results = ipcons[0].batch([(devices[0], 'set_int8_value', (-5,)),
+                                   (missing, 'get_int8_value'),
+                                   (devices[-1], 'set_int8_value', (-7,)),
+                                   (devices[0], 'get_int8_value'),
+                                   (devices[-1], 'get_int8_value')], timeout=0.2)
+        elapsed = time.monotonic() - start
+
+        assert results[0] == (None, None), results
+        assert results[1][1].value == Error.TIMEOUT, results
+        assert results[2] == (None, None), results
+        assert results[3] == (-5, None), results
+        assert results[4] == (-7, None), results
+        assert elapsed < 0.4, elapsed
+    finally:
+        for ipcon in ipcons:
+            ipcon.disconnect()
+
+        stop.set()
+        thread.join()
+
+    print('all ok')
+
+if __name__ == '__main__':
+    main()
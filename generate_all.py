@@ -9,7 +9,14 @@ if sys.hexversion < 0x3040000:
 
 import os
 import re
+import json
+import pstats
+import shutil
 import socket
+import tempfile
+import traceback
+import tracemalloc
+import multiprocessing
 import importlib.util
 import importlib.machinery
 
@@ -31,6 +38,198 @@ if 'generators' not in sys.modules:
 
 from generators import common
 
+languages = {
+    'bindings': ['en'],
+    'examples': ['en'],
+    'doc': ['en', 'de'],
+    'zip': ['en'],
+    'debian_package': ['en']
+}
+
+has_internal_argument = [
+    'bindings',
+    'examples',
+    'doc',
+    'zip'
+]
+
+# units that also regenerate the output of other bindings. with -j they run
+# after all other units of the same generator are done
+exclusive_units = {
+    ('zip', 'tvpl') # regenerates the javascript bindings and zip
+}
+
+def init_worker(verbose, incremental, profile):
+    common.enable_verbose = verbose
+    common.enable_incremental = incremental
+
+    if profile:
+        tracemalloc.start()
+
+# runs one (generator, binding, language) unit in a worker process. the output
+# of the unit, including the output of subprocesses, is captured so that the
+# main process can print it in a deterministic order. with a stats path the
+# unit is profiled and its records are returned
+def run_unit(generator, binding, language, internal, stats_path):
+    lang = common.lang
+    error = None
+    records = []
+
+    if stats_path != None:
+        common.profiler = common.GeneratorProfiler(generator, binding)
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    with tempfile.TemporaryFile() as output:
+        stdout_fd = os.dup(1)
+        stderr_fd = os.dup(2)
+
+        os.dup2(output.fileno(), 1)
+        os.dup2(output.fileno(), 2)
+
+        try:
+            try:
+                module = importlib.import_module('generators.{0}.generate_{0}_{1}'.format(binding, generator))
+            except ImportError:
+                print('\033[01;36m### generator missing\033[0m')
+            else:
+                root_dir = os.path.join(generators_dir, binding)
+
+                if generator in has_internal_argument:
+                    module.generate(root_dir, language, internal)
+                else:
+                    module.generate(root_dir, language)
+        except (Exception, SystemExit):
+            error = traceback.format_exc()
+        finally:
+            # subgenerate sets the module-global language, restore it so that
+            # the next unit in this worker process starts from a clean state
+            common.lang = lang
+
+            if common.profiler != None:
+                records = common.profiler.records
+
+                if not common.profiler.dump_stats(stats_path):
+                    stats_path = None
+
+                common.profiler = None
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+            os.dup2(stdout_fd, 1)
+            os.dup2(stderr_fd, 2)
+            os.close(stdout_fd)
+            os.close(stderr_fd)
+
+        output.seek(0)
+
+        return output.read().decode('utf-8', errors='replace'), error, records, stats_path
+
+def run_units_in_parallel(units, jobs, internal, verbose, incremental, profile_dir):
+    failures = []
+    records = []
+    stats_paths = []
+
+    def get_stats_path(generator, binding, language):
+        if profile_dir == None:
+            return None
+
+        return os.path.join(profile_dir, '{0}_{1}_{2}.prof'.format(generator, binding, language))
+
+    with multiprocessing.Pool(processes=jobs, initializer=init_worker, initargs=(verbose, incremental, profile_dir != None)) as pool:
+        for generator, bindings in units:
+            results = {}
+
+            for binding, language in bindings:
+                if (generator, binding) not in exclusive_units:
+                    results[(binding, language)] = pool.apply_async(run_unit, (generator, binding, language, internal, get_stats_path(generator, binding, language)))
+
+            for binding, language in bindings:
+                if (generator, binding) in exclusive_units:
+                    for result in results.values():
+                        result.wait()
+
+                    results[(binding, language)] = pool.apply_async(run_unit, (generator, binding, language, internal, get_stats_path(generator, binding, language)))
+
+                output, error, unit_records, stats_path = results[(binding, language)].get()
+
+                records += unit_records
+
+                if stats_path != None:
+                    stats_paths.append(stats_path)
+
+                print('\033[01;32m>>> running {0} generator for {1} bindings ({2})\033[0m'.format(generator, binding, language))
+                print(output, end='', flush=True)
+
+                if error != None:
+                    print(error, end='', flush=True)
+                    failures.append((generator, binding, language))
+
+    return failures, records, stats_paths
+
+def format_memory(peak_memory):
+    if peak_memory == None:
+        return '     n/a'
+
+    return '{0:5.1f} MiB'.format(peak_memory / 1024.0 / 1024.0)
+
+def write_profile_report(report_path, records, stats_paths):
+    configs = [record for record in records if record['device'] == None]
+    devices = [record for record in records if record['device'] != None]
+    generators = {}
+
+    for record in configs:
+        key = (record['generator'], record['binding'])
+
+        if key not in generators:
+            generators[key] = {'generator': record['generator'], 'binding': record['binding'], 'time': 0, 'peak_memory': None}
+
+        generators[key]['time'] += record['time']
+
+        if record['peak_memory'] != None:
+            generators[key]['peak_memory'] = max(generators[key]['peak_memory'] or 0, record['peak_memory'])
+
+    generators = sorted(generators.values(), key=lambda generator: generator['time'], reverse=True)
+    hotspots = []
+
+    if len(stats_paths) > 0:
+        stats = pstats.Stats(*stats_paths)
+
+        for (filename, line, function), (primitive_calls, calls, total_time, cumulative_time, callers) in stats.stats.items():
+            if filename == '~':
+                name = function # built-in function
+            else:
+                if filename.startswith(generators_dir):
+                    filename = os.path.relpath(filename, generators_dir)
+
+                name = '{0}:{1}({2})'.format(filename, line, function)
+
+            hotspots.append({'function': name, 'calls': calls, 'primitive_calls': primitive_calls, 'total_time': total_time, 'cumulative_time': cumulative_time})
+
+        hotspots = sorted(hotspots, key=lambda hotspot: hotspot['total_time'], reverse=True)[:100]
+
+    with open(report_path, 'w') as f:
+        json.dump({'generators': generators, 'configs': configs, 'devices': devices, 'hotspots': hotspots}, f, indent=2)
+
+    print('\033[01;35m>>> profile report written to {0}\033[0m'.format(report_path))
+    print('slowest generators:')
+
+    for generator in generators[:10]:
+        print('  {0:8.3f} s  {1}  {2} generator for {3} bindings'.format(generator['time'], format_memory(generator['peak_memory']), generator['generator'], generator['binding']))
+
+    print('slowest devices:')
+
+    for device in sorted(devices, key=lambda device: device['time'], reverse=True)[:10]:
+        print('  {0:8.3f} s  {1}  {2} generator for {3} bindings ({4}, {5}): {6}'.format(device['time'], format_memory(device['peak_memory']), device['generator'],
+                                                                                          device['binding'], device['language'], device['config'], device['device']))
+
+    print('hotspots in generate(device), by total time:')
+
+    for hotspot in hotspots[:15]:
+        print('  {0:8.3f} s  {1:8.3f} s cumulative  {2:8} calls  {3}'.format(hotspot['total_time'], hotspot['cumulative_time'], hotspot['calls'], hotspot['function']))
+
 def main(args):
     all_generators = ['bindings', 'examples', 'doc', 'zip', 'debian_package']
 
@@ -65,20 +264,58 @@ def main(args):
             print('error: {0}'.format(e))
             return 1
 
-    languages = {
-        'bindings': ['en'],
-        'examples': ['en'],
-        'doc': ['en', 'de'],
-        'zip': ['en'],
-        'debian_package': ['en']
-    }
-
-    has_internal_argument = [
-        'bindings',
-        'examples',
-        'doc',
-        'zip'
-    ]
+    if args.profile != None:
+        profile_dir = tempfile.mkdtemp()
+    else:
+        profile_dir = None
+
+    try:
+        return run_generators(args, all_generators, active_generators, all_bindings, active_bindings, profile_dir)
+    finally:
+        if profile_dir != None:
+            shutil.rmtree(profile_dir)
+
+def run_generators(args, all_generators, active_generators, all_bindings, active_bindings, profile_dir):
+    if args.jobs > 1:
+        units = []
+
+        for generator in all_generators:
+            if generator not in active_generators:
+                continue
+
+            bindings = []
+
+            for binding in all_bindings:
+                if binding not in active_bindings:
+                    continue
+
+                for language in languages[generator]:
+                    bindings.append((binding, language))
+
+            units.append((generator, bindings))
+
+        failures, records, stats_paths = run_units_in_parallel(units, args.jobs, args.internal, args.verbose, args.incremental, profile_dir)
+
+        if profile_dir != None:
+            write_profile_report(args.profile, records, stats_paths)
+
+        if len(failures) > 0:
+            print('\033[01;31m>>> {0} unit(s) failed\033[0m'.format(len(failures)))
+
+            for generator, binding, language in failures:
+                print('\033[01;31m### {0} generator for {1} bindings ({2})\033[0m'.format(generator, binding, language))
+
+            return 1
+
+        print('\033[01;35m>>> done\033[0m')
+
+        return 0
+
+    records = []
+    stats_paths = []
+
+    if profile_dir != None:
+        tracemalloc.start()
 
     for generator in all_generators:
         if generator not in active_generators:
@@ -95,6 +332,9 @@ def main(args):
             except ImportError: # FIXME: Python 3.6 has ModuleNotFoundError, which would be better to use here, but Debian Stretch has only Python 3.5
                 print('\033[01;36m### generator missing\033[0m')
             else:
+                if profile_dir != None:
+                    common.profiler = common.GeneratorProfiler(generator, binding)
+
                 for language in languages[generator]:
                     root_dir = os.path.join(generators_dir, binding)
 
@@ -103,6 +343,18 @@ def main(args):
                     else:
                         module.generate(root_dir, language)
 
+                if profile_dir != None:
+                    records += common.profiler.records
+                    stats_path = os.path.join(profile_dir, '{0}_{1}.prof'.format(generator, binding))
+
+                    if common.profiler.dump_stats(stats_path):
+                        stats_paths.append(stats_path)
+
+                    common.profiler = None
+
+    if profile_dir != None:
+        write_profile_report(args.profile, records, stats_paths)
+
     print('\033[01;35m>>> done\033[0m')
 
     return 0
@@ -111,6 +363,8 @@ if __name__ == '__main__':
     def add_arguments(parser):
         parser.add_argument('-g', '--generators', nargs=1, help='comma separated list of generators, each prefixed by +/-/>=/>/<=/<')
         parser.add_argument('-b', '--bindings', nargs=1, help='comma separated list of bindings, each prefixed by +/-/>=/>/<=/<')
+        parser.add_argument('-j', '--jobs', type=int, default=1, help='number of (generator, binding, language) units to run in parallel [default: 1]')
+        parser.add_argument('--profile', nargs='?', const='generate_all_profile.json', metavar='REPORT', help='record time and peak memory per generator, config and device, write a JSON report [default: generate_all_profile.json]')
 
     # FIXME: set mount_m2_volume and mount_gnupg_volume based on -g/-b
-    sys.exit(main(common.dockerize('', __file__, add_internal_argument=True, add_arguments=add_arguments, mount_m2_volume=True, mount_gnupg_volume=True)))
+    sys.exit(main(common.dockerize('', __file__, add_internal_argument=True, add_incremental_argument=True, add_arguments=add_arguments, mount_m2_volume=True, mount_gnupg_volume=True)))
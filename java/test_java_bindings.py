@@ -30,6 +30,7 @@ if sys.hexversion < 0x3040000:
     sys.exit(1)
 
 import os
+import re
 import subprocess
 import shutil
 import random
@@ -72,7 +73,7 @@ class JavaExamplesTester(common.Tester):
             tries -= 1
 
         if os.path.exists(jar_path):
-            self.handle_result(cookie, 1, 'cloud not create unique copy of Tinkerforge.jar')
+            self.add_result(cookie, 1, 'cloud not create unique copy of Tinkerforge.jar')
             return
 
         shutil.copy(os.path.join(tmp_dir, 'Tinkerforge.jar'), jar_path)
@@ -90,6 +91,12 @@ class JavaExamplesTester(common.Tester):
 
         self.execute(cookie, args)
 
+    def get_cache_args(self, args):
+        # the unique copy of the Tinkerforge.jar has a random name
+        args = [re.sub(r'Tinkerforge_[0-9A-F]{10}\.jar', 'Tinkerforge.jar', arg) for arg in args]
+
+        return common.Tester.get_cache_args(self, args)
+
 class JavaDocTester(common.Tester):
     def __init__(self, root_dir):
         common.Tester.__init__(self, 'java', '.html', root_dir, subdirs=['javadoc/com/tinkerforge'])
@@ -138,6 +145,6 @@ def test(root_dir):
     return True #JavaDocTester(root_dir).run() # FIXME: Java 11 creates HTML5 JavaDoc, but xmllint doesn't understand HTML5
 
 if __name__ == '__main__':
-    common.dockerize('java', __file__)
+    common.dockerize('java', __file__, add_tester_arguments=True)
 
     test(os.getcwd())
@@ -61,6 +61,6 @@ def generate(root_dir, language, internal):
     common.generate(root_dir, language, internal, LabVIEWBindingsGenerator)
 
 if __name__ == '__main__':
-    args = common.dockerize('labview', __file__, add_internal_argument=True)
+    args = common.dockerize('labview', __file__, add_internal_argument=True, add_incremental_argument=True)
 
     generate(os.getcwd(), 'en', args.internal)
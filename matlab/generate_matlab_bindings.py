@@ -55,6 +55,8 @@ from generators.java.generate_java_bindings import JavaBindingsGenerator
 from generators.matlab import matlab_common
 
 class MATLABBindingsGenerator(matlab_common.MATLABGeneratorTrait, JavaBindingsGenerator):
+    supports_incremental = False # the Octave bindings are generated into the same directory
+
     def get_bindings_name(self):
         return 'matlab'
 
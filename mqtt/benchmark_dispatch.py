@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Measures the per-message overhead of the MQTT bindings without a broker and
+# without a Brick Daemon. A fixed stream of request messages is replayed
+# through the message handler. The IP Connection answers every request with
+# an all-zero response of the expected length and the MQTT client only counts
+# the published responses. The measured time is spent in the dispatching, the
+# argument checks and the result serialization of the bindings and in packing
+# and unpacking the payloads. Requires paho-mqtt and the generated bindings.
+
+import os
+import sys
+import time
+import json
+import struct
+import argparse
+import importlib.machinery
+
+bindings_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'bindings', 'tinkerforge_mqtt')
+
+REQUESTS = [
+    ('lcd_128x64_bricklet', 'write_line', {'line': 0, 'position': 0, 'text': 'Hello World'}),
+    ('lcd_128x64_bricklet', 'draw_text', {'position_x': 0, 'position_y': 0, 'font': '6x8', 'color': 'black', 'text': 'Hello'}),
+    ('lcd_128x64_bricklet', 'get_touch_gesture', {}),
+    ('lcd_128x64_bricklet', 'set_gui_tab_icon', {'index': 0, 'icon': [True, False] * 84}),
+    ('lcd_128x64_bricklet', 'set_gui_graph_data', {'index': 0, 'data': list(range(200))}),
+    ('lcd_128x64_bricklet', 'read_pixels', {'x_start': 0, 'y_start': 0, 'x_end': 127, 'y_end': 63}),
+    ('lcd_128x64_bricklet', 'get_identity', {}),
+    ('industrial_digital_out_4_v2_bricklet', 'set_value', {'value': [True, False, True, False]}),
+    ('industrial_digital_out_4_v2_bricklet', 'set_monoflop', {'channel': 0, 'value': True, 'time': '0x100'}),
+    ('industrial_digital_out_4_v2_bricklet', 'get_value', {}),
+    ('temperature_v2_bricklet', 'get_temperature', {}),
+    ('temperature_v2_bricklet', 'set_temperature_callback_configuration', {'period': 1000, 'value_has_to_change': False, 'option': 'off', 'min': 0, 'max': 0}),
+]
+
+UIDS = {
+    'lcd_128x64_bricklet': 'XYZ',
+    'industrial_digital_out_4_v2_bricklet': 'ABC',
+    'temperature_v2_bricklet': 'DEF'
+}
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-b', '--bindings', default=bindings_path, help='path of the generated bindings [default: bindings/tinkerforge_mqtt]')
+    parser.add_argument('-r', '--rounds', type=int, default=2000, help='number of times the request stream is replayed [default: 2000]')
+
+    args = parser.parse_args()
+
+    tinkerforge_mqtt = importlib.machinery.SourceFileLoader('tinkerforge_mqtt', args.bindings).load_module()
+    bindings = tinkerforge_mqtt.MQTTBindings(False, True, False, False, 'tinkerforge/', 2.5, None, None, None, False, 0, 1)
+    connection = bindings.add_connection(None, 'localhost', 4223, '')
+    published = []
+    response_sizes = {}
+
+    for device_class_name, function_name, _ in REQUESTS:
+        function_info = tinkerforge_mqtt.devices[device_class_name].functions[function_name]
+
+        if isinstance(function_info, tinkerforge_mqtt.HighLevelFunctionInfo):
+            response_sizes[(device_class_name, function_info.low_level_id)] = function_info.response_size
+        else:
+            response_sizes[(device_class_name, function_info.id)] = function_info.response_size
+
+    def send_request_and_wait(device, function_id, payload):
+        if function_id == 255: # get_identity, also used by the identity check
+            return b'\0' * 31 + struct.pack('<H', device.device_identifier)
+
+        return b'\0' * response_sizes[(device.device_class_name, function_id)]
+
+    connection.ipcon.send = lambda packet: None
+    connection.ipcon.send_request_and_wait = send_request_and_wait
+    bindings.mqttc.publish = lambda topic, payload: published.append(payload)
+
+    messages = []
+
+    for device_class_name, function_name, payload in REQUESTS:
+        topic = 'tinkerforge/request/{0}/{1}/{2}'.format(device_class_name, UIDS[device_class_name], function_name)
+        messages.append(tinkerforge_mqtt.message_tup(topic, json.dumps(payload).encode('utf-8')))
+
+    for message in messages:
+        bindings.handle_message(len('tinkerforge/'), message, None)
+
+    errors = [payload for payload in published if '_ERROR' in payload]
+
+    if len(errors) > 0:
+        print('unexpected error responses: {0}'.format(errors))
+        return 1
+
+    del published[:]
+
+    start = time.perf_counter()
+
+    for _ in range(args.rounds):
+        for message in messages:
+            bindings.handle_message(len('tinkerforge/'), message, None)
+
+    elapsed = time.perf_counter() - start
+    count = args.rounds * len(messages)
+
+    print('{0} messages, {1} responses, {2:.0f} messages/s, {3:.1f} us/message'.format(count, len(published), count / elapsed, elapsed / count * 1000000))
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
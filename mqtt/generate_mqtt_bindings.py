@@ -258,6 +258,8 @@ class {0}(MQTTCallbackDevice):
         return source
 
 class MQTTBindingsGenerator(mqtt_common.MQTTGeneratorTrait, common.BindingsGenerator):
+    incremental_dependencies = [os.path.join('..', 'python', 'ip_connection.py')]
+
     def get_device_class(self):
         return MQTTBindingsDevice
 
@@ -359,6 +361,6 @@ def generate(root_dir, language, internal):
     common.generate(root_dir, language, internal, MQTTBindingsGenerator)
 
 if __name__ == '__main__':
-    args = common.dockerize('mqtt', __file__, add_internal_argument=True)
+    args = common.dockerize('mqtt', __file__, add_internal_argument=True, add_incremental_argument=True)
 
     generate(os.getcwd(), 'en', args.internal)
@@ -186,6 +186,25 @@ time critical or recurring data from the device. The registration is done
 with the corresponding ``.../register/...`` topic and an optional suffix.
 This suffix can be used to deregister the callback later.
 
+Instead of "true" the registration payload can be a JSON object like
+``{{"register": true, "min_interval": 1000}}`` with these options to limit the
+published messages of this registration:
+
+* ``min_interval``: Publish at most one message per given number of milliseconds.
+  The newest callback in between is published when the interval is over.
+* ``only_changes``: If ``true``, a message is only published if it differs from
+  the last published message.
+* ``aggregate`` and ``window``: Publish the minimum (``"min"``), maximum (``"max"``)
+  or mean (``"mean"``) of all callbacks in a window of the given number of
+  milliseconds. Lists are aggregated element-wise, values that are not numbers
+  keep their newest value.
+* ``batch``: Publish the given number of messages together as one JSON array.
+  With ``batch_timeout`` an incomplete batch is published after the given number
+  of milliseconds.
+
+The options are applied in this order: aggregation, minimum interval, change
+detection and batching.
+
 .. note::
  Using callbacks for recurring events is *always* preferred
  compared to using getters. It will use less USB bandwidth and the latency
@@ -204,6 +223,26 @@ oder wiederkehrende Daten vom Gerät zu erhalten. Die Registrierung kann
 mit dem entsprechenden ``.../register/...``-Topic und einem optionalen Suffix durchgeführt werden.
 Mit diesem Suffix kann das Callback später deregistriert werden.
 
+Statt "true" kann der Payload der Registrierung ein JSON-Objekt wie
+``{{"register": true, "min_interval": 1000}}`` sein, mit diesen Optionen um die
+veröffentlichten Nachrichten dieser Registrierung zu begrenzen:
+
+* ``min_interval``: Höchstens eine Nachricht pro angegebener Anzahl Millisekunden
+  veröffentlichen. Das neueste Callback dazwischen wird veröffentlicht, wenn das
+  Intervall vorbei ist.
+* ``only_changes``: Bei ``true`` wird eine Nachricht nur veröffentlicht, wenn sie
+  sich von der zuletzt veröffentlichten Nachricht unterscheidet.
+* ``aggregate`` und ``window``: Das Minimum (``"min"``), Maximum (``"max"``)
+  oder den Mittelwert (``"mean"``) aller Callbacks in einem Fenster der
+  angegebenen Anzahl Millisekunden veröffentlichen. Listen werden elementweise
+  aggregiert, Werte die keine Zahlen sind behalten ihren neuesten Wert.
+* ``batch``: Die angegebene Anzahl Nachrichten zusammen als ein JSON-Array
+  veröffentlichen. Mit ``batch_timeout`` wird ein unvollständiger Batch nach der
+  angegebenen Anzahl Millisekunden veröffentlicht.
+
+Die Optionen werden in dieser Reihenfolge angewendet: Aggregation,
+Mindestintervall, Änderungserkennung und Batching.
+
 .. note::
  Callbacks für wiederkehrende Ereignisse zu verwenden ist
  *immer* zu bevorzugen gegenüber der Verwendung von Abfragen.
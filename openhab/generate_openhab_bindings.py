@@ -975,6 +975,6 @@ def generate(root_dir, language, internal):
     common.generate(root_dir, language, internal, OpenHABBindingsGenerator)
 
 if __name__ == '__main__':
-    args = common.dockerize('openhab', __file__, add_internal_argument=True)
+    args = common.dockerize('openhab', __file__, add_internal_argument=True, add_incremental_argument=True)
 
     generate(os.getcwd(), 'en', args.internal)
@@ -910,6 +910,6 @@ def generate(root_dir, language, internal):
     common.generate(root_dir, language, internal, PerlBindingsGenerator)
 
 if __name__ == '__main__':
-    args = common.dockerize('perl', __file__, add_internal_argument=True)
+    args = common.dockerize('perl', __file__, add_internal_argument=True, add_incremental_argument=True)
 
     generate(os.getcwd(), 'en', args.internal)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures the reassembly of high-level streams without a connection. The
+# low-level packets and responses are prepared up-front, so only the
+# reassembly in the IP Connection and the generated high-level getters is
+# measured. Run with the generated bindings in the Python path.
+
+import sys
+import time
+import struct
+import argparse
+
+from ip_connection import IPConnection
+from bricklet_thermal_imaging import BrickletThermalImaging
+from bricklet_rs485 import BrickletRS485, ReadLowLevel
+
+def create_callback_packets(device, function_id, stream_length, chunk_length):
+    length, codec = device.callback_formats[function_id]
+    packets = []
+
+    for chunk_offset in range(0, stream_length, chunk_length):
+        chunk_data = [(chunk_offset + i) % 256 for i in range(chunk_length)]
+        header = struct.pack('<IBBBB', device.uid, length, function_id, 0, 0)
+
+        packets.append(header + codec.pack((chunk_offset, chunk_data)))
+
+    return packets
+
+def measure_callback(ipcon, device, callback_id, chunk_length, count, as_array):
+    function_id = -callback_id
+    packets = create_callback_packets(device, function_id, 4800, chunk_length)
+    images = []
+
+    if as_array:
+        import numpy
+
+        device.register_callback(callback_id, lambda image: images.append(numpy.asarray(image)))
+    else:
+        device.register_callback(callback_id, images.append)
+
+    start = time.time()
+
+    for _ in range(count):
+        for packet in packets:
+            for callback_id_, values in ipcon.unpack_device_callbacks(device, function_id, packet):
+                device.registered_callbacks[callback_id_](*values)
+
+    elapsed = time.time() - start
+
+    assert len(images) == count and len(images[-1]) == 4800
+    assert list(images[-1][:chunk_length]) == list(range(chunk_length))
+
+    return count / elapsed
+
+def measure_getter(rs485, stream_length, count):
+    chunk_length = 60
+    responses = []
+
+    for chunk_offset in range(0, stream_length, chunk_length):
+        responses.append(ReadLowLevel(stream_length, chunk_offset, tuple('x' * chunk_length)))
+
+    def read_low_level(length):
+        return next(iterator)
+
+    rs485.read_low_level = read_low_level
+
+    start = time.time()
+
+    for _ in range(count):
+        iterator = iter(responses)
+        message = rs485.read(stream_length)
+
+    elapsed = time.time() - start
+
+    assert len(message) == stream_length
+
+    return count / elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-c', '--count', type=int, default=200, help='number of streams per run')
+    parser.add_argument('-l', '--length', type=int, default=4800, help='stream length for the RS485 read getter')
+    parser.add_argument('-n', '--numpy', action='store_true', help='enable the NumPy arrays mode')
+    parser.add_argument('-a', '--as-array', action='store_true', help='convert each image with numpy.asarray in the callback')
+
+    args = parser.parse_args()
+
+    ipcon = IPConnection()
+    ipcon.set_numpy_arrays(args.numpy)
+    thermal_imaging = BrickletThermalImaging('XYZ', ipcon)
+    rs485 = BrickletRS485('ABC', ipcon)
+
+    print('high contrast image callback (4800 x uint8):  {0:8.1f} images/s'
+          .format(measure_callback(ipcon, thermal_imaging, BrickletThermalImaging.CALLBACK_HIGH_CONTRAST_IMAGE, 62, args.count, args.as_array)))
+    print('temperature image callback (4800 x uint16):   {0:8.1f} images/s'
+          .format(measure_callback(ipcon, thermal_imaging, BrickletThermalImaging.CALLBACK_TEMPERATURE_IMAGE, 31, args.count, args.as_array)))
+    print('RS485 read getter ({0} x char):{1}{2:8.1f} streams/s'
+          .format(args.length, ' ' * (18 - len(str(args.length))), measure_getter(rs485, args.length, args.count)))
+
+if __name__ == '__main__':
+    main()
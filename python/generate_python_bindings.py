@@ -60,12 +60,12 @@ class PythonBindingsDevice(python_common.PythonDevice):
 from collections import namedtuple
 
 try:
-    from .ip_connection import Device, IPConnection, Error, create_char, create_char_list, create_string, create_chunk_data
+    from .ip_connection import Device, IPConnection, Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data, get_payload_codec
 except (ValueError, ImportError):
     try:
-        from ip_connection import Device, IPConnection, Error, create_char, create_char_list, create_string, create_chunk_data
+        from ip_connection import Device, IPConnection, Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data, get_payload_codec
     except (ValueError, ImportError):
-        from tinkerforge.ip_connection import Device, IPConnection, Error, create_char, create_char_list, create_string, create_chunk_data
+        from tinkerforge.ip_connection import Device, IPConnection, Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data, get_payload_codec
 
 """
 
@@ -77,6 +77,19 @@ except (ValueError, ImportError):
         return template.format(self.get_generator().get_header_comment('hash'),
                                released)
 
+    def get_python_namedtuple_names(self):
+        names = []
+
+        for packet in self.get_packets('function'):
+            if len(packet.get_elements(direction='out')) >= 2:
+                names.append(packet.get_name().camel)
+
+        for packet in self.get_packets('function'):
+            if packet.has_high_level() and len(packet.get_elements(direction='out', high_level=True)) >= 2:
+                names.append(packet.get_name(skip=-2).camel)
+
+        return sorted(set(names), key=names.index)
+
     def get_python_namedtuples(self):
         tuples = ''
         template = """{0} = namedtuple('{1}', [{2}])
@@ -170,6 +183,25 @@ class {0}(Device):
 
         return function_ids
 
+    def get_python_codec_definitions(self):
+        codecs = ''
+        template = "    {0}_CODEC_{1} = get_payload_codec('{2}') # internal\n"
+
+        for packet in self.get_packets('function'):
+            for kind, direction in [('REQUEST', 'in'), ('RESPONSE', 'out')]:
+                form = packet.get_python_format_list(direction)
+
+                if len(form) > 0:
+                    codecs += template.format(kind, packet.get_name().upper, form)
+
+        for packet in self.get_packets('callback'):
+            form = packet.get_python_format_list('out')
+
+            if len(form) > 0:
+                codecs += template.format('CALLBACK', packet.get_name().upper, form)
+
+        return common.wrap_non_empty('\n', codecs, '')
+
     def get_python_constants(self):
         constant_format = '    {constant_group_name_upper}_{constant_name_upper} = {constant_value}\n'
 
@@ -198,13 +230,13 @@ class {0}(Device):
 
     def get_python_callback_formats(self):
         callback_formats = ''
-        template = "        self.callback_formats[{0}.CALLBACK_{1}] = ({2}, '{3}')\n"
+        template = "        self.callback_formats[{0}.CALLBACK_{1}] = ({2}, {3})\n"
 
         for packet in self.get_packets('callback'):
             callback_formats += template.format(self.get_python_class_name(),
                                                 packet.get_name().upper,
                                                 packet.get_response_size(),
-                                                packet.get_python_format_list('out'))
+                                                packet.get_python_codec_reference('out'))
 
         return callback_formats + '\n'
 
@@ -232,27 +264,34 @@ class {0}(Device):
     def get_python_add_device(self):
         return '        ipcon.add_device(self)\n'
 
-    def get_python_methods(self):
+    def get_python_methods(self, asynchronous=False):
+        # the coroutines of the async device classes are generated from the
+        # same templates, they await every request and low-level call
+        if asynchronous:
+            keywords = {'def_': 'async def', 'await_': 'await ', 'with_': 'async with'}
+        else:
+            keywords = {'def_': 'def', 'await_': '', 'with_': 'with'}
+
         m_tup = """
-    def {0}(self{8}{4}):
+    {def_} {0}(self{8}{4}):
         r\"\"\"
         {10}
         \"\"\"{11}{12}
-        return {1}(*self.ipcon.send_request(self, {2}.FUNCTION_{3}, ({4}{9}), '{5}', {6}, '{7}'))
+        return {1}(*{await_}self.ipcon.send_request(self, {2}.FUNCTION_{3}, ({4}{9}), {5}, {6}, {7}))
 """
         m_ret = """
-    def {0}(self{7}{3}):
+    {def_} {0}(self{7}{3}):
         r\"\"\"
         {9}
         \"\"\"{10}{11}
-        return self.ipcon.send_request(self, {1}.FUNCTION_{2}, ({3}{8}), '{4}', {5}, '{6}')
+        return {await_}self.ipcon.send_request(self, {1}.FUNCTION_{2}, ({3}{8}), {4}, {5}, {6})
 """
         m_nor = """
-    def {0}(self{5}{3}):
+    {def_} {0}(self{5}{3}):
         r\"\"\"
         {7}
         \"\"\"{8}{9}
-        self.ipcon.send_request(self, {1}.FUNCTION_{2}, ({3}{6}), '{4}', 0, '')
+        {await_}self.ipcon.send_request(self, {1}.FUNCTION_{2}, ({3}{6}), {4}, 0, '')
 """
         methods = ''
         cls = self.get_python_class_name()
@@ -263,7 +302,7 @@ class {0}(Device):
             ns = packet.get_name().under
             nh = ns.upper()
             par = packet.get_python_parameters()
-            doc = packet.get_python_formatted_doc()
+            doc = self.get_python_method_doc(packet, ns, asynchronous)
             cp = ''
             ct = ''
 
@@ -273,28 +312,28 @@ class {0}(Device):
                 if not ',' in par:
                     ct = ','
 
-            in_f = packet.get_python_format_list('in')
+            in_f = packet.get_python_codec_reference('in')
             out_l = packet.get_response_size()
-            out_f = packet.get_python_format_list('out')
+            out_f = packet.get_python_codec_reference('out')
 
             if packet.get_function_id() == 255: # <device>.get_identity
                 check = ''
             else:
-                check = '\n        self.check_validity()\n'
+                check = '\n        {0}self.check_validity()\n'.format(keywords['await_'])
 
             coercions = common.wrap_non_empty('\n        ', packet.get_python_parameter_coercions(), '\n')
             out_c = len(packet.get_elements(direction='out'))
 
             if out_c > 1:
-                methods += m_tup.format(ns, nb, cls, nh, par, in_f, out_l, out_f, cp, ct, doc, check, coercions)
+                methods += m_tup.format(ns, nb, cls, nh, par, in_f, out_l, out_f, cp, ct, doc, check, coercions, **keywords)
             elif out_c == 1:
-                methods += m_ret.format(ns, cls, nh, par, in_f, out_l, out_f, cp, ct, doc, check, coercions)
+                methods += m_ret.format(ns, cls, nh, par, in_f, out_l, out_f, cp, ct, doc, check, coercions, **keywords)
             else:
-                methods += m_nor.format(ns, cls, nh, par, in_f, cp, ct, doc, check, coercions)
+                methods += m_nor.format(ns, cls, nh, par, in_f, cp, ct, doc, check, coercions, **keywords)
 
         # high-level
         template_stream_in = """
-    def {function_name}(self{high_level_parameters}):
+    {def_} {function_name}(self{high_level_parameters}):
         r\"\"\"
         {doc}
         \"\"\"{coercions}
@@ -306,17 +345,17 @@ class {0}(Device):
 
         if {stream_name_under}_length == 0:
             {stream_name_under}_chunk_data = [{chunk_padding}] * {chunk_cardinality}
-            ret = self.{function_name}_low_level({parameters})
+            ret = {await_}self.{function_name}_low_level({parameters})
         else:
-            with self.stream_lock:
+            {with_} self.stream_lock:
                 while {stream_name_under}_chunk_offset < {stream_name_under}_length:
                     {stream_name_under}_chunk_data = create_chunk_data({stream_name_under}, {stream_name_under}_chunk_offset, {chunk_cardinality}, {chunk_padding})
-                    ret = self.{function_name}_low_level({parameters})
+                    ret = {await_}self.{function_name}_low_level({parameters})
                     {stream_name_under}_chunk_offset += {chunk_cardinality}
 {result}
 """
         template_stream_in_fixed_length = """
-    def {function_name}(self{high_level_parameters}):
+    {def_} {function_name}(self{high_level_parameters}):
         r\"\"\"
         {doc}
         \"\"\"{coercions}
@@ -326,10 +365,10 @@ class {0}(Device):
         if len({stream_name_under}) != {stream_name_under}_length:
             raise Error(Error.INVALID_PARAMETER, '{stream_name_space} has to be exactly {{0}} items long'.format({stream_name_under}_length))
 
-        with self.stream_lock:
+        {with_} self.stream_lock:
             while {stream_name_under}_chunk_offset < {stream_name_under}_length:
                 {stream_name_under}_chunk_data = create_chunk_data({stream_name_under}, {stream_name_under}_chunk_offset, {chunk_cardinality}, {chunk_padding})
-                ret = self.{function_name}_low_level({parameters})
+                ret = {await_}self.{function_name}_low_level({parameters})
                 {stream_name_under}_chunk_offset += {chunk_cardinality}
 {result}
 """
@@ -338,7 +377,7 @@ class {0}(Device):
         template_stream_in_namedtuple_result = """
         return {result_camel_name}(*ret)"""
         template_stream_in_short_write = """
-    def {function_name}(self{high_level_parameters}):
+    {def_} {function_name}(self{high_level_parameters}):
         r\"\"\"
         {doc}
         \"\"\"{coercions}
@@ -350,15 +389,15 @@ class {0}(Device):
 
         if {stream_name_under}_length == 0:
             {stream_name_under}_chunk_data = [{chunk_padding}] * {chunk_cardinality}
-            ret = self.{function_name}_low_level({parameters})
+            ret = {await_}self.{function_name}_low_level({parameters})
             {chunk_written_0}
         else:
             {stream_name_under}_written = 0
 
-            with self.stream_lock:
+            {with_} self.stream_lock:
                 while {stream_name_under}_chunk_offset < {stream_name_under}_length:
                     {stream_name_under}_chunk_data = create_chunk_data({stream_name_under}, {stream_name_under}_chunk_offset, {chunk_cardinality}, {chunk_padding})
-                    ret = self.{function_name}_low_level({parameters})
+                    ret = {await_}self.{function_name}_low_level({parameters})
                     {chunk_written_n}
 
                     if {chunk_written_test} < {chunk_cardinality}:
@@ -378,7 +417,7 @@ class {0}(Device):
         template_stream_in_short_write_namedtuple_result = """
         return {result_camel_name}({result_fields})"""
         template_stream_in_single_chunk = """
-    def {function_name}(self{high_level_parameters}):
+    {def_} {function_name}(self{high_level_parameters}):
         r\"\"\"
         {doc}
         \"\"\"{coercions}
@@ -393,27 +432,30 @@ class {0}(Device):
 {result}
 """
         template_stream_in_single_chunk_result = """
-        return self.{function_name}_low_level({parameters})"""
+        return {await_}self.{function_name}_low_level({parameters})"""
         template_stream_in_single_chunk_namedtuple_result = """
-        return {result_camel_name}(*self.{function_name}_low_level({parameters}))"""
+        return {result_camel_name}(*{await_}self.{function_name}_low_level({parameters}))"""
         template_stream_out = """
-    def {function_name}(self{high_level_parameters}):
+    {def_} {function_name}(self{high_level_parameters}):
         r\"\"\"
         {doc}
         \"\"\"{coercions}{fixed_length}
-        with self.stream_lock:
-            ret = self.{function_name}_low_level({parameters}){dynamic_length_3}
+        {with_} self.stream_lock:
+            ret = {await_}self.{function_name}_low_level({parameters}){dynamic_length_3}
             {chunk_offset_check}{stream_name_under}_out_of_sync = ret.{stream_name_under}_chunk_offset != 0
-            {chunk_offset_check_indent}{stream_name_under}_data = ret.{stream_name_under}_chunk_data
+            {chunk_offset_check_indent}{stream_name_under}_data = create_stream_data(ret.{stream_name_under}_chunk_data, {stream_name_under}_length, {chunk_padding})
+            {chunk_offset_check_indent}{stream_name_under}_data[0:{chunk_cardinality}] = ret.{stream_name_under}_chunk_data
+            {chunk_offset_check_indent}{stream_name_under}_received = {chunk_cardinality}
 
-            while not {stream_name_under}_out_of_sync and len({stream_name_under}_data) < {stream_name_under}_length:
-                ret = self.{function_name}_low_level({parameters}){dynamic_length_4}
-                {stream_name_under}_out_of_sync = ret.{stream_name_under}_chunk_offset != len({stream_name_under}_data)
-                {stream_name_under}_data += ret.{stream_name_under}_chunk_data
+            while not {stream_name_under}_out_of_sync and {stream_name_under}_received < {stream_name_under}_length:
+                ret = {await_}self.{function_name}_low_level({parameters}){dynamic_length_4}
+                {stream_name_under}_out_of_sync = ret.{stream_name_under}_chunk_offset != {stream_name_under}_received
+                {stream_name_under}_data = write_stream_data({stream_name_under}_data, {stream_name_under}_received, ret.{stream_name_under}_chunk_data)
+                {stream_name_under}_received += {chunk_cardinality}
 
             if {stream_name_under}_out_of_sync: # discard remaining stream to bring it back in-sync
                 while ret.{stream_name_under}_chunk_offset + {chunk_cardinality} < {stream_name_under}_length:
-                    ret = self.{function_name}_low_level({parameters}){dynamic_length_5}
+                    ret = {await_}self.{function_name}_low_level({parameters}){dynamic_length_5}
 
                 raise Error(Error.STREAM_OUT_OF_SYNC, '{stream_name_space} stream is out-of-sync')
 {result}
@@ -427,19 +469,20 @@ class {0}(Device):
             if ret.{stream_name_under}_chunk_offset == (1 << {shift_size}) - 1: # maximum chunk offset -> stream has no data
                 {stream_name_under}_length = 0
                 {stream_name_under}_out_of_sync = False
-                {stream_name_under}_data = ()
+                {stream_name_under}_data = create_stream_data(ret.{stream_name_under}_chunk_data, 0, None)
+                {stream_name_under}_received = 0
             else:
                 """
         template_stream_out_single_chunk = """
-    def {function_name}(self{high_level_parameters}):
+    {def_} {function_name}(self{high_level_parameters}):
         r\"\"\"
         {doc}
         \"\"\"{coercions}
-        ret = self.{function_name}_low_level({parameters})
+        ret = {await_}self.{function_name}_low_level({parameters})
 {result}
 """
         template_stream_out_result = """
-        return {stream_name_under}_data[:{stream_name_under}_length]"""
+        return get_stream_data({stream_name_under}_data, {stream_name_under}_length)"""
         template_stream_out_single_chunk_result = """
         return ret.{stream_name_under}_data[:ret.{stream_name_under}_length]"""
         template_stream_out_namedtuple_result = """
@@ -475,14 +518,16 @@ class {0}(Device):
                     if len(packet.get_elements(direction='out', high_level=True)) < 2:
                         if stream_in.has_single_chunk():
                             result = template_stream_in_single_chunk_result.format(function_name=packet.get_name(skip=-2).under,
-                                                                                   parameters=packet.get_python_parameters())
+                                                                                   parameters=packet.get_python_parameters(),
+                                                                                   **keywords)
                         else:
                             result = template_stream_in_short_write_result.format(stream_name_under=stream_in.get_name().under)
                     else:
                         if stream_in.has_single_chunk():
                             result = template_stream_in_single_chunk_namedtuple_result.format(function_name=packet.get_name(skip=-2).under,
                                                                                               parameters=packet.get_python_parameters(),
-                                                                                              result_camel_name=packet.get_name(skip=-2).camel)
+                                                                                              result_camel_name=packet.get_name(skip=-2).camel,
+                                                                                              **keywords)
                         else:
                             fields = []
 
@@ -502,18 +547,20 @@ class {0}(Device):
                     if len(packet.get_elements(direction='out', high_level=True)) < 2:
                         if stream_in.has_single_chunk():
                             result = template_stream_in_single_chunk_result.format(function_name=packet.get_name(skip=-2).under,
-                                                                                   parameters=packet.get_python_parameters())
+                                                                                   parameters=packet.get_python_parameters(),
+                                                                                   **keywords)
                         else:
                             result = template_stream_in_result
                     else:
                         if stream_in.has_single_chunk():
                             result = template_stream_in_single_chunk_namedtuple_result.format(function_name=packet.get_name(skip=-2).under,
                                                                                               parameters=packet.get_python_parameters(),
-                                                                                              result_camel_name=packet.get_name(skip=-2).camel)
+                                                                                              result_camel_name=packet.get_name(skip=-2).camel,
+                                                                                              **keywords)
                         else:
                             result = template_stream_in_namedtuple_result.format(result_camel_name=packet.get_name(skip=-2).camel)
 
-                methods += template.format(doc=packet.get_python_formatted_doc(),
+                methods += template.format(doc=self.get_python_method_doc(packet, packet.get_name(skip=-2).under, asynchronous),
                                            coercions=common.wrap_non_empty('\n        ', packet.get_python_parameter_coercions(high_level=True), '\n'),
                                            function_name=packet.get_name(skip=-2).under,
                                            parameters=packet.get_python_parameters(),
@@ -527,7 +574,8 @@ class {0}(Device):
                                            chunk_written_0=chunk_written_0,
                                            chunk_written_n=chunk_written_n,
                                            chunk_written_test=chunk_written_test,
-                                           result=result)
+                                           result=result,
+                                           **keywords)
             elif stream_out != None:
                 if stream_out.get_fixed_length() != None:
                     fixed_length = template_stream_out_fixed_length.format(stream_name_under=stream_out.get_name().under,
@@ -556,7 +604,7 @@ class {0}(Device):
                             if stream_out.has_single_chunk():
                                 fields.append('ret.{0}_data[:ret.{0}_length]'.format(stream_out.get_name().under))
                             else:
-                                fields.append('{0}_data[:{0}_length]'.format(stream_out.get_name().under))
+                                fields.append('get_stream_data({0}_data, {0}_length)'.format(stream_out.get_name().under))
                         else:
                             fields.append('ret.{0}'.format(element.get_name().under))
 
@@ -568,7 +616,7 @@ class {0}(Device):
                 else:
                     template = template_stream_out
 
-                methods += template.format(doc=packet.get_python_formatted_doc(),
+                methods += template.format(doc=self.get_python_method_doc(packet, packet.get_name(skip=-2).under, asynchronous),
                                            coercions=common.wrap_non_empty('\n        ', packet.get_python_parameter_coercions(high_level=True), '\n'),
                                            function_name=packet.get_name(skip=-2).under,
                                            parameters=packet.get_python_parameters(),
@@ -582,7 +630,9 @@ class {0}(Device):
                                            chunk_offset_check=chunk_offset_check,
                                            chunk_offset_check_indent=chunk_offset_check_indent,
                                            chunk_cardinality=stream_out.get_chunk_data_element().get_cardinality(),
-                                           result=result)
+                                           chunk_padding=stream_out.get_chunk_data_element().get_python_default_item_value(),
+                                           result=result,
+                                           **keywords)
 
         return methods
 
@@ -608,12 +658,65 @@ class {0}(Device):
 
         return template.format(self.get_name().camel, self.get_python_class_name())
 
+    def get_python_async_import(self):
+        template = """# -*- coding: utf-8 -*-
+{0}{1}
+try:
+    from .ip_connection import Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data
+    from .ip_connection_async import AsyncDevice
+    from .{2} import {3}
+except (ValueError, ImportError):
+    try:
+        from ip_connection import Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data
+        from ip_connection_async import AsyncDevice
+        from {2} import {3}
+    except (ValueError, ImportError):
+        from tinkerforge.ip_connection import Error, create_char, create_char_list, create_string, create_chunk_data, create_stream_data, write_stream_data, get_stream_data
+        from tinkerforge.ip_connection_async import AsyncDevice
+        from tinkerforge.{2} import {3}
+"""
+
+        if not self.is_released():
+            released = '\n#### __DEVICE_IS_NOT_RELEASED__ ####\n'
+        else:
+            released = ''
+
+        return template.format(self.get_generator().get_header_comment('hash'),
+                               released,
+                               self.get_python_import_name(),
+                               ', '.join([self.get_python_class_name()] + self.get_python_namedtuple_names()))
+
+    def get_python_async_class(self):
+        template = """
+class Async{0}(AsyncDevice, {0}):
+    r\"\"\"
+    {1}
+    \"\"\"
+"""
+
+        return template.format(self.get_python_class_name(),
+                               common.select_lang(self.get_description()))
+
+    def get_python_method_doc(self, packet, function_name, asynchronous):
+        if asynchronous:
+            return 'Coroutine version of :meth:`{0}.{1}`.'.format(self.get_python_class_name(), function_name)
+
+        return packet.get_python_formatted_doc()
+
+    def get_python_async_source(self):
+        source  = self.get_python_async_import()
+        source += self.get_python_async_class()
+        source += self.get_python_methods(asynchronous=True)
+
+        return common.strip_trailing_whitespace(source)
+
     def get_python_source(self):
         source  = self.get_python_import()
         source += self.get_python_namedtuples()
         source += self.get_python_class()
         source += self.get_python_callback_id_definitions()
         source += self.get_python_function_id_definitions()
+        source += self.get_python_codec_definitions()
         source += self.get_python_constants()
         source += self.get_python_init_method()
         source += self.get_python_callback_formats()
@@ -649,6 +752,19 @@ class PythonBindingsPacket(python_common.PythonPacket):
 
         return ' '.join(forms)
 
+    def get_python_codec_reference(self, io):
+        if len(self.get_elements(direction=io)) == 0:
+            return "''"
+
+        if self.get_type() == 'callback':
+            kind = 'CALLBACK'
+        elif io == 'in':
+            kind = 'REQUEST'
+        else:
+            kind = 'RESPONSE'
+
+        return '{0}.{1}_CODEC_{2}'.format(self.get_device().get_python_class_name(), kind, self.get_name().upper)
+
     def get_python_parameter_coercions(self, high_level=False):
         coercions = []
 
@@ -679,15 +795,21 @@ class PythonBindingsGenerator(python_common.PythonGeneratorTrait, common.Binding
     def generate(self, device):
         filename = '{0}_{1}.py'.format(device.get_category().under, device.get_name().under)
 
+        async_filename = '{0}_{1}_async.py'.format(device.get_category().under, device.get_name().under)
+
         with open(os.path.join(self.get_bindings_dir(), filename), 'w') as f:
             f.write(device.get_python_source())
 
+        with open(os.path.join(self.get_bindings_dir(), async_filename), 'w') as f:
+            f.write(device.get_python_async_source())
+
         self.device_factory_all_classes.append((device.get_python_import_name(), device.get_python_class_name()))
 
         if device.is_released():
             self.device_factory_released_classes.append((device.get_python_import_name(), device.get_python_class_name()))
             self.device_display_names.append((device.get_device_identifier(), device.get_long_display_name()))
             self.released_files.append(filename)
+            self.released_files.append(async_filename)
 
     def finish(self):
         template_import = """try:
@@ -758,6 +880,6 @@ def generate(root_dir, language, internal):
     common.generate(root_dir, language, internal, PythonBindingsGenerator)
 
 if __name__ == '__main__':
-    args = common.dockerize('python', __file__, add_internal_argument=True)
+    args = common.dockerize('python', __file__, add_internal_argument=True, add_incremental_argument=True)
 
     generate(os.getcwd(), 'en', args.internal)
@@ -22,6 +22,11 @@ try:
 except ImportError:
     import Queue as queue # Python 2
 
+try:
+    import numpy # optional, only required for NumPy arrays mode
+except ImportError:
+    numpy = None
+
 if not 'INTERNAL_DEVICE_DISPLAY_NAMES' in globals():
     try:
         from .device_display_names import get_device_display_name
@@ -99,6 +104,40 @@ def create_chunk_data(data, chunk_offset, chunk_length, chunk_padding):
 
     return chunk_data
 
+# internal
+def create_stream_data(chunk_data, stream_length, chunk_padding):
+    # preallocate the stream data for reassembling a high-level stream. if the
+    # chunk data got decoded as a NumPy array then the stream data is a NumPy
+    # array as well. it is one chunk longer than the stream, because the last
+    # chunk is written in full before the stream data gets truncated
+    if numpy != None and isinstance(chunk_data, numpy.ndarray):
+        return numpy.zeros(stream_length + len(chunk_data), dtype=chunk_data.dtype)
+
+    return [chunk_padding] * stream_length
+
+# internal
+def write_stream_data(stream_data, offset, chunk_data):
+    # writes the chunk data in-place and returns the stream data. a dynamic
+    # stream can report a longer stream length with a later chunk. a list
+    # grows by the slice assignment, a NumPy array has to be grown here
+    end = offset + len(chunk_data)
+
+    if numpy != None and isinstance(stream_data, numpy.ndarray) and end > len(stream_data):
+        grown_data = numpy.zeros(max(end, 2 * len(stream_data)), dtype=stream_data.dtype)
+        grown_data[:offset] = stream_data[:offset]
+        stream_data = grown_data
+
+    stream_data[offset:end] = chunk_data
+
+    return stream_data
+
+# internal
+def get_stream_data(stream_data, stream_length):
+    if numpy != None and isinstance(stream_data, numpy.ndarray):
+        return stream_data[:stream_length]
+
+    return tuple(stream_data[:stream_length])
+
 if sys.hexversion < 0x03000000:
     # internal
     def create_char(value): # return str with len() == 1 and ord() <= 255
@@ -215,118 +254,250 @@ else:
         else:
             return ''.join(create_char_list(value, expected_type='string'))
 
+# Mark start and end of the payload codec, so that the saleae bindings
+# can extract it
+# UNPACK_PAYLOAD_CUT_HERE
 # internal
-def pack_payload(data, form):
-    if sys.hexversion < 0x03000000:
-        packed = ''
-    else:
-        packed = b''
-
-    for f, d in zip(form.split(' '), data):
-        if '!' in f:
+class PayloadCodec(object):
+    KIND_VALUE = 0
+    KIND_ARRAY = 1
+    KIND_BOOL_ARRAY = 2
+    KIND_CHAR = 3
+    KIND_CHAR_ARRAY = 4
+    KIND_STRING = 5
+
+    def __init__(self, form):
+        # compile the space separated form into one struct.Struct for the
+        # whole payload plus a list of (kind, start, count, element_form)
+        # steps that describe how to map the struct values to the payload
+        # elements
+        self.form = form
+        self.steps = []
+        self.plain = True # all elements are single values without conversion
+        struct_form = '<'
+        start = 0
+
+        for f in form.split(' ') if len(form) > 0 else []:
+            t = f[-1]
+
             if len(f) > 1:
-                if int(f.replace('!', '')) != len(d):
+                count = int(f[:-1])
+            else:
+                count = None
+
+            if t == '!':
+                if count == None:
+                    kind = PayloadCodec.KIND_VALUE
+                    f_ = '?'
+                    size = 1
+                else:
+                    kind = PayloadCodec.KIND_BOOL_ARRAY
+                    size = (count + 7) // 8
+                    f_ = '{0}B'.format(size)
+            elif t == 'c':
+                if count == None:
+                    kind = PayloadCodec.KIND_CHAR
+                    f_ = 'B'
+                    size = 1
+                else:
+                    kind = PayloadCodec.KIND_CHAR_ARRAY
+                    f_ = '{0}B'.format(count)
+                    size = count
+            elif t == 's':
+                kind = PayloadCodec.KIND_STRING
+                f_ = f
+                size = 1
+            elif count == None:
+                kind = PayloadCodec.KIND_VALUE
+                f_ = t
+                size = 1
+            else:
+                kind = PayloadCodec.KIND_ARRAY
+                f_ = f
+                size = count
+
+            if kind != PayloadCodec.KIND_VALUE:
+                self.plain = False
+
+            self.steps.append((kind, start, count, f_))
+            struct_form += f_
+            start += size
+
+        self.struct = struct.Struct(struct_form)
+        self.size = self.struct.size
+        self.single = len(self.steps) == 1
+        self.has_arrays = any([step[0] in [PayloadCodec.KIND_ARRAY, PayloadCodec.KIND_BOOL_ARRAY] for step in self.steps])
+
+    def pack(self, data):
+        if self.plain:
+            return self.struct.pack(*data)
+
+        values = []
+
+        for (kind, _, count, _), d in zip(self.steps, data):
+            if kind == PayloadCodec.KIND_VALUE:
+                values.append(d)
+            elif kind == PayloadCodec.KIND_BOOL_ARRAY:
+                if count != len(d):
                     raise ValueError('Incorrect bool list length')
 
-                p = [0] * int(math.ceil(len(d) / 8.0))
+                p = [0] * ((count + 7) // 8)
 
                 for i, b in enumerate(d):
                     if b:
                         p[i // 8] |= 1 << (i % 8)
 
-                packed += struct.pack('<{0}B'.format(len(p)), *p)
-            else:
-                packed += struct.pack('<?', d)
-        elif 'c' in f:
-            if sys.hexversion < 0x03000000:
-                if len(f) > 1:
-                    packed += struct.pack('<' + f, *d)
+                values.extend(p)
+            elif kind == PayloadCodec.KIND_STRING:
+                if sys.hexversion < 0x03000000:
+                    values.append(d)
                 else:
-                    packed += struct.pack('<' + f, d)
+                    values.append(bytes(map(ord, d)))
+            elif kind == PayloadCodec.KIND_CHAR:
+                values.append(ord(d))
             else:
-                if len(f) > 1:
-                    packed += struct.pack('<' + f, *list(map(lambda char: bytes([ord(char)]), d)))
+                if count != len(d):
+                    raise struct.error('pack expected {0} items for packing (got {1})'.format(count, len(d)))
+
+                if kind == PayloadCodec.KIND_CHAR_ARRAY:
+                    values.extend(map(ord, d))
                 else:
-                    packed += struct.pack('<' + f, bytes([ord(d)]))
-        elif 's' in f:
-            if sys.hexversion < 0x03000000:
-                packed += struct.pack('<' + f, d)
-            else:
-                packed += struct.pack('<' + f, bytes(map(ord, d)))
-        elif len(f) > 1:
-            packed += struct.pack('<' + f, *d)
-        else:
-            packed += struct.pack('<' + f, d)
+                    values.extend(d)
 
-    return packed
+        return self.struct.pack(*values)
+
+    def unpack(self, data, offset=0):
+        values = self.struct.unpack_from(data, offset)
+
+        if self.plain:
+            if self.single:
+                return values[0]
+
+            return list(values)
+
+        return self.unpack_steps(values, self.steps)
+
+    def unpack_steps(self, values, steps):
+        ret = []
+
+        for kind, start, count, _ in steps:
+            if kind == PayloadCodec.KIND_VALUE:
+                ret.append(values[start])
+            elif kind == PayloadCodec.KIND_ARRAY:
+                ret.append(values[start:start + count])
+            elif kind == PayloadCodec.KIND_BOOL_ARRAY:
+                ret.append(tuple([values[start + i // 8] & (1 << (i % 8)) != 0 for i in range(count)]))
+            elif kind == PayloadCodec.KIND_CHAR:
+                ret.append(chr(values[start]))
+            elif kind == PayloadCodec.KIND_CHAR_ARRAY:
+                ret.append(tuple(map(chr, values[start:start + count])))
+            else: # KIND_STRING
+                s = values[start].split(b'\x00', 1)[0]
+
+                if sys.hexversion >= 0x03000000:
+                    s = s.decode('latin-1')
+
+                ret.append(s)
+
+        if self.single:
+            return ret[0]
+
+        return ret
+
+payload_codecs = {} # by form
 
-# Mark start and end of the unpack_payload funtion, so that the
-# saleae bindings can extract it
-# UNPACK_PAYLOAD_CUT_HERE
 # internal
-def unpack_payload(data, form):
-    ret = []
+def get_payload_codec(form):
+    codec = payload_codecs.get(form)
 
-    for f in form.split(' '):
-        o = f
+    if codec == None:
+        codec = PayloadCodec(form)
+        payload_codecs[form] = codec
 
-        if '!' in f:
-            if len(f) > 1:
-                f = '{0}B'.format(int(math.ceil(int(f.replace('!', '')) / 8.0)))
-            else:
-                f = 'B'
+    return codec
 
-        f = '<' + f
-        length = struct.calcsize(f)
-        x = struct.unpack(f, data[:length])
+# internal
+def pack_payload(data, form): # form is a space separated form string or a PayloadCodec
+    if not isinstance(form, PayloadCodec):
+        form = get_payload_codec(form)
 
-        if '!' in o:
-            y = []
+    return form.pack(data)
 
-            if len(o) > 1:
-                for i in range(int(o.replace('!', ''))):
-                    y.append(x[i // 8] & (1 << (i % 8)) != 0)
-            else:
-                y.append(x[0] != 0)
+# internal
+def unpack_payload(data, form): # form is a space separated form string or a PayloadCodec
+    if not isinstance(form, PayloadCodec):
+        form = get_payload_codec(form)
 
-            x = tuple(y)
+    return form.unpack(data)
 
-        if 'c' in f:
-            if sys.hexversion < 0x03000000:
-                if len(x) > 1:
-                    ret.append(x)
-                else:
-                    ret.append(x[0])
-            else:
-                if len(x) > 1:
-                    ret.append(tuple(map(lambda item: chr(ord(item)), x)))
-                else:
-                    ret.append(chr(ord(x[0])))
-        elif 's' in f:
-            if sys.hexversion < 0x03000000:
-                s = x[0]
+# UNPACK_PAYLOAD_CUT_HERE
+
+numpy_payload_layouts = {} # by form
+
+# internal
+def get_numpy_payload_layout(codec):
+    # compile a struct that skips the array elements of the codec, plus a
+    # list of (byte_offset, count, dtype) arrays that are decoded directly
+    # from the payload at their byte offset and appended to the struct
+    # values. the returned steps map both to the payload elements
+    layout = numpy_payload_layouts.get(codec.form)
+
+    if layout == None:
+        struct_form = '<'
+        arrays = []
+        steps = []
+        array_indices = [] # indices into steps
+        start = 0
+        byte_offset = 0
+
+        for kind, _, count, f_ in codec.steps:
+            byte_size = struct.calcsize('<' + f_)
+
+            if kind == PayloadCodec.KIND_ARRAY:
+                arrays.append((byte_offset, count, '<' + f_[-1]))
+            elif kind == PayloadCodec.KIND_BOOL_ARRAY:
+                arrays.append((byte_offset, count, None))
+
+            if kind in [PayloadCodec.KIND_ARRAY, PayloadCodec.KIND_BOOL_ARRAY]:
+                array_indices.append(len(steps))
+                steps.append(None)
+                struct_form += '{0}x'.format(byte_size)
             else:
-                s = ''.join(map(chr, x[0]))
+                steps.append((kind, start, count, f_))
+                struct_form += f_
+                start += count if kind == PayloadCodec.KIND_CHAR_ARRAY else 1
 
-            i = s.find('\x00')
+            byte_offset += byte_size
 
-            if i >= 0:
-                s = s[:i]
+        for i, index in enumerate(array_indices):
+            steps[index] = (PayloadCodec.KIND_VALUE, start + i, None, None)
 
-            ret.append(s)
-        elif len(x) > 1:
-            ret.append(x)
-        else:
-            ret.append(x[0])
+        layout = (struct.Struct(struct_form), arrays, steps)
+        numpy_payload_layouts[codec.form] = layout
 
-        data = data[length:]
+    return layout
 
-    if len(ret) == 1:
-        return ret[0]
-    else:
-        return ret
+# internal
+def unpack_numpy_payload(data, form): # form is a space separated form string or a PayloadCodec
+    # numeric arrays are returned as NumPy arrays viewing the given data and
+    # bool arrays as NumPy bool arrays
+    if not isinstance(form, PayloadCodec):
+        form = get_payload_codec(form)
+
+    if not form.has_arrays:
+        return form.unpack(data)
+
+    numpy_struct, arrays, steps = get_numpy_payload_layout(form)
+    values = list(numpy_struct.unpack_from(data))
+
+    for byte_offset, count, dtype in arrays:
+        if dtype == None: # bool array
+            bits = numpy.frombuffer(data, dtype=numpy.uint8, count=(count + 7) // 8, offset=byte_offset)
+            values.append(numpy.unpackbits(bits, count=count, bitorder='little').view(numpy.bool_))
+        else:
+            values.append(numpy.frombuffer(data, dtype, count, byte_offset))
 
-# UNPACK_PAYLOAD_CUT_HERE
+    return form.unpack_steps(values, steps)
 
 class Error(Exception):
     TIMEOUT = -1
@@ -396,11 +567,9 @@ class Device(object):
         self.registered_callbacks = {}
         self.callback_formats = {}
         self.high_level_callbacks = {}
-        self.expected_response_function_id = None # protected by request_lock
-        self.expected_response_sequence_number = None # protected by request_lock
-        self.response_queue = queue.Queue()
         self.request_lock = threading.Lock()
         self.stream_lock = threading.Lock()
+        self.numpy_arrays = None # None means use the setting of the IP Connection
 
         self.response_expected = [Device.RESPONSE_EXPECTED_INVALID_FUNCTION_ID] * 256
         self.response_expected[IPConnection.FUNCTION_ADC_CALIBRATE] = Device.RESPONSE_EXPECTED_ALWAYS_TRUE
@@ -490,6 +659,34 @@ class Device(object):
             if self.response_expected[i] in [Device.RESPONSE_EXPECTED_TRUE, Device.RESPONSE_EXPECTED_FALSE]:
                 self.response_expected[i] = flag
 
+    def set_numpy_arrays(self, numpy_arrays):
+        """
+        Enables or disables the NumPy arrays mode for this device, overriding
+        the setting of the IP Connection. Set to *None* to use the setting of
+        the IP Connection again, this is the default.
+
+        See the set_numpy_arrays function of the IP Connection for details.
+        """
+
+        if numpy_arrays != None:
+            numpy_arrays = bool(numpy_arrays)
+
+            if numpy_arrays and numpy == None:
+                raise Error(Error.NOT_SUPPORTED, 'NumPy arrays mode requires the numpy module')
+
+        self.numpy_arrays = numpy_arrays
+
+    def get_numpy_arrays(self):
+        """
+        Returns *true* if the NumPy arrays mode is in effect for this device,
+        either by its own setting or by the setting of the IP Connection.
+        """
+
+        if self.numpy_arrays != None:
+            return self.numpy_arrays
+
+        return self.ipcon.numpy_arrays
+
     # internal
     def check_validity(self):
         if self.replaced:
@@ -575,6 +772,13 @@ class IPConnection(object):
 
     DISCONNECT_PROBE_INTERVAL = 5
 
+    RECEIVE_BUFFER_SIZE = 8192
+    MAX_PACKET_LENGTH = 80
+
+    # drop_policy parameter to set_callback_queue_limit
+    CALLBACK_DROP_POLICY_NEWEST = 0
+    CALLBACK_DROP_POLICY_OLDEST = 1
+
     class CallbackContext(object):
         def __init__(self):
             self.queue = None
@@ -582,6 +786,91 @@ class IPConnection(object):
             self.packet_dispatch_allowed = False
             self.lock = None
 
+    class PendingRequest(object):
+        def __init__(self, key):
+            self.key = key # (uid, function_id, sequence_number)
+            self.response_queue = queue.Queue()
+
+    # one request of a batch call. the device function is called twice: the
+    # first call captures the request instead of sending it and the second
+    # call replays the received response, so that the device function can
+    # convert the response to its return value as usual
+    class BatchRequest(object):
+        def __init__(self, device, function, args):
+            self.device = device
+            self.function = function
+            self.args = args
+            self.payload = None # captured request payload
+            self.response_expected = False
+            self.pending_request = None
+            self.function_id = None
+            self.response = None
+            self.replaying = False
+            self.replayed = False
+            self.result = None
+            self.error = None
+
+    class BatchRequestCaptured(Exception):
+        pass
+
+    # queue.Queue that keeps track of the number of queued packets, so that the
+    # receive thread can limit the queued packets without blocking and without
+    # ever dropping meta or exit items
+    class CallbackQueue(queue.Queue):
+        def _init(self, maxsize):
+            queue.Queue._init(self, maxsize)
+
+            self.packet_count = 0
+
+        def _put(self, item):
+            queue.Queue._put(self, item)
+
+            if item[0] == IPConnection.QUEUE_PACKET:
+                self.packet_count += 1
+
+        def _get(self):
+            item = queue.Queue._get(self)
+
+            if item[0] == IPConnection.QUEUE_PACKET:
+                self.packet_count -= 1
+
+            return item
+
+        # returns True if a packet got dropped
+        def put_packet(self, packet, limit, drop_oldest):
+            with self.mutex:
+                if limit > 0 and self.packet_count >= limit:
+                    if not drop_oldest:
+                        return True
+
+                    for i, item in enumerate(self.queue):
+                        if item[0] == IPConnection.QUEUE_PACKET:
+                            del self.queue[i]
+                            self.packet_count -= 1
+                            break
+
+                    dropped = True
+                else:
+                    dropped = False
+
+                self._put((IPConnection.QUEUE_PACKET, packet))
+                self.not_empty.notify()
+
+                return dropped
+
+        # blocks until at least one item is available
+        def get_all(self):
+            with self.not_empty:
+                while self._qsize() == 0:
+                    self.not_empty.wait()
+
+                items = list(self.queue)
+
+                self.queue.clear()
+                self.packet_count = 0
+
+                return items
+
     def __init__(self):
         """
         Creates an IP Connection object that can be used to enumerate the available
@@ -591,6 +880,13 @@ class IPConnection(object):
         self.host = None
         self.port = None
         self.timeout = 2.5
+        self.request_pipelining = False
+        self.callback_coalescing = False
+        self.callback_queue_limit = 0
+        self.callback_drop_policy = IPConnection.CALLBACK_DROP_POLICY_NEWEST
+        self.callback_dropped_count = 0
+        self.callback_coalesced_count = 0
+        self.numpy_arrays = False
         self.auto_reconnect = True
         self.auto_reconnect_allowed = False
         self.auto_reconnect_pending = False
@@ -598,6 +894,9 @@ class IPConnection(object):
         self.connect_failure_callback = None
         self.sequence_number_lock = threading.Lock()
         self.next_sequence_number = 0 # protected by sequence_number_lock
+        self.pending_requests = {} # protected by pending_requests_condition, by (uid, function_id, sequence_number)
+        self.pending_requests_condition = threading.Condition()
+        self.batch_context = threading.local() # batch request of the current thread
         self.authentication_lock = threading.Lock() # protects authentication handshake
         self.next_authentication_nonce = 0 # protected by authentication_lock
         self.devices = {}
@@ -775,6 +1074,130 @@ class IPConnection(object):
 
         return self.timeout
 
+    def set_request_pipelining(self, request_pipelining):
+        """
+        Enables or disables request pipelining. If request pipelining is
+        disabled, only one request per device can be in flight at the same
+        time and concurrent calls to the same device from different threads
+        are serialized. If request pipelining is enabled, concurrent calls
+        to the same device are sent without waiting for the responses to
+        earlier calls. Responses are matched to their requests by UID,
+        function ID and sequence number. Up to 15 calls of the same function
+        of the same device can be in flight at the same time.
+
+        Default value is *False*.
+        """
+
+        self.request_pipelining = bool(request_pipelining)
+
+    def get_request_pipelining(self):
+        """
+        Returns *true* if request pipelining is enabled, *false* otherwise.
+        """
+
+        return self.request_pipelining
+
+    def set_callback_coalescing(self, callback_coalescing):
+        """
+        Enables or disables callback coalescing. If callback coalescing is
+        enabled, the callback thread takes all queued callbacks at once and
+        only delivers the latest value of each callback of each device out of
+        them. Values that were superseded this way are skipped. This allows
+        the callback functions to keep up with devices that trigger callbacks
+        faster than the callback functions can handle them. Enumerate
+        callbacks and the low-level callbacks of high-level callbacks are
+        never coalesced.
+
+        Coalescing is done for all other callbacks, it cannot tell value
+        callbacks that report a current state apart from event callbacks. A
+        skipped event is lost, for example a received CAN frame or a button
+        press that is followed by the next event of the same callback before
+        the callback thread takes it. Only enable callback coalescing if
+        losing such intermediate callbacks is acceptable for all registered
+        callbacks. The number of skipped callbacks is reported by the
+        get_callback_statistics function.
+
+        Default value is *False*.
+        """
+
+        self.callback_coalescing = bool(callback_coalescing)
+
+    def get_callback_coalescing(self):
+        """
+        Returns *true* if callback coalescing is enabled, *false* otherwise.
+        """
+
+        return self.callback_coalescing
+
+    def set_callback_queue_limit(self, callback_queue_limit, drop_policy=CALLBACK_DROP_POLICY_NEWEST):
+        """
+        Sets the maximum number of callbacks that can be queued for the
+        callback thread. If the limit is reached then either the newly
+        received callback is dropped (CALLBACK_DROP_POLICY_NEWEST) or the
+        oldest queued callback is dropped to make room for the newly received
+        one (CALLBACK_DROP_POLICY_OLDEST). A limit of 0 disables the limit.
+
+        Default limit is 0.
+        """
+
+        callback_queue_limit = int(callback_queue_limit)
+
+        if callback_queue_limit < 0:
+            raise ValueError('Callback queue limit cannot be negative')
+
+        if drop_policy not in [IPConnection.CALLBACK_DROP_POLICY_NEWEST, IPConnection.CALLBACK_DROP_POLICY_OLDEST]:
+            raise ValueError('Invalid drop policy {0}'.format(drop_policy))
+
+        self.callback_queue_limit = callback_queue_limit
+        self.callback_drop_policy = drop_policy
+
+    def get_callback_queue_limit(self):
+        """
+        Returns the callback queue limit and drop policy as set by
+        set_callback_queue_limit.
+        """
+
+        return self.callback_queue_limit, self.callback_drop_policy
+
+    def get_callback_statistics(self):
+        """
+        Returns the number of callbacks that were dropped because the callback
+        queue limit was reached and the number of callbacks that were skipped
+        by callback coalescing, since this IP Connection was created.
+        """
+
+        return self.callback_dropped_count, self.callback_coalesced_count
+
+    def set_numpy_arrays(self, numpy_arrays):
+        """
+        Enables or disables the NumPy arrays mode for all devices using this
+        IP Connection, devices can override this setting. By default this mode
+        is disabled and array values are returned as tuples.
+
+        With this mode enabled numeric arrays in getter responses and callbacks
+        are returned as read-only NumPy arrays with the matching dtype that
+        view the received packet instead of creating one Python object per
+        array element. Bool arrays are returned as NumPy bool arrays. High-level
+        getters and callbacks reassemble their streams into a NumPy array as
+        well. Char arrays and strings are not affected.
+
+        This mode requires NumPy 1.17 or newer.
+        """
+
+        numpy_arrays = bool(numpy_arrays)
+
+        if numpy_arrays and numpy == None:
+            raise Error(Error.NOT_SUPPORTED, 'NumPy arrays mode requires the numpy module')
+
+        self.numpy_arrays = numpy_arrays
+
+    def get_numpy_arrays(self):
+        """
+        Returns *true* if the NumPy arrays mode is enabled, *false* otherwise.
+        """
+
+        return self.numpy_arrays
+
     def enumerate(self):
         """
         Broadcasts an enumerate request. All devices will respond with an
@@ -785,6 +1208,115 @@ class IPConnection(object):
 
         self.send(request)
 
+    def batch(self, requests, timeout=None):
+        """
+        Calls many device functions at once. Each request is a tuple of a
+        device, the name of one of its functions and the arguments for that
+        function, for example *(temperature, 'get_temperature', ())*. The
+        arguments can be omitted if the function has no parameters. Instead
+        of a name a callable can be given that sends one request of the
+        device, it is called with the arguments.
+
+        All requests for the same IP Connection are written with a single
+        send and the responses are collected concurrently. The devices can
+        use different IP Connections. The *timeout* (in seconds) applies to
+        the whole batch, by default the timeout of this IP Connection is used.
+
+        Returns a list of *(result, error)* tuples in the order of the
+        requests. The *error* is *None* on success, otherwise it is the
+        exception that the function call would have raised, typically an
+        Error, and *result* is *None*.
+
+        Only functions that send a single request can be batched. High-level
+        functions are rejected with a NOT_SUPPORTED error before anything is
+        sent, their low-level functions can be batched instead. A callable
+        has to send exactly one request. The identity of a device is checked
+        before its first request, this takes one extra round trip per device
+        the first time.
+        """
+
+        if timeout == None:
+            timeout = self.timeout
+
+        batch_requests = []
+        batch_requests_by_ipcon = {}
+
+        # capture the requests
+        for request in requests:
+            device = request[0]
+
+            if len(request) > 2:
+                args = request[2]
+            else:
+                args = ()
+
+            if callable(request[1]):
+                function = request[1]
+            else:
+                function = getattr(device, request[1])
+
+            batch_request = IPConnection.BatchRequest(device, function, args)
+            batch_requests.append(batch_request)
+
+            # a high-level function sends one request per stream chunk. it
+            # would only be detected on replay, after its first chunk was
+            # already sent, so reject it upfront
+            if not callable(request[1]) and hasattr(device, request[1] + '_low_level'):
+                batch_request.error = Error(Error.NOT_SUPPORTED, 'Function {0} is a high-level function and cannot be batched'.format(request[1]))
+                continue
+
+            try:
+                device.check_validity()
+            except Error as e:
+                batch_request.error = e
+                continue
+
+            device.ipcon.batch_context.request = batch_request
+
+            try:
+                batch_request.result = batch_request.function(*args)
+            except IPConnection.BatchRequestCaptured:
+                batch_requests_by_ipcon.setdefault(device.ipcon, []).append(batch_request)
+            except Exception as e: # e.g. struct.error for an out-of-range argument
+                batch_request.error = e
+            finally:
+                device.ipcon.batch_context.request = None
+
+        deadline = time.time() + timeout
+
+        try:
+            for ipcon, ipcon_batch_requests in batch_requests_by_ipcon.items():
+                ipcon.batch_send(ipcon_batch_requests, deadline)
+
+            self.batch_wait(batch_requests, deadline)
+        finally:
+            for batch_request in batch_requests:
+                if batch_request.pending_request != None:
+                    batch_request.device.ipcon.remove_pending_request(batch_request.pending_request)
+
+        # replay the responses
+        results = []
+
+        for batch_request in batch_requests:
+            if batch_request.payload != None and batch_request.error == None:
+                device = batch_request.device
+                device.ipcon.batch_context.request = batch_request
+                batch_request.replaying = True
+
+                try:
+                    batch_request.result = batch_request.function(*batch_request.args)
+                except Exception as e:
+                    batch_request.error = e
+                finally:
+                    device.ipcon.batch_context.request = None
+
+            if batch_request.error != None:
+                results.append((None, batch_request.error))
+            else:
+                results.append((batch_request.result, None))
+
+        return results
+
     def wait(self):
         """
         Stops the current thread until unwait is called.
@@ -824,7 +1356,7 @@ class IPConnection(object):
         if self.callback is None:
             try:
                 self.callback = IPConnection.CallbackContext()
-                self.callback.queue = queue.Queue()
+                self.callback.queue = IPConnection.CallbackQueue()
                 self.callback.packet_dispatch_allowed = False
                 self.callback.lock = threading.Lock()
                 self.callback.thread = threading.Thread(name='Callback-Processor',
@@ -1015,14 +1547,26 @@ class IPConnection(object):
 
     # internal
     def receive_loop(self, socket_id):
-        if sys.hexversion < 0x03000000:
-            pending_data = ''
-        else:
-            pending_data = bytes()
+        # receive into a preallocated buffer and parse packets in-place. the
+        # pending data is moved to the front of the buffer only if there is
+        # not enough space left at the end for another complete packet
+        receive_buffer = bytearray(IPConnection.RECEIVE_BUFFER_SIZE)
+        receive_view = memoryview(receive_buffer)
+        pending_start = 0
+        pending_end = 0
 
         while self.receive_flag:
+            if pending_start == pending_end:
+                pending_start = 0
+                pending_end = 0
+            elif len(receive_buffer) - pending_end < IPConnection.MAX_PACKET_LENGTH:
+                pending_length = pending_end - pending_start
+                receive_view[0:pending_length] = receive_view[pending_start:pending_end]
+                pending_start = 0
+                pending_end = pending_length
+
             try:
-                data = self.socket.recv(8192)
+                length = self.socket.recv_into(receive_view[pending_end:])
             except socket.timeout:
                 continue
             except socket.error:
@@ -1034,26 +1578,26 @@ class IPConnection(object):
                     self.handle_disconnect_by_peer(IPConnection.DISCONNECT_REASON_ERROR, socket_id, False)
                 break
 
-            if len(data) == 0:
+            if length == 0:
                 if self.receive_flag:
                     self.handle_disconnect_by_peer(IPConnection.DISCONNECT_REASON_SHUTDOWN, socket_id, False)
                 break
 
-            pending_data += data
+            pending_end += length
 
             while self.receive_flag:
-                if len(pending_data) < 8:
+                if pending_end - pending_start < 8:
                     # Wait for complete header
                     break
 
-                length = get_length_from_data(pending_data)
+                length = receive_buffer[pending_start + 4]
 
-                if len(pending_data) < length:
+                if pending_end - pending_start < length:
                     # Wait for complete packet
                     break
 
-                packet = pending_data[0:length]
-                pending_data = pending_data[length:]
+                packet = receive_view[pending_start:pending_start + length].tobytes()
+                pending_start += length
 
                 self.handle_response(packet)
 
@@ -1149,6 +1693,20 @@ class IPConnection(object):
         except Error:
             return # silently ignoring callback for invalid device
 
+        for callback_id, values in self.unpack_device_callbacks(device, function_id, packet):
+            cb = device.registered_callbacks.get(callback_id)
+
+            if cb != None:
+                cb(*values)
+
+    # internal
+    def unpack_device_callbacks(self, device, function_id, packet):
+        # yields (callback_id, values) for each callback that is complete
+        # with this packet. this includes high-level callbacks whose stream
+        # is completed by this packet
+        payload = packet[8:]
+        numpy_arrays = device.get_numpy_arrays()
+
         if -function_id in device.high_level_callbacks:
             hlcb = device.high_level_callbacks[-function_id] # [roles, options, data]
             length, form = device.callback_formats[function_id] # FIXME: currently assuming that low-level callback has more than one element
@@ -1156,7 +1714,10 @@ class IPConnection(object):
             if len(packet) != length:
                 return # silently ignoring callback with wrong length
 
-            llvalues = unpack_payload(payload, form)
+            if numpy_arrays:
+                llvalues = unpack_numpy_payload(payload, form)
+            else:
+                llvalues = unpack_payload(payload, form)
             has_data = False
             data = None
 
@@ -1174,30 +1735,31 @@ class IPConnection(object):
 
             if hlcb[2] == None: # no stream in-progress
                 if chunk_offset == 0: # stream starts
-                    hlcb[2] = chunk_data
-
-                    if len(hlcb[2]) >= length: # stream complete
-                        has_data = True
-                        data = hlcb[2][:length]
-                        hlcb[2] = None
+                    hlcb[2] = [create_stream_data(chunk_data, length, None), 0] # [preallocated stream data, received length]
                 else: # ignore tail of current stream, wait for next stream start
                     pass
-            else: # stream in-progress
-                if chunk_offset != len(hlcb[2]): # stream out-of-sync
-                    has_data = True
-                    data = None
-                    hlcb[2] = None
-                else: # stream in-sync
-                    hlcb[2] += chunk_data
+            elif chunk_offset != hlcb[2][1]: # stream out-of-sync
+                has_data = True
+                data = None
+                hlcb[2] = None
 
-                    if len(hlcb[2]) >= length: # stream complete
-                        has_data = True
-                        data = hlcb[2][:length]
-                        hlcb[2] = None
+            if hlcb[2] != None: # stream in-sync
+                stream_data, received_length = hlcb[2]
 
-            cb = device.registered_callbacks.get(-function_id)
+                # write the chunk in-place instead of concatenating the
+                # stream data, this keeps the reassembly linear in the
+                # stream length
+                stream_data = write_stream_data(stream_data, received_length, chunk_data)
+                received_length += len(chunk_data)
 
-            if has_data and cb != None:
+                if received_length >= length: # stream complete
+                    has_data = True
+                    data = get_stream_data(stream_data, length)
+                    hlcb[2] = None
+                else:
+                    hlcb[2] = [stream_data, received_length]
+
+            if has_data and self.is_callback_registered(device, -function_id):
                 result = []
 
                 for role, llvalue in zip(hlcb[0], llvalues):
@@ -1206,11 +1768,9 @@ class IPConnection(object):
                     elif role == None:
                         result.append(llvalue)
 
-                cb(*tuple(result))
+                yield -function_id, tuple(result)
 
-        cb = device.registered_callbacks.get(function_id)
-
-        if cb != None:
+        if self.is_callback_registered(device, function_id):
             length, form = device.callback_formats.get(function_id, (None, None))
 
             if length == None:
@@ -1219,30 +1779,86 @@ class IPConnection(object):
             if len(packet) != length:
                 return # silently ignoring callback with wrong length
 
-            if len(form) == 0:
-                cb()
-            elif ' ' not in form:
-                cb(unpack_payload(payload, form))
+            if not isinstance(form, PayloadCodec):
+                form = get_payload_codec(form)
+
+            if numpy_arrays:
+                values = unpack_numpy_payload(payload, form)
+            else:
+                values = form.unpack(payload)
+
+            if form.single:
+                yield function_id, (values,)
             else:
-                cb(*unpack_payload(payload, form))
+                yield function_id, values # also covers callbacks without parameters
+
+    # internal
+    def is_callback_registered(self, device, callback_id):
+        return callback_id in device.registered_callbacks
 
     # internal
     def callback_loop(self, callback):
         while True:
-            kind, data = callback.queue.get()
+            if self.callback_coalescing:
+                items = self.coalesce_callback_items(callback.queue.get_all())
+            else:
+                items = [callback.queue.get()]
+
+            for kind, data in items:
+                # FIXME: cannot hold callback lock here because this can
+                #        deadlock due to an ordering problem with the socket lock
+                #with callback.lock:
+                if True:
+                    if kind == IPConnection.QUEUE_EXIT:
+                        return
+                    elif kind == IPConnection.QUEUE_META:
+                        self.dispatch_meta(*data)
+                    elif kind == IPConnection.QUEUE_PACKET:
+                        # don't dispatch callbacks when the receive thread isn't running
+                        if callback.packet_dispatch_allowed:
+                            self.dispatch_packet(data)
 
-            # FIXME: cannot hold callback lock here because this can
-            #        deadlock due to an ordering problem with the socket lock
-            #with callback.lock:
-            if True:
-                if kind == IPConnection.QUEUE_EXIT:
-                    break
-                elif kind == IPConnection.QUEUE_META:
-                    self.dispatch_meta(*data)
-                elif kind == IPConnection.QUEUE_PACKET:
-                    # don't dispatch callbacks when the receive thread isn't running
-                    if callback.packet_dispatch_allowed:
-                        self.dispatch_packet(data)
+    # internal
+    def coalesce_callback_items(self, items):
+        latest = {} # by (uid, function_id), index of the latest packet in items
+        coalesced = set()
+
+        for i, (kind, data) in enumerate(items):
+            if kind != IPConnection.QUEUE_PACKET:
+                latest = {} # don't coalesce across meta and exit items
+                continue
+
+            uid = get_uid_from_data(data)
+            function_id = get_function_id_from_data(data)
+
+            if function_id == IPConnection.CALLBACK_ENUMERATE:
+                continue # every enumerate callback is about a different device
+
+            device = self.devices.get(uid)
+
+            if device != None and -function_id in device.high_level_callbacks:
+                continue # every chunk is needed to reassemble the stream
+
+            key = (uid, function_id)
+            previous = latest.get(key)
+
+            if previous != None:
+                coalesced.add(previous)
+
+            latest[key] = i
+
+        if len(coalesced) == 0:
+            return items
+
+        self.callback_coalesced_count += len(coalesced)
+
+        return [item for i, item in enumerate(items) if i not in coalesced]
+
+    # internal
+    def queue_callback_packet(self, packet):
+        if self.callback.queue.put_packet(packet, self.callback_queue_limit,
+                                          self.callback_drop_policy == IPConnection.CALLBACK_DROP_POLICY_OLDEST):
+            self.callback_dropped_count += 1
 
     # internal
     # NOTE: the disconnect probe thread is not allowed to hold the socket_lock at any
@@ -1283,10 +1899,14 @@ class IPConnection(object):
                 with self.socket_send_lock:
                     while True:
                         try:
-                            self.socket.send(packet)
-                            break
+                            length = self.socket.send(packet)
                         except socket.timeout:
                             continue
+
+                        if length == len(packet):
+                            break
+
+                        packet = packet[length:] # partial send of a batch
             except socket.error:
                 self.handle_disconnect_by_peer(IPConnection.DISCONNECT_REASON_ERROR, None, True)
                 raise Error(Error.NOT_CONNECTED, 'Not connected', suppress_context=True)
@@ -1295,57 +1915,187 @@ class IPConnection(object):
 
     # internal
     def send_request(self, device, function_id, data, form, length_ret, form_ret):
+        batch_request = getattr(self.batch_context, 'request', None)
+
+        if batch_request != None:
+            return self.batch_capture_or_replay(batch_request, device, function_id, data, form, length_ret, form_ret)
+
         payload = pack_payload(data, form)
-        header, response_expected, sequence_number = self.create_packet_header(device, 8 + len(payload), function_id)
-        request = header + payload
 
-        if response_expected:
+        if not device.get_response_expected(function_id):
+            header, _, _ = self.create_packet_header(device, 8 + len(payload), function_id)
+
+            self.send(header + payload)
+
+            return None
+
+        if self.request_pipelining:
+            response = self.send_request_and_wait(device, function_id, payload)
+        else:
             with device.request_lock:
-                device.expected_response_function_id = function_id
-                device.expected_response_sequence_number = sequence_number
+                response = self.send_request_and_wait(device, function_id, payload)
 
-                try:
-                    self.send(request)
+        return self.parse_response(function_id, response, length_ret, form_ret, device.get_numpy_arrays())
 
-                    while True:
-                        response = device.response_queue.get(True, self.timeout)
+    # internal
+    def send_request_and_wait(self, device, function_id, payload):
+        pending_request = self.add_pending_request(device, function_id)
 
-                        if function_id == get_function_id_from_data(response) and \
-                           sequence_number == get_sequence_number_from_data(response):
-                            # ignore old responses that arrived after the timeout expired, but before setting
-                            # expected_response_function_id and expected_response_sequence_number back to None
-                            break
-                except queue.Empty:
-                    msg = 'Did not receive response for function {0} in time'.format(function_id)
-                    raise Error(Error.TIMEOUT, msg, suppress_context=True)
-                finally:
-                    device.expected_response_function_id = None
-                    device.expected_response_sequence_number = None
-
-            error_code = get_error_code_from_data(response)
-
-            if error_code == 0:
-                if length_ret == 0:
-                    length_ret = 8 # setter with response-expected enabled
-
-                if len(response) != length_ret:
-                    msg = 'Expected response of {0} byte for function ID {1}, got {2} byte instead' \
-                          .format(length_ret, function_id, len(response))
-                    raise Error(Error.WRONG_RESPONSE_LENGTH, msg)
-            elif error_code == 1:
-                msg = 'Got invalid parameter for function {0}'.format(function_id)
-                raise Error(Error.INVALID_PARAMETER, msg)
-            elif error_code == 2:
-                msg = 'Function {0} is not supported'.format(function_id)
-                raise Error(Error.NOT_SUPPORTED, msg)
-            else:
-                msg = 'Function {0} returned an unknown error'.format(function_id)
-                raise Error(Error.UNKNOWN_ERROR_CODE, msg)
+        try:
+            header, _, _ = self.create_packet_header(device, 8 + len(payload), function_id,
+                                                     sequence_number=pending_request.key[2])
+
+            self.send(header + payload)
+
+            return self.wait_for_response(pending_request)
+        finally:
+            self.remove_pending_request(pending_request)
+
+    # internal
+    def wait_for_response(self, pending_request):
+        try:
+            return pending_request.response_queue.get(True, self.timeout)
+        except queue.Empty:
+            msg = 'Did not receive response for function {0} in time'.format(pending_request.key[1])
+            raise Error(Error.TIMEOUT, msg, suppress_context=True)
+
+    # internal
+    def batch_capture_or_replay(self, batch_request, device, function_id, data, form, length_ret, form_ret):
+        if batch_request.replaying:
+            if batch_request.replayed or device is not batch_request.device or function_id != batch_request.function_id:
+                raise Error(Error.NOT_SUPPORTED, 'Function {0} sends more than one request and cannot be batched'.format(function_id))
+
+            batch_request.replayed = True
 
-            if len(form_ret) > 0:
-                return unpack_payload(response[8:], form_ret)
+            if not batch_request.response_expected:
+                return None
+
+            return self.parse_response(function_id, batch_request.response, length_ret, form_ret, device.get_numpy_arrays())
+
+        batch_request.payload = pack_payload(data, form)
+        batch_request.function_id = function_id
+
+        raise IPConnection.BatchRequestCaptured()
+
+    # internal
+    def batch_send(self, batch_requests, deadline):
+        # a function of a device can only have 15 requests in flight at the
+        # same time. if a batch contains more requests for the same function
+        # of the same device then it is sent in waves
+        waves = [[]]
+        counts = {} # by (uid, function_id)
+
+        for batch_request in batch_requests:
+            key = (batch_request.device.uid, batch_request.function_id)
+            counts[key] = counts.get(key, 0) + 1
+
+            if counts[key] > 15:
+                waves.append([])
+                counts = {key: 1}
+
+            waves[-1].append(batch_request)
+
+        for i, wave in enumerate(waves):
+            packets = []
+
+            for batch_request in wave:
+                device = batch_request.device
+                function_id = batch_request.function_id
+                payload = batch_request.payload
+
+                if device.get_response_expected(function_id):
+                    batch_request.response_expected = True
+                    batch_request.pending_request = self.add_pending_request(device, function_id)
+                    sequence_number = batch_request.pending_request.key[2]
+                else:
+                    sequence_number = None
+
+                header, _, _ = self.create_packet_header(device, 8 + len(payload), function_id, sequence_number=sequence_number)
+
+                packets.append(header + payload)
+
+            try:
+                self.send(b''.join(packets))
+            except Error as e:
+                for batch_request in wave:
+                    batch_request.error = e
+
+            if i < len(waves) - 1:
+                self.batch_wait(wave, deadline)
+
+    # internal
+    def batch_wait(self, batch_requests, deadline):
+        for batch_request in batch_requests:
+            pending_request = batch_request.pending_request
+
+            if pending_request == None:
+                continue
+
+            try:
+                if batch_request.error == None:
+                    batch_request.response = pending_request.response_queue.get(True, max(deadline - time.time(), 0))
+            except queue.Empty:
+                msg = 'Did not receive response for function {0} in time'.format(batch_request.function_id)
+                batch_request.error = Error(Error.TIMEOUT, msg, suppress_context=True)
+            finally:
+                # free the sequence number for the next wave
+                batch_request.device.ipcon.remove_pending_request(pending_request)
+                batch_request.pending_request = None
+
+    # internal
+    def parse_response(self, function_id, response, length_ret, form_ret, numpy_arrays=False):
+        error_code = get_error_code_from_data(response)
+
+        if error_code == 0:
+            if length_ret == 0:
+                length_ret = 8 # setter with response-expected enabled
+
+            if len(response) != length_ret:
+                msg = 'Expected response of {0} byte for function ID {1}, got {2} byte instead' \
+                      .format(length_ret, function_id, len(response))
+                raise Error(Error.WRONG_RESPONSE_LENGTH, msg)
+        elif error_code == 1:
+            msg = 'Got invalid parameter for function {0}'.format(function_id)
+            raise Error(Error.INVALID_PARAMETER, msg)
+        elif error_code == 2:
+            msg = 'Function {0} is not supported'.format(function_id)
+            raise Error(Error.NOT_SUPPORTED, msg)
         else:
-            self.send(request)
+            msg = 'Function {0} returned an unknown error'.format(function_id)
+            raise Error(Error.UNKNOWN_ERROR_CODE, msg)
+
+        if form_ret != '':
+            if numpy_arrays:
+                return unpack_numpy_payload(response[8:], form_ret)
+
+            return unpack_payload(response[8:], form_ret)
+
+        return None
+
+    # internal
+    def add_pending_request(self, device, function_id):
+        with self.pending_requests_condition:
+            while True:
+                # try all 15 sequence numbers before waiting for one of them
+                # to become available for this function of this device
+                for _ in range(15):
+                    sequence_number = self.get_next_sequence_number()
+                    key = (device.uid, function_id, sequence_number)
+
+                    if key not in self.pending_requests:
+                        pending_request = IPConnection.PendingRequest(key)
+                        self.pending_requests[key] = pending_request
+
+                        return pending_request
+
+                self.pending_requests_condition.wait()
+
+    # internal
+    def remove_pending_request(self, pending_request):
+        with self.pending_requests_condition:
+            if self.pending_requests.get(pending_request.key) is pending_request:
+                del self.pending_requests[pending_request.key]
+                self.pending_requests_condition.notify_all()
 
     # internal
     def get_next_sequence_number(self):
@@ -1363,7 +2113,7 @@ class IPConnection(object):
 
         if sequence_number == 0 and function_id == IPConnection.CALLBACK_ENUMERATE:
             if IPConnection.CALLBACK_ENUMERATE in self.registered_callbacks:
-                self.callback.queue.put((IPConnection.QUEUE_PACKET, packet))
+                self.queue_callback_packet(packet)
 
             return
 
@@ -1376,13 +2126,15 @@ class IPConnection(object):
         if sequence_number == 0:
             if function_id in device.registered_callbacks or \
                -function_id in device.high_level_callbacks:
-                self.callback.queue.put((IPConnection.QUEUE_PACKET, packet))
+                self.queue_callback_packet(packet)
 
             return
 
-        if device.expected_response_function_id == function_id and \
-           device.expected_response_sequence_number == sequence_number:
-            device.response_queue.put(packet)
+        with self.pending_requests_condition:
+            pending_request = self.pending_requests.get((uid, function_id, sequence_number))
+
+        if pending_request != None:
+            pending_request.response_queue.put(packet)
             return
 
         # Response seems to be OK, but can't be handled
@@ -1401,11 +2153,13 @@ class IPConnection(object):
                                   disconnect_reason, socket_id)))
 
     # internal
-    def create_packet_header(self, device, length, function_id):
+    def create_packet_header(self, device, length, function_id, sequence_number=None):
         uid = IPConnection.BROADCAST_UID
-        sequence_number = self.get_next_sequence_number()
         r_bit = 0
 
+        if sequence_number == None:
+            sequence_number = self.get_next_sequence_number()
+
         if device is not None:
             uid = device.uid
 
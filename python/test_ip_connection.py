@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import sys
-from ip_connection import create_char, create_char_list, create_string, pack_payload, unpack_payload
+import struct
+from ip_connection import IPConnection, create_char, create_char_list, create_string, pack_payload, unpack_payload, get_payload_codec
 
 def b(value):
     if sys.hexversion < 0x03000000:
@@ -159,3 +160,302 @@ assert(unpack_payload(b('abc\xff\0'), '5s') == 'abc\xff')
 assert(unpack_payload(b('a'), 'c') == 'a')
 assert(unpack_payload(b('abc'), '3c') == ('a', 'b', 'c'))
 assert(unpack_payload(b('a\xff\0'), '3c') == ('a', '\xff', '\0'))
+
+#
+# payload codec
+#
+
+assert(pack_payload((True,), '!') == b('\x01'))
+assert(pack_payload(([True, False, True, False, False, False, False, False, True],), '9!') == b('\x05\x01'))
+assert(pack_payload((1, [2, 3], 'ab', ['x', 'y']), 'B 2H 3s 2c') == b('\x01\x02\x00\x03\x00ab\0xy'))
+assert(unpack_payload(b('\x01'), '!') == True)
+assert(unpack_payload(b('\x05\x01'), '9!') == (True, False, True, False, False, False, False, False, True))
+assert(unpack_payload(b('\x01\x02\x00\x03\x00ab\0xy'), 'B 2H 3s 2c') == [1, (2, 3), 'ab', ('x', 'y')])
+assert(unpack_payload(b('\x01\x02\x00\x03\x00'), 'B H H') == [1, 2, 3])
+assert(get_payload_codec('B 2H 3s 2c') is get_payload_codec('B 2H 3s 2c'))
+
+try:
+    pack_payload(([1, 2], 3), '3B B') # array too short
+    assert(False)
+except struct.error:
+    pass
+
+try:
+    pack_payload(([True],), '2!') # bool list too short
+    assert(False)
+except ValueError:
+    pass
+
+#
+# callback queue
+#
+
+def packet(uid, function_id, value):
+    return struct.pack('<IBBBBB', uid, 9, function_id, 0, 0, value)
+
+PACKET = IPConnection.QUEUE_PACKET
+META = IPConnection.QUEUE_META
+
+q = IPConnection.CallbackQueue()
+q.put((META, None))
+
+assert(not q.put_packet(packet(1, 5, 0), 2, False))
+assert(not q.put_packet(packet(1, 5, 1), 2, False))
+assert(q.put_packet(packet(1, 5, 2), 2, False)) # newest dropped
+assert(q.put_packet(packet(1, 5, 3), 2, True)) # oldest dropped, meta item kept
+assert(q.packet_count == 2)
+assert(q.get_all() == [(META, None), (PACKET, packet(1, 5, 1)), (PACKET, packet(1, 5, 3))])
+assert(q.packet_count == 0)
+
+#
+# callback coalescing
+#
+
+ipcon = IPConnection()
+items = [(PACKET, packet(1, 5, 0)),
+         (PACKET, packet(2, 5, 0)),
+         (PACKET, packet(1, 5, 1)),
+         (PACKET, packet(1, 6, 0)),
+         (META, None),
+         (PACKET, packet(1, 5, 2)),
+         (PACKET, packet(0, IPConnection.CALLBACK_ENUMERATE, 0)),
+         (PACKET, packet(0, IPConnection.CALLBACK_ENUMERATE, 1))]
+
+assert(ipcon.coalesce_callback_items(items) == items[1:])
+assert(ipcon.get_callback_statistics() == (0, 1))
+
+#
+# numpy arrays
+#
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy != None:
+    from ip_connection import Device, create_stream_data, write_stream_data, get_stream_data, unpack_numpy_payload
+
+    data = b('\x01\x02\x00\x03\x00ab\0xy\x05\x01')
+    value, array, string, chars, bools = unpack_numpy_payload(data, 'B 2H 3s 2c 9!')
+
+    assert(value == 1)
+    assert(array.dtype == numpy.dtype('<u2') and array.tolist() == [2, 3])
+    assert(not array.flags.writeable) # view of the payload
+    assert(string == 'ab')
+    assert(chars == ('x', 'y'))
+    assert(bools.dtype == numpy.bool_ and bools.tolist() == [True, False, True, False, False, False, False, False, True])
+    assert(unpack_numpy_payload(b('\xff\xff\x01\x00'), '2h').tolist() == [-1, 1])
+    assert(unpack_numpy_payload(b('\x01\x02\x00'), 'B H') == [1, 2]) # no arrays, no numpy
+
+    stream_data = create_stream_data(numpy.arange(3, dtype='<u2'), 5, 0)
+    stream_data[0:3] = numpy.arange(3, dtype='<u2')
+    stream_data[3:6] = numpy.arange(3, dtype='<u2') # last chunk is written in full
+    assert(get_stream_data(stream_data, 5).tolist() == [0, 1, 2, 0, 1])
+    assert(get_stream_data(create_stream_data((1, 2), 2, 0), 2) == (0, 0))
+
+    # a dynamic stream reports a longer stream length with a later chunk
+    for chunk_data in [numpy.arange(3, dtype='<u2'), (0, 1, 2)]:
+        stream_data = create_stream_data(chunk_data, 4, 0)
+        stream_data = write_stream_data(stream_data, 0, chunk_data)
+        stream_data = write_stream_data(stream_data, 3, numpy.arange(3, 6, dtype='<u2')) # now 11 items long
+        stream_data = write_stream_data(stream_data, 6, numpy.arange(6, 9, dtype='<u2'))
+        stream_data = write_stream_data(stream_data, 9, numpy.arange(9, 12, dtype='<u2'))
+        assert(list(get_stream_data(stream_data, 11)) == list(range(11)))
+
+    ipcon = IPConnection()
+    device = Device('XYZ', ipcon, 0, 'Test Device')
+
+    assert(not device.get_numpy_arrays())
+    ipcon.set_numpy_arrays(True)
+    assert(device.get_numpy_arrays())
+    device.set_numpy_arrays(False)
+    assert(not device.get_numpy_arrays())
+    device.set_numpy_arrays(None)
+    assert(device.get_numpy_arrays())
+
+#
+# batch
+#
+
+from ip_connection import Device, Error
+
+class BatchTestDevice(Device):
+    def __init__(self, uid, ipcon):
+        Device.__init__(self, uid, ipcon, -1, 'Batch Test Device')
+
+        self.response_expected[1] = Device.RESPONSE_EXPECTED_ALWAYS_TRUE
+        self.response_expected[2] = Device.RESPONSE_EXPECTED_FALSE
+
+        ipcon.add_device(self)
+
+    def get_value(self, offset):
+        return self.ipcon.send_request(self, 1, (offset,), 'B', 10, 'H') + 1
+
+    def set_value(self, value):
+        self.ipcon.send_request(self, 2, (value,), 'H', 0, '')
+
+    def get_values(self):
+        return self.get_value(0), self.get_value(1) # two requests, cannot be batched
+
+    def get_stream_low_level(self):
+        return self.get_value(0)
+
+    def get_stream(self):
+        return self.get_stream_low_level(), self.get_stream_low_level() # high-level, rejected before sending
+
+def batch_send(data):
+    sent.append(data)
+
+    # answer every request for function 1 of device 'ABC', the other device
+    # does not answer
+    while len(data) > 0:
+        uid, length, function_id, options = struct.unpack('<IBBB', data[:7])
+        offset = struct.unpack('<B', data[8:9])[0] if function_id == 1 else 0
+
+        if uid == abc.uid and function_id == 1:
+            ipcon.handle_response(struct.pack('<IBBBBH', uid, 10, function_id, options, 0, 1000 + offset))
+
+        data = data[length:]
+
+ipcon = IPConnection()
+abc = BatchTestDevice('ABC', ipcon)
+xyz = BatchTestDevice('XYZ', ipcon)
+sent = []
+ipcon.socket = True # pretend to be connected, send is replaced
+ipcon.send = batch_send
+
+results = ipcon.batch([(abc, 'get_value', (5,)),
+                       (xyz, 'get_value', (6,)),
+                       (abc, 'set_value', (7,)),
+                       (abc, 'get_values'),
+                       (abc, 'get_api_version')], timeout=0.1)
+
+assert(len(sent) == 1) # one send for all requests
+assert(results[0] == (1006, None))
+assert(results[1][0] == None and results[1][1].value == Error.TIMEOUT)
+assert(results[2] == (None, None))
+assert(results[3][0] == None and results[3][1].value == Error.NOT_SUPPORTED)
+assert(results[4] == ((0, 0, 0), None))
+assert(len(ipcon.pending_requests) == 0)
+
+sent = []
+results = ipcon.batch([(abc, 'get_value', (i,)) for i in range(20)]) # more than 15 requests for the same function
+
+assert(len(sent) == 2) # sent in two waves
+assert(results == [(1001 + i, None) for i in range(20)])
+
+sent = []
+results = ipcon.batch([(abc, lambda offset: ipcon.send_request(abc, 1, (offset,), 'B', 10, 'H'), (3,)), # callable instead of a name
+                       (abc, 'get_value', (256,))]) # out of range for 'B', fails while packing
+
+assert(len(sent) == 1)
+assert(results[0] == (1003, None))
+assert(results[1][0] == None and isinstance(results[1][1], struct.error))
+
+sent = []
+results = ipcon.batch([(abc, 'get_stream')])
+
+assert(len(sent) == 0) # rejected before anything was sent
+assert(results[0][0] == None and results[0][1].value == Error.NOT_SUPPORTED)
+
+#
+# request pipelining
+#
+
+import time
+import threading
+
+def wait_until(predicate):
+    deadline = time.time() + 2
+
+    while not predicate():
+        assert(time.time() < deadline)
+        time.sleep(0.01)
+
+def pipelining_send(data):
+    sent.append(data) # answered by the test
+
+def pipelining_respond(data):
+    uid, length, function_id, options = struct.unpack('<IBBB', data[:7])
+    offset = struct.unpack('<B', data[8:9])[0]
+
+    ipcon.handle_response(struct.pack('<IBBBBH', uid, 10, function_id, options, 0, 1000 + offset))
+
+def pipelining_get_values(offsets):
+    results = {}
+
+    def get_value(offset):
+        results[offset] = abc.get_value(offset)
+
+    threads = [threading.Thread(target=get_value, args=(offset,)) for offset in offsets]
+
+    for thread in threads:
+        thread.start()
+
+    return threads, results
+
+ipcon = IPConnection()
+abc = BatchTestDevice('ABC', ipcon)
+sent = []
+ipcon.socket = True # pretend to be connected, send is replaced
+ipcon.send = pipelining_send
+ipcon.set_request_pipelining(True)
+
+# two requests for the same function in flight, only the sequence number
+# tells them apart. responses in reverse order reach the right caller
+threads, results = pipelining_get_values([1, 2])
+
+wait_until(lambda: len(sent) == 2)
+
+for data in reversed(sent):
+    pipelining_respond(data)
+
+for thread in threads:
+    thread.join()
+
+assert(results == {1: 1002, 2: 1003})
+assert(len(ipcon.pending_requests) == 0)
+
+# a timed out request removes its pending entry, a late response is ignored
+sent = []
+ipcon.set_timeout(0.1)
+
+try:
+    abc.get_value(3)
+    assert(False)
+except Error as e:
+    assert(e.value == Error.TIMEOUT)
+
+assert(len(ipcon.pending_requests) == 0)
+
+pipelining_respond(sent[0])
+
+assert(len(ipcon.pending_requests) == 0)
+
+ipcon.set_timeout(2.5)
+
+# only 15 requests for the same function can be in flight, one per sequence
+# number. the other requests wait for a sequence number to become available
+sent = []
+threads, results = pipelining_get_values(range(20))
+
+wait_until(lambda: len(sent) == 15)
+time.sleep(0.1)
+
+assert(len(sent) == 15)
+assert(len(ipcon.pending_requests) == 15)
+assert(sorted(key[2] for key in ipcon.pending_requests) == list(range(1, 16)))
+
+answered = 0
+
+while answered < 20:
+    wait_until(lambda: len(sent) > answered)
+    pipelining_respond(sent[answered])
+    answered += 1
+
+for thread in threads:
+    thread.join()
+
+assert(results == dict((i, 1001 + i) for i in range(20)))
+assert(len(ipcon.pending_requests) == 0)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# runs in the source directory of the Python bindings ZIP file, next to the
+# generated device modules
+
+import struct
+import asyncio
+from ip_connection import Device, get_uid_from_data, get_function_id_from_data
+from ip_connection_async import AsyncIPConnection
+
+#
+# char and string parameters
+#
+
+async def check_char_and_string_parameters():
+    from bricklet_rs485_async import AsyncBrickletRS485
+    from bricklet_lcd_20x4_async import AsyncBrickletLCD20x4
+
+    ipcon = AsyncIPConnection()
+    rs485 = AsyncBrickletRS485('ABC', ipcon)
+    lcd = AsyncBrickletLCD20x4('XYZ', ipcon)
+    sent = []
+
+    async def send(packet):
+        sent.append(packet)
+
+        # answer write_low_level with 3 written chars
+        if get_uid_from_data(packet) == rs485.uid and get_function_id_from_data(packet) == AsyncBrickletRS485.FUNCTION_WRITE_LOW_LEVEL:
+            ipcon.handle_response(packet[:4] + struct.pack('<B', 9) + packet[5:8] + struct.pack('<B', 3))
+
+    ipcon.send = send
+
+    for device in [rs485, lcd]:
+        device.device_identifier_check = Device.DEVICE_IDENTIFIER_CHECK_MATCH
+
+    assert(await rs485.write_low_level(3, 0, ['a', 'b', 'c'] + ['\0'] * 57) == 3) # char list
+    assert(sent[0][8:15] == struct.pack('<HH', 3, 0) + b'abc')
+
+    await lcd.write_line(1, 2, 'foo') # string
+    assert(sent[1][8:10] == b'\x01\x02')
+    assert(sent[1][10:30] == b'foo' + b'\x00' * 17)
+
+async def main():
+    await check_char_and_string_parameters()
+
+if __name__ == '__main__':
+    asyncio.run(main())
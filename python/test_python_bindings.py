@@ -52,12 +52,22 @@ if 'generators' not in sys.modules:
 
 from generators import common
 
+def is_python3_only(path):
+    # the asyncio IP Connection and the Async<Device> classes require Python >= 3.7
+    return os.path.split(path)[-1].endswith('_async.py')
+
 class PythonTester(common.Tester):
     def __init__(self, root_dir, python, extra_paths):
         common.Tester.__init__(self, 'python', '.py', root_dir, comment=python, subdirs=['examples', 'source'], extra_paths=extra_paths)
 
         self.python = python
 
+    def handle_source(self, tmp_dir, scratch_dir, path, extra):
+        if self.python != 'python3' and is_python3_only(path):
+            return
+
+        common.Tester.handle_source(self, tmp_dir, scratch_dir, path, extra)
+
     def test(self, cookie, tmp_dir, scratch_dir, path, extra):
         args = [self.python,
                 '-c',
@@ -71,6 +81,12 @@ class PylintTester(common.Tester):
 
         self.python = python
 
+    def handle_source(self, tmp_dir, scratch_dir, path, extra):
+        if self.python != 'python3' and is_python3_only(path):
+            return
+
+        common.Tester.handle_source(self, tmp_dir, scratch_dir, path, extra)
+
     def test(self, cookie, tmp_dir, scratch_dir, path, extra):
         teardown = None
 
@@ -142,6 +158,6 @@ def test(root_dir):
     return PylintTester(root_dir, 'python3', 'pylint3', []).run()#extra_paths).run()
 
 if __name__ == '__main__':
-    common.dockerize('python', __file__)
+    common.dockerize('python', __file__, add_tester_arguments=True)
 
     test(os.getcwd())
@@ -849,6 +849,6 @@ def generate(root_dir, language, internal):
     common.generate(root_dir, language, internal, RustBindingsGenerator)
 
 if __name__ == '__main__':
-    args = common.dockerize('rust', __file__, add_internal_argument=True)
+    args = common.dockerize('rust', __file__, add_internal_argument=True, add_incremental_argument=True)
 
     generate(os.getcwd(), 'en', args.internal)
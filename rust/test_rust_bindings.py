@@ -104,6 +104,6 @@ def test(root_dir):
     return RustExamplesTester(root_dir, None).run()
 
 if __name__ == '__main__':
-    common.dockerize('rust', __file__)
+    common.dockerize('rust', __file__, add_tester_arguments=True)
 
     test(os.getcwd())
@@ -162,6 +162,8 @@ class SaleaeBindingsElement(PythonElement):
 
 
 class SaleaeBindingsGenerator(saleae_common.SaleaeGeneratorTrait, common.BindingsGenerator):
+    incremental_dependencies = [os.path.join('..', 'python', 'ip_connection.py')]
+
     def get_device_class(self):
         return SaleaeBindingsDevice
 
@@ -211,6 +213,6 @@ def generate(root_dir, language, internal):
     common.generate(root_dir, language, internal, SaleaeBindingsGenerator)
 
 if __name__ == '__main__':
-    args = common.dockerize('saleae', __file__, add_internal_argument=True)
+    args = common.dockerize('saleae', __file__, add_internal_argument=True, add_incremental_argument=True)
 
     generate(os.getcwd(), 'en', args.internal)
@@ -555,6 +555,8 @@ def dispatch_{0}_{1}(ctx, argv):
         return source
 
 class ShellBindingsGenerator(shell_common.ShellGeneratorTrait, common.BindingsGenerator):
+    incremental_dependencies = [os.path.join('..', 'python', 'ip_connection.py')]
+
     def get_device_class(self):
         return ShellBindingsDevice
 
@@ -688,6 +690,6 @@ def generate(root_dir, language, internal):
     common.generate(root_dir, language, internal, ShellBindingsGenerator)
 
 if __name__ == '__main__':
-    args = common.dockerize('shell', __file__, add_internal_argument=True)
+    args = common.dockerize('shell', __file__, add_internal_argument=True, add_incremental_argument=True)
 
     generate(os.getcwd(), 'en', args.internal)
@@ -57,7 +57,7 @@ class ShellExamplesTester(common.Tester):
 
     def test(self, cookie, tmp_dir, scratch_dir, path, extra):
         if path.endswith('example-unicode.sh'): # FIXME
-            self.handle_result(cookie, 0, '>>> skipping')
+            self.add_result(cookie, 0, '>>> skipping')
             return
 
         path_check = path.replace('.sh', '-check.sh')
@@ -84,6 +84,6 @@ def test(root_dir):
     return ShellExamplesTester(root_dir).run()
 
 if __name__ == '__main__':
-    common.dockerize('shell', __file__)
+    common.dockerize('shell', __file__, add_tester_arguments=True)
 
     test(os.getcwd())
@@ -9,6 +9,11 @@ if sys.hexversion < 0x3040000:
 
 import os
 import re
+import time
+import functools
+import traceback
+import multiprocessing
+import xml.etree.ElementTree as ET
 import importlib.util
 import importlib.machinery
 
@@ -32,6 +37,183 @@ from generators import common
 
 # FIXME: test custom bindings too
 
+def init_worker(jobs, cache):
+    common.tester_jobs = jobs
+    common.enable_tester_cache = cache
+
+# runs the tests of one binding and returns a result dict. with a log dir the
+# output of the tests, including the output of subprocesses, goes to a file
+# named after the binding in that directory
+def run_binding(binding, log_dir=None):
+    if log_dir != None:
+        log_path = os.path.join(log_dir, binding + '.log')
+    else:
+        log_path = None
+
+    result = {'binding': binding, 'success': False, 'missing': False, 'error': None, 'log': log_path, 'time': 0, 'reports': []}
+    start = time.monotonic()
+
+    del common.tester_reports[:]
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    if log_path != None:
+        log = open(log_path, 'wb')
+        stdout_fd = os.dup(1)
+        stderr_fd = os.dup(2)
+
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+
+    try:
+        try:
+            module = importlib.import_module('generators.{0}.test_{0}_bindings'.format(binding))
+        except ImportError: # FIXME: Python 3.6 has ModuleNotFoundError, which would be better to use here, but Debian Stretch has only Python 3.5
+            print('\033[01;36m### tests missing\033[0m')
+
+            result['success'] = True
+            result['missing'] = True
+        else:
+            success = module.test(os.path.join(generators_dir, binding))
+
+            if not isinstance(success, bool):
+                result['error'] = 'error: test_{0}_bindings.py returns wrong type from its test() function'.format(binding)
+
+                print(result['error'])
+
+            result['success'] = success == True
+    except (Exception, SystemExit):
+        result['error'] = traceback.format_exc()
+
+        print(result['error'], end='')
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        if log_path != None:
+            os.dup2(stdout_fd, 1)
+            os.dup2(stderr_fd, 2)
+            os.close(stdout_fd)
+            os.close(stderr_fd)
+            log.close()
+
+    result['time'] = time.monotonic() - start
+    result['reports'] = list(common.tester_reports)
+
+    return result
+
+def run_bindings_concurrently(bindings, concurrency, log_dir):
+    os.makedirs(log_dir, exist_ok=True)
+
+    results = []
+    jobs = common.tester_jobs
+
+    # without -j each worker would default to the CPU count, split the CPUs
+    # between the concurrently running workers instead
+    if jobs == None:
+        jobs = max(1, (os.cpu_count() or 1) // concurrency)
+
+    # each binding gets a fresh worker process, the testers change the current
+    # directory and the module-global state of common
+    with multiprocessing.Pool(processes=concurrency, initializer=init_worker, initargs=(jobs, common.enable_tester_cache), maxtasksperchild=1) as pool:
+        print('\033[01;32m>>> running tests for {0} bindings, {1} at a time, logs in {2}\033[0m'.format(len(bindings), concurrency, log_dir), flush=True)
+
+        for result in pool.imap_unordered(functools.partial(run_binding, log_dir=log_dir), bindings):
+            if result['missing']:
+                status = '\033[01;36mtests missing\033[0m'
+            elif result['success']:
+                status = '\033[01;32msucceeded\033[0m'
+            else:
+                status = '\033[01;31mfailed\033[0m'
+
+            print('>>> tests for {0} bindings {1} after {2:.1f} s'.format(result['binding'], status, result['time']), flush=True)
+
+            results.append(result)
+
+    return sorted(results, key=lambda result: result['binding'])
+
+def get_counts(result):
+    counts = {'test_count': 0, 'success_count': 0, 'cached_count': 0, 'failure_count': 0}
+
+    for report in result['reports']:
+        for key in counts:
+            counts[key] += report[key]
+
+    return counts
+
+def print_summary(results):
+    print('\033[01;35m>>> summary\033[0m')
+    print('{0:12} {1:>8} {2:>8} {3:>8} {4:>8} {5:>10}  {6}'.format('bindings', 'tests', 'passed', 'cached', 'failed', 'time', 'result'))
+
+    for result in results:
+        counts = get_counts(result)
+
+        if result['missing']:
+            status = 'tests missing'
+        elif result['success']:
+            status = 'succeeded'
+        else:
+            status = 'failed'
+
+            if result['log'] != None:
+                status += ', see ' + result['log']
+
+        print('{0:12} {1:8} {2:8} {3:8} {4:8} {5:8.1f} s  {6}'.format(result['binding'], counts['test_count'], counts['success_count'],
+                                                                    counts['cached_count'], counts['failure_count'], result['time'], status))
+
+def write_junit_report(path, results):
+    testsuites = ET.Element('testsuites')
+
+    for result in results:
+        if result['missing']:
+            continue
+
+        counts = get_counts(result)
+        testsuite = ET.SubElement(testsuites, 'testsuite', name=result['binding'], time='{0:.3f}'.format(result['time']))
+        failures = counts['failure_count']
+
+        for report in result['reports']:
+            if report['comment'] != None:
+                classname = '{0}.{1}'.format(result['binding'], report['comment'])
+            else:
+                classname = result['binding']
+
+            for test_result in report['results']:
+                name = test_result['path']
+
+                if name.startswith(report['tmp_dir'] + os.sep):
+                    name = os.path.relpath(name, report['tmp_dir'])
+
+                testcase = ET.SubElement(testsuite, 'testcase', classname=classname, name=name)
+
+                if not test_result['success']:
+                    ET.SubElement(testcase, 'failure', message='test failed').text = test_result['output']
+                elif test_result['cached']:
+                    ET.SubElement(testcase, 'system-out').text = 'cached'
+                elif len(test_result['output']) > 0:
+                    ET.SubElement(testcase, 'system-out').text = test_result['output']
+
+        # a failure outside of the individual tests, e.g. the ZIP file is missing
+        if not result['success'] and failures == 0:
+            testcase = ET.SubElement(testsuite, 'testcase', classname=result['binding'], name='test()')
+            failure = ET.SubElement(testcase, 'failure', message='test() failed')
+
+            if result['error'] != None:
+                failure.text = result['error']
+            elif result['log'] != None:
+                failure.text = 'see ' + result['log']
+
+            failures += 1
+
+        testsuite.set('tests', str(len(testsuite)))
+        testsuite.set('failures', str(failures))
+
+    with open(path, 'wb') as f:
+        ET.ElementTree(testsuites).write(f, encoding='utf-8', xml_declaration=True)
+
+    print('\033[01;35m>>> JUnit report written to {0}\033[0m'.format(path))
+
 def main(args):
     all_bindings = []
 
@@ -52,24 +234,31 @@ def main(args):
             print('error: {0}'.format(e))
             return 1
 
-    for binding in all_bindings:
-        if binding not in active_bindings:
-            continue
+    bindings = [binding for binding in all_bindings if binding in active_bindings]
 
-        print('\033[01;32m>>> running tests for {0} bindings\033[0m'.format(binding))
+    if args.concurrency > 1:
+        results = run_bindings_concurrently(bindings, args.concurrency, args.log_dir)
+    else:
+        results = []
 
-        try:
-            module = importlib.import_module('generators.{0}.test_{0}_bindings'.format(binding))
-        except ImportError: # FIXME: Python 3.6 has ModuleNotFoundError, which would be better to use here, but Debian Stretch has only Python 3.5
-            print('\033[01;36m### tests missing\033[0m')
-        else:
-            success = module.test(os.path.join(generators_dir, binding))
+        for binding in bindings:
+            print('\033[01;32m>>> running tests for {0} bindings\033[0m'.format(binding))
 
-            if not isinstance(success, bool):
-                print('error: test_{0}_bindings.py returns wrong type from its test() function'.format(binding))
+            result = run_binding(binding)
+
+            results.append(result)
+
+            if not result['success']:
+                break
+
+    if args.concurrency > 1 or args.junit != None:
+        print_summary(results)
+
+    if args.junit != None:
+        write_junit_report(args.junit, results)
 
-            if not success:
-                return 1
+    if not all(result['success'] for result in results):
+        return 1
 
     print('\033[01;35m>>> done\033[0m')
 
@@ -78,5 +267,8 @@ def main(args):
 if __name__ == '__main__':
     def add_arguments(parser):
         parser.add_argument('-b', '--bindings', nargs=1, help='comma separated list of bindings, each prefixed by +/-/>=/>/<=/<')
+        parser.add_argument('-c', '--concurrency', type=int, default=1, help='number of bindings to test concurrently, each in its own process with its own log file, without stopping at the first failure [default: 1]')
+        parser.add_argument('--log-dir', default='/tmp/tester/logs', help='directory for the per-bindings log files of --concurrency [default: /tmp/tester/logs]')
+        parser.add_argument('--junit', metavar='PATH', help='write the results as JUnit XML report to PATH')
 
-    sys.exit(main(common.dockerize('', __file__, add_arguments=add_arguments)))
+    sys.exit(main(common.dockerize('', __file__, add_tester_arguments=True, add_arguments=add_arguments)))
@@ -1352,6 +1352,6 @@ def generate(root_dir, language, internal):
     common.generate(root_dir, language, internal, UCBindingsGenerator)
 
 if __name__ == '__main__':
-    args = common.dockerize('uc', __file__, add_internal_argument=True)
+    args = common.dockerize('uc', __file__, add_internal_argument=True, add_incremental_argument=True)
 
     generate(os.getcwd(), 'en', args.internal)
@@ -256,6 +256,6 @@ def test(root_dir):
     return UCExamplesTester(root_dir, 'scan-build clang', extra_paths, False).run()
 
 if __name__ == '__main__':
-    common.dockerize('uc', __file__)
+    common.dockerize('uc', __file__, add_tester_arguments=True)
 
     test(os.getcwd())